@@ -0,0 +1,120 @@
+"""Benchmark del autocompletado de /registrar contra la réplica local de RAWG.
+
+Levanta benchmarks/rawg_stub.py, apunta config.RAWG_BASE_URL a él y simula
+usuarios tecleando títulos (una llamada por pulsación a partir de 3 letras).
+Reporta latencia p50/p95/p99, throughput, aciertos de caché y cuántas
+peticiones terminaron en 429/500.
+
+Uso:
+    python benchmarks/bench_autocomplete.py --sessions 200 --latency-ms 150 --rate-limit 0.05
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakes import FakeInteraction, FakeUser
+from benchmarks.rawg_stub import FIXTURES_DIR, RAWGStandIn
+from utils.metrics import percentile
+
+
+def build_sessions(titles: list, sessions: int) -> list:
+    """Cada sesión es la secuencia de textos que Discord enviaría al teclear un título.
+
+    Los títulos se eligen con sesgo (pocos muy populares), como en el concurso.
+    """
+    weights = [1 / (rank + 1) for rank in range(len(titles))]
+    result = []
+    for _ in range(sessions):
+        title = random.choices(titles, weights=weights)[0]
+        # No todos terminan de escribir el título completo
+        typed = title[:random.randint(min(len(title), 4), len(title))]
+        result.append([typed[:n] for n in range(3, len(typed) + 1)])
+    return result
+
+
+async def main(args):
+    with open(os.path.join(args.fixtures, 'games.json'), encoding='utf-8') as f:
+        titles = [game['name'] for game in json.load(f)]
+    random.shuffle(titles)
+
+    stand_in = RAWGStandIn(
+        args.fixtures, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_limit=args.rate_limit
+    )
+    url = stand_in.start()
+
+    # Debe fijarse antes de importar config/rawg_api
+    os.environ['RAWG_BASE_URL'] = url
+    os.environ.setdefault('RAWG_API_KEY', 'offline')
+
+    import discord
+    from discord.ext import commands
+    from utils.rawg_api import rawg_client
+
+    bot = commands.Bot(command_prefix='!', intents=discord.Intents.default())
+    await bot.load_extension('cogs.games')
+    games_cog = bot.cogs['Games']
+
+    print(f'🎮 RAWG simulado en {url} ({len(stand_in.games)} juegos, '
+          f'{args.latency_ms:.0f}±{args.jitter_ms:.0f}ms, 500={args.error_rate:.0%}, 429={args.rate_limit:.0%})')
+
+    sessions = build_sessions(titles, args.sessions)
+    latencies = {'hit': [], 'miss': []}
+    empty = 0
+
+    async def run_session(keystrokes):
+        nonlocal empty
+        interaction = FakeInteraction(FakeUser(random.randint(1, 1000)))
+        for current in keystrokes:
+            before = stand_in.stats['requests']
+            start = time.perf_counter()
+            choices = await games_cog.nombre_autocomplete(interaction, current)
+            elapsed = (time.perf_counter() - start) * 1000
+            latencies['miss' if stand_in.stats['requests'] > before else 'hit'].append(elapsed)
+            # Solo la opción manual: RAWG no respondió o no hubo coincidencias
+            if len(choices) <= 1:
+                empty += 1
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(0, len(sessions), args.concurrency):
+            await asyncio.gather(*[run_session(s) for s in sessions[i:i + args.concurrency]])
+    elapsed = time.perf_counter() - start
+    stand_in.stop()
+
+    all_latencies = latencies['hit'] + latencies['miss']
+    calls = len(all_latencies)
+
+    print(f'\n⏱️ {calls} llamadas en {elapsed:.2f}s ({calls / elapsed:.1f} llamadas/s, concurrencia {args.concurrency})\n')
+    print(f"{'tipo':<8} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, values in [('total', all_latencies), ('caché', latencies['hit']), ('RAWG', latencies['miss'])]:
+        print(f'{name:<8} {len(values):>6} {percentile(values, 50):>9.1f} '
+              f'{percentile(values, 95):>9.1f} {percentile(values, 99):>9.1f}')
+
+    print(f"\n💾 Aciertos de caché: {len(latencies['hit']) / max(calls, 1):.1%} "
+          f'({len(rawg_client.cache)} búsquedas en caché)')
+    print(f'⚠️ Sin resultados: {empty} | 429: {stand_in.stats["rate_limited"]} | 500: {stand_in.stats["errors"]}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark del autocompletado contra RAWG simulado')
+    parser.add_argument('--sessions', type=int, default=200, help='Títulos tecleados')
+    parser.add_argument('--concurrency', type=int, default=10, help='Sesiones simultáneas')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--latency-ms', type=float, default=150)
+    parser.add_argument('--jitter-ms', type=float, default=50)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    asyncio.run(main(args))
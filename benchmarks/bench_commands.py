@@ -0,0 +1,168 @@
+"""Benchmark de /ranking, /tablero, /mi-posicion y /estadisticas con datos sintéticos.
+
+Siembra una BD temporal (ver benchmarks/seed.py), invoca los callbacks de
+los cogs con un FakeInteraction y reporta latencia p50/p95/p99, consultas
+y conexiones por llamada y memoria pico por comando.
+
+Uso:
+    python benchmarks/bench_commands.py --users 1000 --games 100000 --iterations 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite
+
+from benchmarks.fakes import FakeInteraction, FakeUser
+from benchmarks.seed import prepare
+from utils.metrics import percentile
+
+
+class QueryCounter:
+    """Cuenta conexiones y sentencias SQL (sin PRAGMAs) a nivel de aiosqlite"""
+
+    def __init__(self):
+        self.queries = 0
+        self.connections = 0
+
+    def install(self):
+        original_execute = aiosqlite.Connection.execute
+        original_connect = aiosqlite.connect
+        counter = self
+
+        def execute(conn, sql, parameters=None):
+            if not sql.lstrip().upper().startswith('PRAGMA'):
+                counter.queries += 1
+            return original_execute(conn, sql, parameters)
+
+        def connect(*args, **kwargs):
+            counter.connections += 1
+            return original_connect(*args, **kwargs)
+
+        aiosqlite.Connection.execute = execute
+        aiosqlite.connect = connect
+
+    def reset(self):
+        self.queries = 0
+        self.connections = 0
+
+
+def stop_cog_loops(bot):
+    """Cancela los tasks.loop que arrancan los cogs: este bot nunca inicia sesión"""
+    from discord.ext import tasks
+
+    for cog in bot.cogs.values():
+        for name, attr in vars(type(cog)).items():
+            if isinstance(attr, tasks.Loop):
+                getattr(cog, name).cancel()
+
+
+def build_calls(cogs: dict) -> dict:
+    """Comando -> función que arma una invocación nueva"""
+    ranking = cogs['Ranking']
+
+    def call(command, *extra):
+        async def invoke(user_id):
+            interaction = FakeInteraction(FakeUser(user_id))
+            await command.callback(ranking, interaction, *extra)
+            return interaction
+        return invoke
+
+    return {
+        'ranking': call(ranking.ranking),
+        'tablero': call(ranking.tablero),
+        'mi-posicion': call(ranking.mi_posicion),
+        'estadisticas': lambda uid: call(ranking.estadisticas, FakeUser(uid))(uid),
+    }
+
+
+async def main(args):
+    import discord
+    from discord.ext import commands
+
+    summary = await prepare(args.users, args.games, args.seed)
+    print(f"✅ BD sintética: {summary['users']} usuarios, {summary['games']} juegos")
+
+    bot = commands.Bot(command_prefix='!', intents=discord.Intents.default())
+    await bot.load_extension('cogs.ranking')
+    stop_cog_loops(bot)
+
+    counter = QueryCounter()
+    counter.install()
+
+    from models.profiler import profiler
+    if args.profile_sql:
+        profiler.enabled = True
+        profiler.slow_ms = args.slow_ms
+
+    user_ids = list(range(1, args.users + 1))
+    calls = build_calls(bot.cogs)
+    selected = args.commands or list(calls)
+
+    print(f"\n{'comando':<14} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'consultas':>10} {'conexiones':>11} {'pico MB':>8}")
+
+    for name in selected:
+        invoke = calls[name]
+        latencies = []
+        queries = connections = 0
+
+        # Los comandos imprimen progreso: silenciarlo durante la medición
+        with contextlib.redirect_stdout(io.StringIO()):
+            await invoke(random.choice(user_ids))  # calentamiento
+
+            for _ in range(args.iterations):
+                counter.reset()
+                start = time.perf_counter()
+                await invoke(random.choice(user_ids))
+                latencies.append((time.perf_counter() - start) * 1000)
+                queries += counter.queries
+                connections += counter.connections
+
+            # Memoria en una pasada aparte: tracemalloc distorsiona la latencia
+            tracemalloc.start()
+            await invoke(random.choice(user_ids))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        print(f'{name:<14} {len(latencies):>4} {percentile(latencies, 50):>9.1f} '
+              f'{percentile(latencies, 95):>9.1f} {percentile(latencies, 99):>9.1f} '
+              f'{queries / len(latencies):>10.1f} {connections / len(latencies):>11.1f} '
+              f'{peak / 1024 / 1024:>8.1f}')
+
+    if args.profile_sql:
+        print(f'\n🔬 Consultas que más tiempo acumulan:\n{profiler.report()}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de comandos de ranking/dashboard')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--commands', nargs='*', choices=['ranking', 'tablero', 'mi-posicion', 'estadisticas'])
+    parser.add_argument('--keep', action='store_true', help='Conservar la BD sembrada')
+    parser.add_argument('--profile-sql', action='store_true', help='Activar el profiler de SQL')
+    parser.add_argument('--slow-ms', type=float, default=100, help='Umbral del log de consultas lentas')
+    args = parser.parse_args()
+
+    # Trabajar sobre una BD temporal para no tocar data/games.db
+    workdir = tempfile.mkdtemp(prefix='bench_commands_')
+    os.chdir(workdir)
+    try:
+        asyncio.run(main(args))
+    finally:
+        if args.keep:
+            print(f'\n💾 BD conservada en {workdir}/data/games.db')
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
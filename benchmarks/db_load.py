@@ -0,0 +1,184 @@
+"""Prueba de carga de la capa de BD con tráfico mixto de lectura y escritura.
+
+Simula la ráfaga de fin de mes: muchos /registrar concurrentes, admins
+aprobando y usuarios consultando el ranking al mismo tiempo. Reporta
+latencias y cuántas operaciones fallaron (p. ej. "database is locked").
+
+Uso:
+    python benchmarks/db_load.py --users 200 --writers 50 --readers 50 --rounds 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metrics import percentile
+
+
+async def timed(bucket: dict, name: str, coro):
+    """Ejecuta una corrutina y guarda su latencia (o el error)"""
+    start = time.perf_counter()
+    try:
+        result = await coro
+        if result is False:
+            bucket.setdefault(f'{name}_errors', []).append(1)
+        bucket.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+    except Exception as e:
+        bucket.setdefault(f'{name}_errors', []).append(str(e))
+
+
+async def check_event_log():
+    """Compara los agregados plegados incrementalmente con un replay completo"""
+    from models.database import get_read_db
+    from models.events import GameEvent
+    from models.user import User
+
+    async def daily_rows():
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('SELECT * FROM daily_stats WHERE games OR points OR platinums ORDER BY 1, 2, 3')
+            return await cursor.fetchall()
+        finally:
+            await db.close()
+
+    async def user_stats_rows():
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT contest_id, discord_id, games, points, platinums, recompleted,
+                       categories, platforms, top_games
+                FROM user_stats WHERE games > 0 ORDER BY 1, 2
+            ''')
+            return await cursor.fetchall()
+        finally:
+            await db.close()
+
+    folded = {user.discord_id: (user.total_points, user.total_games) for user in await User.get_all_ranked()}
+    folded_daily = await daily_rows()
+    folded_user_stats = await user_stats_rows()
+    mismatched_games = await GameEvent.verify()
+    events = await GameEvent.replay_scores()
+    replayed = {user.discord_id: (user.total_points, user.total_games) for user in await User.get_all_ranked()}
+
+    if folded_daily != await daily_rows():
+        print('❌ daily_stats plegado no coincide con el replay')
+    if folded_user_stats != await user_stats_rows():
+        print('❌ user_stats plegado no coincide con el replay')
+    if folded == replayed and not mismatched_games:
+        print(f'🧾 Log de eventos: {events} eventos, replay == agregados incrementales')
+    else:
+        drift = [uid for uid in folded if folded[uid] != replayed.get(uid)]
+        print(f'❌ Log de eventos inconsistente: {len(drift)} usuarios, {len(mismatched_games)} juegos')
+
+    # BD migrada: la primera mitad del log se escribió antes de las columnas
+    # day/platinums_delta. daily_stats ya es lo que dejó el bootstrap más lo
+    # plegado después, así que el replay debe reproducirlo igual
+    from models.database import DATABASE_PATH
+
+    before = await daily_rows()
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        trigger = conn.execute('''
+            SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'game_events_no_update'
+        ''').fetchone()[0]
+        conn.execute('DROP TRIGGER game_events_no_update')
+        conn.execute('''
+            UPDATE game_events SET day = NULL, platinums_delta = 0
+            WHERE id <= (SELECT MAX(id) / 2 FROM game_events)
+        ''')
+        conn.execute(trigger)
+        conn.commit()
+    finally:
+        conn.close()
+
+    await GameEvent.replay_scores()
+    if before == await daily_rows():
+        print('🧾 Replay de una BD migrada (eventos sin day): daily_stats intacto')
+    else:
+        print('❌ El replay de una BD migrada cambió daily_stats')
+
+
+async def main(args):
+    from models.database import init_db
+    from models.batcher import db_writer
+    from models.game import Game
+    from models.user import User
+
+    await init_db()
+
+    user_ids = list(range(1, args.users + 1))
+    await asyncio.gather(*[User.create(uid, f'user{uid}') for uid in user_ids])
+
+    results = {}
+    start = time.perf_counter()
+
+    for round_num in range(args.rounds):
+        tasks = []
+
+        # Registros concurrentes
+        for i in range(args.writers):
+            uid = random.choice(user_ids)
+            tasks.append(timed(results, 'registrar', Game.create(
+                uid, f'user{uid}', f'Juego {round_num}-{i}',
+                random.choice(['Retro', 'Indie', 'AA', 'AAA']),
+                random.choice(['PS5', 'Steam']),
+                random.random() < 0.2, False
+            )))
+
+        # Un admin aprobando lo pendiente de la ronda anterior
+        pending = await Game.get_pending()
+        for game in pending[:args.writers // 2]:
+            # Aprobar ya pliega el evento sobre los puntos del usuario
+            tasks.append(timed(results, 'aprobar', Game.approve(game.id, 1)))
+
+        # Lecturas concurrentes
+        for _ in range(args.readers):
+            tasks.append(timed(results, 'ranking', User.get_all_ranked()))
+            tasks.append(timed(results, 'mis_juegos', Game.get_by_user(random.choice(user_ids))))
+
+        random.shuffle(tasks)
+        await asyncio.gather(*tasks)
+
+    elapsed = time.perf_counter() - start
+
+    print(f'\n⏱️ Total: {elapsed:.2f}s en {args.rounds} rondas\n')
+    print(f"{'operación':<14} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errores':>8}")
+    for name in ['registrar', 'aprobar', 'ranking', 'mis_juegos']:
+        values = results.get(name, [])
+        errors = len(results.get(f'{name}_errors', []))
+        print(f'{name:<14} {len(values):>6} {percentile(values, 50):>8.1f} '
+              f'{percentile(values, 95):>8.1f} {percentile(values, 99):>8.1f} {errors:>8}')
+
+    all_errors = [e for key, errs in results.items() if key.endswith('_errors') for e in errs]
+    if all_errors:
+        print(f'\n❌ Ejemplos de error: {all_errors[:3]}')
+
+    print(f'\n📦 Escritor: {db_writer.get_stats()}')
+    await check_event_log()
+    if results.get('ranking'):
+        print(f"📊 Lectura media: {statistics.mean(results['ranking']):.1f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prueba de carga de la BD')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--writers', type=int, default=50, help='Registros concurrentes por ronda')
+    parser.add_argument('--readers', type=int, default=50, help='Lecturas concurrentes por ronda')
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    # Trabajar sobre una BD temporal para no tocar data/games.db
+    workdir = tempfile.mkdtemp(prefix='db_load_')
+    os.chdir(workdir)
+    try:
+        asyncio.run(main(args))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
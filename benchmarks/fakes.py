@@ -0,0 +1,67 @@
+"""Dobles mínimos de discord.Interaction para invocar callbacks de cogs sin gateway."""
+
+
+class FakeUser:
+    """Usuario/miembro con lo que leen los cogs"""
+
+    def __init__(self, user_id: int, name: str = None):
+        self.id = user_id
+        self.name = name or f'jugador{user_id}'
+        self.display_name = self.name
+        self.mention = f'<@{user_id}>'
+        self.roles = []
+
+    async def send(self, *args, **kwargs):
+        return None
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int = 1, name: str = 'Benchmark'):
+        self.id = guild_id
+        self.name = name
+
+
+class FakeResponse:
+    """Registra lo que el comando habría enviado a Discord"""
+
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self) -> bool:
+        return self.done
+
+    async def defer(self, *args, **kwargs):
+        self.done = True
+
+    async def send_message(self, *args, **kwargs):
+        self.done = True
+        self.interaction.sent.append(kwargs)
+
+    async def edit_message(self, *args, **kwargs):
+        self.done = True
+        self.interaction.sent.append(kwargs)
+
+    async def send_modal(self, modal):
+        self.done = True
+        self.interaction.sent.append({'modal': modal})
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, *args, **kwargs):
+        self.interaction.sent.append(kwargs)
+
+
+class FakeInteraction:
+    """Sustituto de discord.Interaction para benchmarks"""
+
+    def __init__(self, user: FakeUser, guild: FakeGuild = None):
+        self.user = user
+        self.guild = guild or FakeGuild()
+        self.guild_id = self.guild.id
+        self.sent = []
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
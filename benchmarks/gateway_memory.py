@@ -0,0 +1,160 @@
+"""Memoria de las cachés del gateway con un servidor grande sintético.
+
+Construye el estado de discord.py como lo haría un GUILD_CREATE de un
+servidor con muchos miembros, seguido de una ráfaga de MESSAGE_CREATE, y
+mide lo que queda retenido: la memoria asignada por Python (tracemalloc) y
+la residente (RSS) del proceso al final. Ambas políticas procesan los mismos
+payloads, así que la diferencia de RSS es lo que retienen las cachés. Cada
+política corre en un proceso aparte para que no se contaminen:
+
+    antes   -> members + message_content, caché de miembros por defecto y
+               1000 mensajes (la configuración anterior del bot)
+    config  -> lo que construye bot.py con las variables de config.py
+
+Uso:
+    python benchmarks/gateway_memory.py --members 100000 --messages 5000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+GUILD_ID = 900000000000000000
+CHANNEL_ID = 900000000000000001
+USER_BASE = 100000000000000000
+POLICIES = ['antes', 'config']
+
+
+def rss_mb() -> float:
+    """Memoria residente del proceso (Linux)"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _user(i: int) -> dict:
+    return {'id': str(USER_BASE + i), 'username': f'jugador{i}', 'discriminator': '0',
+            'global_name': None, 'avatar': None}
+
+
+def guild_payload(members: int) -> dict:
+    """GUILD_CREATE de un servidor grande (con la lista completa de miembros)"""
+    return {
+        'id': str(GUILD_ID), 'name': 'Servidor grande', 'owner_id': str(USER_BASE),
+        'member_count': members, 'large': True, 'features': [], 'emojis': [], 'stickers': [],
+        'roles': [{'id': str(GUILD_ID), 'name': '@everyone', 'permissions': '0', 'position': 0,
+                   'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}],
+        'channels': [{'id': str(CHANNEL_ID), 'type': 0, 'name': 'general', 'position': 0,
+                      'permission_overwrites': []}],
+        'members': [
+            {'user': _user(i), 'roles': [], 'joined_at': '2025-01-01T00:00:00+00:00',
+             'deaf': False, 'mute': False, 'flags': 0}
+            for i in range(members)
+        ],
+    }
+
+
+def message_payload(i: int, members: int) -> dict:
+    author = i % members
+    return {
+        'id': str(800000000000000000 + i), 'channel_id': str(CHANNEL_ID), 'guild_id': str(GUILD_ID),
+        'author': _user(author), 'member': {'roles': [], 'joined_at': '2025-01-01T00:00:00+00:00', 'flags': 0},
+        'content': 'Terminé Hollow Knight con platino!' * 3, 'timestamp': '2026-01-01T00:00:00+00:00',
+        'edited_timestamp': None, 'tts': False, 'mention_everyone': False, 'mentions': [],
+        'mention_roles': [], 'attachments': [], 'embeds': [], 'pinned': False, 'type': 0,
+    }
+
+
+def client_options(policy: str) -> dict:
+    import discord
+
+    if policy == 'antes':
+        intents = discord.Intents.default()
+        intents.members = True
+        intents.message_content = True
+        return dict(intents=intents, max_messages=1000)
+
+    import bot
+    intents = bot.build_intents()
+    return dict(
+        intents=intents,
+        member_cache_flags=bot.build_member_cache(intents),
+        chunk_guilds_at_startup=bot.config.CHUNK_GUILDS,
+        max_messages=bot.config.MESSAGE_CACHE_SIZE or None,
+    )
+
+
+async def measure(policy: str, members: int, messages: int) -> dict:
+    import discord
+
+    client = discord.Client(**client_options(policy))
+    state = client._connection
+
+    # Los payloads se construyen antes de medir: no son parte de la caché
+    guild_data = guild_payload(members)
+    message_data = [message_payload(i, members) for i in range(messages)]
+
+    tracemalloc.start()
+    state._add_guild_from_data(guild_data)
+    del guild_data
+    for data in message_data:
+        state.parse_message_create(data)
+    del message_data
+    gc.collect()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    guild = client.get_guild(GUILD_ID)
+    return {
+        'policy': policy,
+        'cached_members': len(guild._members),
+        'cached_messages': len(state._messages or []),
+        'rss_mb': rss_mb(),
+        'traced_mb': traced / 1024 / 1024,
+    }
+
+
+def run_policy(policy: str, args) -> dict:
+    result = subprocess.run(
+        [sys.executable, __file__, '--run', policy,
+         '--members', str(args.members), '--messages', str(args.messages)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(args):
+    if args.run:
+        print(json.dumps(asyncio.run(measure(args.run, args.members, args.messages))))
+        return
+
+    print(f'🏟️ Servidor sintético: {args.members} miembros, {args.messages} mensajes\n')
+    print(f"{'política':<10} {'miembros':>10} {'mensajes':>10} {'RSS MB':>10} {'retenido MB':>12}")
+    results = [run_policy(policy, args) for policy in POLICIES]
+    for r in results:
+        print(f"{r['policy']:<10} {r['cached_members']:>10} {r['cached_messages']:>10} "
+              f"{r['rss_mb']:>10.1f} {r['traced_mb']:>12.1f}")
+
+    before, after = results
+    if before['rss_mb'] > 0:
+        saved = before['rss_mb'] - after['rss_mb']
+        print(f"\n📉 Ahorro: {saved:.1f} MB de RSS ({saved / before['rss_mb']:.0%})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Memoria de intents y cachés del gateway')
+    parser.add_argument('--members', type=int, default=100000)
+    parser.add_argument('--messages', type=int, default=5000)
+    parser.add_argument('--run', choices=POLICIES, help=argparse.SUPPRESS)
+    main(parser.parse_args())
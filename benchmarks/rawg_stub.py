@@ -0,0 +1,213 @@
+"""Servidor local que imita la API de RAWG a partir de fixtures grabados.
+
+Sirve /api/games?search=... y /api/games/<id> desde benchmarks/rawg_fixtures/
+con latencia, tasa de errores 5xx y tasa de 429 configurables, para probar
+el autocompletado y la caché sin depender de la API real.
+
+Con --record y una RAWG_API_KEY válida, las búsquedas que no tengan
+resultados locales se piden a la API real y se agregan al catálogo.
+
+Uso:
+    python benchmarks/rawg_stub.py --port 8765 --latency-ms 150 --error-rate 0.02 --rate-limit 0.05
+    RAWG_BASE_URL=http://127.0.0.1:8765/api python bot.py
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import unicodedata
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import urlopen
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rawg_fixtures')
+UPSTREAM_URL = 'https://api.rawg.io/api'
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9 ]+', ' ', text).strip()
+
+
+class RAWGStandIn:
+    """Réplica de RAWG en un hilo aparte (http.server)"""
+
+    def __init__(self, fixtures_dir: str = FIXTURES_DIR, host: str = '127.0.0.1', port: int = 0,
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 rate_limit: float = 0, record: bool = False, api_key: str = None):
+        self.fixtures_dir = fixtures_dir
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.record = record
+        self.api_key = api_key
+
+        self.games = {}
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'search': 0, 'details': 0, 'errors': 0, 'rate_limited': 0, 'recorded': 0}
+        self.server = None
+        self.thread = None
+        self.load()
+
+    @property
+    def catalog_path(self) -> str:
+        return os.path.join(self.fixtures_dir, 'games.json')
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}/api'
+
+    def load(self):
+        with open(self.catalog_path, encoding='utf-8') as f:
+            self.games = {game['id']: game for game in json.load(f)}
+
+    def save(self):
+        with open(self.catalog_path, 'w', encoding='utf-8') as f:
+            json.dump(list(self.games.values()), f, indent=2, ensure_ascii=False)
+
+    # ---- Respuestas ----
+
+    def search(self, query: str, page_size: int) -> list:
+        """Coincidencia por prefijo de palabra, como la búsqueda difusa de RAWG"""
+        words = _normalize(query).split()
+        if not words:
+            return []
+
+        def matches(game, require_all):
+            name_words = _normalize(game['name']).split()
+            hits = [any(n.startswith(w) for n in name_words) for w in words]
+            return all(hits) if require_all else any(hits)
+
+        results = [g for g in self.games.values() if matches(g, True)]
+        if not results:
+            results = [g for g in self.games.values() if matches(g, False)]
+
+        results.sort(key=lambda g: g.get('added') or 0, reverse=True)
+        return results[:page_size]
+
+    def record_search(self, query: str, page_size: int) -> list:
+        """Pide la búsqueda a la API real y agrega los resultados al catálogo"""
+        params = urlencode({'key': self.api_key, 'search': query, 'page_size': page_size})
+        with urlopen(f'{UPSTREAM_URL}/games?{params}', timeout=10) as response:
+            results = json.load(response).get('results', [])
+
+        with self.lock:
+            for game in results:
+                self.games.setdefault(game['id'], game)
+            self.save()
+            self.stats['recorded'] += len(results)
+        return results
+
+    # ---- Servidor ----
+
+    def start(self) -> str:
+        """Arranca en segundo plano y retorna la URL base para RAWG_BASE_URL"""
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status: int, payload, headers: dict = None):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+                with stand_in.lock:
+                    stand_in.stats['requests'] += 1
+
+                delay = stand_in.latency_ms + random.uniform(0, stand_in.jitter_ms)
+                if delay:
+                    time.sleep(delay / 1000)
+
+                roll = random.random()
+                if roll < stand_in.rate_limit:
+                    with stand_in.lock:
+                        stand_in.stats['rate_limited'] += 1
+                    return self.send_json(429, {'detail': 'Request was throttled.'}, {'Retry-After': '1'})
+                if roll < stand_in.rate_limit + stand_in.error_rate:
+                    with stand_in.lock:
+                        stand_in.stats['errors'] += 1
+                    return self.send_json(500, {'detail': 'Internal server error'})
+
+                if url.path.rstrip('/') == '/api/games':
+                    query = params.get('search', '')
+                    page_size = int(params.get('page_size', 20))
+                    with stand_in.lock:
+                        stand_in.stats['search'] += 1
+                    results = stand_in.search(query, page_size)
+                    if not results and stand_in.record and stand_in.api_key:
+                        try:
+                            results = stand_in.record_search(query, page_size)
+                        except Exception as e:
+                            print(f'⚠️ [RAWG STUB] No se pudo grabar "{query}": {e}')
+                    return self.send_json(200, {'count': len(results), 'next': None, 'previous': None, 'results': results})
+
+                match = re.fullmatch(r'/api/games/(\d+)/?', url.path)
+                if match:
+                    with stand_in.lock:
+                        stand_in.stats['details'] += 1
+                    game = stand_in.games.get(int(match.group(1)))
+                    if game:
+                        return self.send_json(200, game)
+
+                return self.send_json(404, {'detail': 'Not found.'})
+
+        return Handler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Réplica local de la API de RAWG')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0, help='Fracción de respuestas 500')
+    parser.add_argument('--rate-limit', type=float, default=0, help='Fracción de respuestas 429')
+    parser.add_argument('--record', action='store_true', help='Grabar búsquedas desconocidas desde la API real')
+    args = parser.parse_args()
+
+    stand_in = RAWGStandIn(
+        args.fixtures, args.host, args.port, args.latency_ms, args.jitter_ms,
+        args.error_rate, args.rate_limit, args.record, os.getenv('RAWG_API_KEY')
+    )
+    url = stand_in.start()
+    print(f'🎮 RAWG simulado en {url} ({len(stand_in.games)} juegos)')
+    print(f'   RAWG_BASE_URL={url}')
+
+    try:
+        stand_in.thread.join()
+    except KeyboardInterrupt:
+        stand_in.stop()
+        print(f'\n📊 {stand_in.stats}')
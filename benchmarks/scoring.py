@@ -0,0 +1,62 @@
+"""Puntuar muchos juegos: cálculo por juego de antes vs. el motor compilado.
+
+Genera juegos sintéticos (misma mezcla de categorías que seed.py) y mide:
+
+    antes      -> PUNTOS_CATEGORIA[category.lower()] + platino, juego por juego
+    score      -> scoring.score() juego por juego
+    score_many -> scoring.score_many() sobre columnas paralelas
+
+Uso:
+    python benchmarks/scoring.py --games 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from benchmarks.seed import CATEGORY_WEIGHTS, PLATINUM_RATE, RECOMPLETED_RATE, _weighted
+from utils.calculators import scoring
+
+
+def legacy_points(category: str, has_platinum: bool) -> int:
+    points = config.PUNTOS_CATEGORIA[category.lower()]
+    if has_platinum:
+        points += config.PUNTOS_CATEGORIA['platino']
+    return points
+
+
+def timed_ms(func) -> tuple:
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(args):
+    random.seed(42)
+    categories = [_weighted(CATEGORY_WEIGHTS) for _ in range(args.games)]
+    platinums = [int(random.random() < PLATINUM_RATE[c]) for c in categories]
+    recompleted = [int(random.random() < RECOMPLETED_RATE) for _ in categories]
+
+    legacy, legacy_ms = timed_ms(lambda: [legacy_points(c, p) for c, p in zip(categories, platinums)])
+    scalar, scalar_ms = timed_ms(lambda: [scoring.score(c, p, r) for c, p, r in zip(categories, platinums, recompleted)])
+    bulk, bulk_ms = timed_ms(lambda: scoring.score_many(categories, platinums, recompleted))
+
+    print(f'🧮 {args.games} juegos\n')
+    print(f"{'método':<12} {'ms':>10} {'juegos/ms':>12}")
+    for name, ms in (('antes', legacy_ms), ('score', scalar_ms), ('score_many', bulk_ms)):
+        print(f'{name:<12} {ms:>10.1f} {args.games / ms:>12.0f}')
+
+    if legacy == list(scalar) == list(bulk):
+        print('\n✅ Los tres métodos dan los mismos puntos')
+    else:
+        print('\n❌ Los métodos no coinciden')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rendimiento del motor de puntos')
+    parser.add_argument('--games', type=int, default=100000)
+    main(parser.parse_args())
@@ -0,0 +1,188 @@
+"""Generador de datos sintéticos para data/games.db.
+
+Crea usuarios y juegos con distribuciones parecidas a las reales: pocos
+usuarios muy activos y una cola larga, más Indie/AA que Retro, platinos
+más frecuentes en juegos cortos y la mayoría de los registros aprobados.
+
+Uso:
+    python benchmarks/seed.py --users 1000 --games 100000            # BD temporal
+    python benchmarks/seed.py --database /ruta/games.db              # BD indicada
+    python benchmarks/seed.py --yes                                  # data/games.db del cwd
+
+Solo siembra BDs sin log de eventos: game_events es append-only y
+los agregados se reconstruyen desde él, así que una BD con historia no se
+puede vaciar sin romper la verificación del replay.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from utils.validators import title_key
+from utils.calculators import scoring
+from models.events import BOOTSTRAP_STATEMENTS
+
+# Distribuciones aproximadas observadas en el concurso
+CATEGORY_WEIGHTS = {'Indie': 0.35, 'AA': 0.30, 'AAA': 0.25, 'Retro': 0.10}
+PLATFORM_WEIGHTS = {'PS5': 0.55, 'Steam': 0.45}
+PLATINUM_RATE = {'Indie': 0.25, 'AA': 0.15, 'AAA': 0.10, 'Retro': 0.05}
+STATUS_WEIGHTS = {'APPROVED': 0.85, 'PENDING': 0.10, 'REJECTED': 0.05}
+RECOMPLETED_RATE = 0.05
+
+GAME_TITLES = [
+    'Hollow Knight', 'Celeste', 'Hades', 'Elden Ring', 'God of War', 'Resident Evil 4',
+    'Stardew Valley', 'The Last of Us Part I', 'Final Fantasy VII', 'Dead Cells',
+    'Cuphead', 'Spider-Man', 'Horizon Zero Dawn', 'Persona 5 Royal', 'Sekiro',
+    'Tunic', 'Inside', 'Limbo', 'Metal Gear Solid', 'Castlevania', 'Chrono Trigger',
+]
+
+
+def _weighted(weights: dict) -> str:
+    return random.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _games_per_user(users: int, games: int) -> list:
+    """Reparte los juegos con una cola larga (Pareto)"""
+    raw = [random.paretovariate(1.5) for _ in range(users)]
+    total = sum(raw)
+    counts = [int(games * value / total) for value in raw]
+
+    # Ajustar el redondeo para llegar exactamente al total
+    for i in range(games - sum(counts)):
+        counts[i % users] += 1
+    return counts
+
+
+def seed(database_path: str, users: int, games: int, rng_seed: int = 42) -> dict:
+    """Llena la BD con datos sintéticos y retorna un resumen"""
+    random.seed(rng_seed)
+
+    conn = sqlite3.connect(database_path)
+    try:
+        if conn.execute('SELECT EXISTS(SELECT 1 FROM game_events)').fetchone()[0]:
+            raise RuntimeError(
+                f'{database_path} ya tiene eventos en game_events; siembra una BD nueva'
+            )
+
+        conn.execute('DELETE FROM games')
+        conn.execute('DELETE FROM users')
+        conn.execute('DELETE FROM contest_scores')
+        conn.execute('DELETE FROM daily_stats')
+        conn.execute('DELETE FROM user_stats')
+
+        user_rows = [
+            (uid, f'jugador{uid}', (config.CONTEST_START_DATE + timedelta(days=random.randint(0, 30))).isoformat())
+            for uid in range(1, users + 1)
+        ]
+        conn.executemany('INSERT INTO users (discord_id, username, join_date) VALUES (?, ?, ?)', user_rows)
+
+        end = min(datetime.now(), config.CONTEST_END_DATE)
+        span = max(1, int((end - config.CONTEST_START_DATE).total_seconds()))
+
+        unscored = []
+        for uid, count in enumerate(_games_per_user(users, games), 1):
+            for _ in range(count):
+                category = _weighted(CATEGORY_WEIGHTS)
+                has_platinum = random.random() < PLATINUM_RATE[category]
+
+                submitted = config.CONTEST_START_DATE + timedelta(seconds=random.randint(0, span))
+                status = _weighted(STATUS_WEIGHTS)
+
+                game_name = f'{random.choice(GAME_TITLES)} #{random.randint(1, 5000)}'
+                unscored.append((
+                    uid, f'jugador{uid}', game_name, title_key(game_name),
+                    category, _weighted(PLATFORM_WEIGHTS),
+                    int(has_platinum), int(random.random() < RECOMPLETED_RATE),
+                    status, submitted.strftime('%Y-%m-%d %H:%M:%S'),
+                    1 if status != 'PENDING' else None,
+                ))
+
+        # Puntos de todos los juegos en una pasada del motor
+        points = scoring.score_many(
+            [row[4] for row in unscored], [row[6] for row in unscored], [row[7] for row in unscored]
+        )
+        game_rows = [(*row[:8], row_points, *row[8:]) for row, row_points in zip(unscored, points)]
+
+        conn.executemany('''
+            INSERT INTO games (
+                discord_user_id, username, game_name, title_key, category, platform,
+                has_platinum, is_recompleted, total_points, status,
+                submission_date, reviewed_by
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', game_rows)
+
+        # Totales de usuarios en una sola pasada
+        conn.execute('''
+            UPDATE users
+            SET total_points = COALESCE((
+                    SELECT SUM(total_points) FROM games
+                    WHERE discord_user_id = users.discord_id AND status = 'APPROVED'
+                ), 0),
+                total_games = (
+                    SELECT COUNT(*) FROM games
+                    WHERE discord_user_id = users.discord_id AND status = 'APPROVED'
+                )
+        ''')
+        # Todo lo sembrado cae en el concurso por defecto
+        conn.execute('''
+            INSERT INTO contest_scores (contest_id, discord_id, total_points, total_games)
+            SELECT contest_id, discord_user_id, SUM(total_points), COUNT(*)
+            FROM games
+            WHERE status = 'APPROVED'
+            GROUP BY contest_id, discord_user_id
+        ''')
+        # Eventos de lo sembrado (la BD recién creada no tiene log todavía)
+        for sql in BOOTSTRAP_STATEMENTS:
+            conn.execute(sql)
+        conn.execute('''
+            UPDATE event_checkpoints
+            SET last_event_id = (SELECT COALESCE(MAX(id), 0) FROM game_events)
+            WHERE name = 'scores'
+        ''')
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {'users': users, 'games': len(game_rows)}
+
+
+async def prepare(users: int, games: int, rng_seed: int = 42, database_path: str = None) -> dict:
+    """Crea el esquema con init_db y siembra la BD (data/games.db del cwd por defecto)"""
+    from models import database
+
+    if database_path:
+        database.DATABASE_PATH = database_path
+    await database.init_db()
+    return seed(database.DATABASE_PATH, users, games, rng_seed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Siembra una BD con datos sintéticos')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help='Ruta de la BD a sembrar (por defecto, una carpeta temporal)')
+    parser.add_argument('--yes', action='store_true', help='Sembrar data/games.db de la carpeta actual')
+    args = parser.parse_args()
+
+    database_path = args.database
+    if not database_path and not args.yes:
+        # Sin destino explícito nunca se toca la BD real
+        workdir = tempfile.mkdtemp(prefix='seed_')
+        os.chdir(workdir)
+        database_path = os.path.join(workdir, 'data', 'games.db')
+
+    try:
+        summary = asyncio.run(prepare(args.users, args.games, args.seed, database_path))
+    except RuntimeError as e:
+        print(f'❌ {e}')
+        sys.exit(1)
+    print(f"✅ Sembrados {summary['users']} usuarios y {summary['games']} juegos en {database_path or 'data/games.db'}")
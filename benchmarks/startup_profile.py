@@ -0,0 +1,103 @@
+"""Perfil del arranque en frío: tiempo de import por módulo y carga de cogs.
+
+Ejecuta `python -X importtime -c "import bot"` en un proceso nuevo, agrupa
+el tiempo por paquete y luego mide, en este proceso, cuánto tarda cargar
+cada cog y cuánto costaría construir de entrada lo que ahora es diferido
+(vistas y cliente de RAWG). La conexión→ready solo se puede medir con token:
+bot.py la imprime al arrancar y avisa si supera READY_BUDGET_S.
+
+Uso:
+    python benchmarks/startup_profile.py --top 15
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def import_profile() -> list:
+    """[(módulo, propio_us, acumulado_us)] de un `import bot` en frío"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import bot'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+async def cog_load_times() -> dict:
+    import discord
+    from discord.ext import commands
+
+    bot = commands.Bot(command_prefix='!', intents=discord.Intents.default())
+    times = {}
+    for cog in ['games', 'admin', 'ranking', 'utils']:
+        start = time.perf_counter()
+        await bot.load_extension(f'cogs.{cog}')
+        times[cog] = time.perf_counter() - start
+    return times
+
+
+def deferred_costs() -> dict:
+    """Lo que el arranque ya no paga: vistas y cliente de RAWG"""
+    import importlib
+
+    costs = {}
+    for module in ('views.ranking_view', 'views.dashboard_view', 'views.help_view', 'views.review_view'):
+        start = time.perf_counter()
+        importlib.import_module(module)
+        costs[module] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    from utils.rawg_api import get_client
+    get_client()
+    costs['utils.rawg_api (cliente)'] = time.perf_counter() - start
+    return costs
+
+
+def main(args):
+    rows = import_profile()
+    if not rows:
+        print('❌ No se pudo perfilar el import de bot.py')
+        return
+
+    total = next((cum for module, _, cum in rows if module == 'bot'), sum(s for _, s, _ in rows))
+    print(f'📦 import bot: {total / 1000:.0f}ms\n')
+
+    by_package = {}
+    for module, self_us, _ in rows:
+        package = module.split('.')[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+
+    print(f"{'paquete':<24} {'ms':>8}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f'{package:<24} {self_us / 1000:>8.1f}')
+
+    print(f"\n{'módulo (acumulado)':<40} {'ms':>8}")
+    for module, _, cumulative in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f'{module:<40} {cumulative / 1000:>8.1f}')
+
+    os.chdir(ROOT)
+    print(f"\n{'cog':<24} {'ms':>8}")
+    for cog, seconds in asyncio.run(cog_load_times()).items():
+        print(f'{cog:<24} {seconds * 1000:>8.1f}')
+
+    print(f"\n{'diferido hasta el primer uso':<40} {'ms':>8}")
+    for name, seconds in deferred_costs().items():
+        print(f'{name:<40} {seconds * 1000:>8.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Perfil de arranque del bot')
+    parser.add_argument('--top', type=int, default=15)
+    main(parser.parse_args())
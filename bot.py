@@ -1,28 +1,69 @@
+import time
+# Marcas del arranque: imports -> cogs -> conexión -> on_ready
+STARTUP = {'start': time.perf_counter()}
+
 import discord
 from discord.ext import commands
 import config
 import asyncio
 import os
 from models.database import init_db
+from utils.metrics import InstrumentedTree, install_view_hooks, start_http_server
+from utils.loop_monitor import loop_monitor
+from utils.command_sync import sync_if_changed
+from utils.shared_state import shared_state
+
+STARTUP['imports'] = time.perf_counter()
+
+def build_intents() -> discord.Intents:
+    """Solo los intents que el bot usa (configurables en config.py)"""
+    intents = discord.Intents.default()
+    intents.members = config.INTENT_MEMBERS
+    intents.message_content = config.INTENT_MESSAGE_CONTENT
+    # Nada escucha eventos de escritura ni de voz
+    intents.typing = False
+    intents.voice_states = False
+    return intents
+
+def build_member_cache(intents: discord.Intents) -> discord.MemberCacheFlags:
+    """Sin caché de miembros salvo que se pida (y haya intent para mantenerla)"""
+    if config.CACHE_MEMBERS and intents.members:
+        return discord.MemberCacheFlags.from_intents(intents)
+    return discord.MemberCacheFlags.none()
 
 # Configurar intents
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
+intents = build_intents()
+
+def build_bot() -> commands.Bot:
+    """Bot normal, o AutoShardedBot si SHARD_COUNT está configurado"""
+    options = dict(
+        command_prefix='!',  # Prefix para comandos de texto (opcional)
+        intents=intents,
+        help_command=None,  # Desactivamos el comando help por defecto
+        tree_cls=InstrumentedTree,  # Mide cada comando y autocompletado
+        member_cache_flags=build_member_cache(intents),
+        chunk_guilds_at_startup=config.CHUNK_GUILDS,
+        max_messages=config.MESSAGE_CACHE_SIZE or None
+    )
+    
+    if not config.SHARD_COUNT:
+        return commands.Bot(**options)
+    
+    # "auto": Discord decide cuántos shards y este proceso los abre todos
+    if config.SHARD_COUNT != 'auto':
+        options['shard_count'] = int(config.SHARD_COUNT)
+        if config.SHARD_IDS:
+            options['shard_ids'] = config.SHARD_IDS
+    elif config.SHARD_IDS:
+        print('⚠️ SHARD_IDS se ignora con SHARD_COUNT=auto')
+    
+    return commands.AutoShardedBot(**options)
 
 # Crear el bot
-bot = commands.Bot(
-    command_prefix='!',  # Prefix para comandos de texto (opcional)
-    intents=intents,
-    help_command=None  # Desactivamos el comando help por defecto
-)
+bot = build_bot()
 
-@bot.event
-async def on_ready():
-    print(f'✅ Bot conectado exitosamente!')
-    print(f'Usuario: {bot.user.name}')
-    print(f'ID: {bot.user.id}')
-    
+async def setup_hook():
+    """Inicialización única por proceso (antes de conectar al gateway)"""
     # Inicializar base de datos
     print('🔧 Inicializando base de datos...')
     try:
@@ -33,17 +74,42 @@ async def on_ready():
         import traceback
         traceback.print_exc()
     
-    # Sincronizar comandos
-    print('🔧 Sincronizando comandos...')
-    try:
-        guild = discord.Object(id=config.GUILD_ID)
-        bot.tree.copy_global_to(guild=guild)
-        await bot.tree.sync(guild=guild)
-        print('✅ Comandos sincronizados')
-    except Exception as e:
-        print(f'❌ Error sincronizando comandos: {e}')
+    # Limpiar lo que expiró en el estado compartido entre shards
+    purged = await asyncio.to_thread(shared_state.purge_expired)
+    if purged:
+        print(f'🧹 Estado compartido: {purged} claves expiradas eliminadas')
+    
+    # Sincronizar comandos solo si el árbol cambió desde la última vez
+    print('🔧 Verificando comandos...')
+    for guild_id in config.GUILD_IDS:
+        try:
+            await sync_if_changed(bot, guild_id, force=config.FORCE_COMMAND_SYNC)
+        except Exception as e:
+            print(f'❌ Error sincronizando comandos en {guild_id}: {e}')
+    
+    STARTUP['setup'] = time.perf_counter()
+
+bot.setup_hook = setup_hook
+
+@bot.event
+async def on_ready():
+    # on_ready se repite en cada reconexión al gateway: aquí no va trabajo pesado
+    if 'ready' in STARTUP:
+        print(f'🔄 Bot reconectado ({bot.user.name})')
+        return
+    
+    print(f'✅ Bot conectado exitosamente!')
+    print(f'Usuario: {bot.user.name}')
+    print(f'ID: {bot.user.id}')
+    if bot.shard_count:
+        print(f'Shards: {sorted(bot.shards)} de {bot.shard_count}')
+    
+    STARTUP['ready'] = time.perf_counter()
+    report_startup()
+    # Lo diferido se precarga en un hilo para que el primer uso no lo pague
+    asyncio.create_task(asyncio.to_thread(warm_up))
 
-# Evento: Cuando alguien se une al servidor
+# Evento: Cuando alguien se une al servidor (solo llega con INTENT_MEMBERS)
 @bot.event
 async def on_member_join(member):
     print(f'👋 {member.name} se unió al servidor')
@@ -60,6 +126,10 @@ async def ping(interaction: discord.Interaction):
         color=config.COLORES['info']
     )
     embed.add_field(name="Latencia", value=f"{latency}ms")
+    if bot.shard_count:
+        embed.add_field(name="Shard", value=f"{interaction.guild.shard_id if interaction.guild else 0}/{bot.shard_count}")
+    # El heartbeat solo es fiable si el loop no está bloqueado
+    embed.add_field(name="Event loop", value=loop_monitor.summary(), inline=False)
     
     await interaction.response.send_message(embed=embed)
 
@@ -97,10 +167,40 @@ async def info(interaction: discord.Interaction):
         inline=False
     )
     
+    embed.add_field(
+        name="⏱️ Event loop",
+        value=loop_monitor.summary(),
+        inline=False
+    )
+    
     embed.set_footer(text=f"Bot creado para el concurso de {interaction.guild.name}")
     
     await interaction.response.send_message(embed=embed)
 
+def report_startup():
+    """Imprime el desglose del arranque y avisa si se pasó del presupuesto"""
+    imports = STARTUP['imports'] - STARTUP['start']
+    cogs = STARTUP['cogs'] - STARTUP['imports']
+    setup = STARTUP['setup'] - STARTUP['cogs']
+    connect = STARTUP['ready'] - STARTUP['setup']
+    total = STARTUP['ready'] - STARTUP['start']
+    
+    print(f'⏱️ Arranque: imports {imports:.2f}s • cogs {cogs:.2f}s • login+setup {setup:.2f}s • '
+          f'conexión→ready {connect:.2f}s • total {total:.2f}s')
+    if connect > config.READY_BUDGET_S:
+        print(f'⚠️ Conexión→ready tardó {connect:.2f}s (presupuesto: {config.READY_BUDGET_S}s)')
+
+def warm_up():
+    """Importa las vistas y construye el cliente de RAWG fuera del event loop"""
+    import importlib
+    
+    start = time.perf_counter()
+    for module in ('views.ranking_view', 'views.dashboard_view', 'views.help_view', 'views.review_view'):
+        importlib.import_module(module)
+    from utils.rawg_api import get_client
+    get_client()
+    print(f'🔥 Precarga de vistas y RAWG lista ({time.perf_counter() - start:.2f}s)')
+
 # Función para cargar cogs (módulos)
 async def load_cogs():
     """Carga todos los módulos (cogs) del bot"""
@@ -120,8 +220,16 @@ async def load_cogs():
 
 # Función principal
 async def main():
+    install_view_hooks()
+    loop_monitor.start()
+    if config.METRICS_PORT:
+        # Un puerto por proceso: METRICS_PORT + primer shard que atiende
+        offset = config.SHARD_IDS[0] if config.SHARD_IDS else 0
+        await start_http_server(config.METRICS_HOST, config.METRICS_PORT + offset)
+    
     async with bot:
         await load_cogs()
+        STARTUP['cogs'] = time.perf_counter()
         await bot.start(config.DISCORD_TOKEN)
 
 # Ejecutar el bot
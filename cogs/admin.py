@@ -1,20 +1,27 @@
+import asyncio
+import os
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import config
+from datetime import datetime, timedelta
 from models.game import Game
 from models.user import User
-from models.database import get_db
+from models.contest import Contest
+from models.events import GameEvent, edited_statements
+from models.export import export_contest, EXPORT_QUERIES
+from models import backup
+from models.scoring import ScoringRules
+from utils.calculators import scoring
+from models.database import get_read_db
+from models.batcher import db_writer
+from utils.permissions import permissions
+from utils.metrics import metrics
+from utils.shared_state import shared_state
 
 def is_admin_user(user: discord.Member) -> bool:
-    """Verifica si un usuario es admin (función helper)"""
-    admin_roles = [1316957507982970951]  # Tu ID de rol admin
-    
-    # Verificar por rol O por permisos de administrador
-    has_admin_role = any(role.id in admin_roles for role in user.roles)
-    has_admin_perms = user.guild_permissions.administrator
-    
-    return has_admin_role or has_admin_perms
+    """Verifica si un usuario es admin (función helper, decisión cacheada)"""
+    return permissions.is_admin(user)
 
 
 def is_admin(interaction: discord.Interaction) -> bool:
@@ -22,18 +29,81 @@ def is_admin(interaction: discord.Interaction) -> bool:
     return is_admin_user(interaction.user)
 
 
+async def is_owner(interaction: discord.Interaction) -> bool:
+    """Check para comandos que ven toda la BD (todos los servidores): solo el dueño del bot"""
+    return await interaction.client.is_owner(interaction.user)
+
+
+async def contest_id_for(interaction: discord.Interaction) -> int:
+    """ID del concurso activo del servidor donde se usa el comando.
+
+    Los comandos admin buscan juegos por ID solo dentro de este concurso: un
+    admin de un servidor no puede revisar ni editar los de otro.
+    """
+    contest = await Contest.get_for_guild(interaction.guild_id)
+    return contest.id
+
+
 class Admin(commands.Cog):
     """Comandos de administración para gestionar el concurso"""
     
     def __init__(self, bot):
         self.bot = bot
     
+    async def cog_load(self):
+        if config.BACKUP_INTERVAL_H > 0:
+            self.backup_loop.start()
+    
+    async def cog_unload(self):
+        self.backup_loop.cancel()
+    
+    @tasks.loop(hours=1)
+    async def backup_loop(self):
+        """Backup en caliente de la BD cuando toca, rotando los viejos"""
+        # Un backup fallido no debe detener el loop: se registra y se
+        # reintenta en la siguiente vuelta
+        try:
+            # Con varios shards solo un proceso hace los backups
+            if not await shared_state.aclaim('backups', ttl=2 * 3600):
+                return
+            
+            last = backup.latest_backup_time()
+            if last and datetime.now() - last < timedelta(hours=config.BACKUP_INTERVAL_H):
+                return
+            
+            # La copia y la compresión corren en un hilo; el event loop sigue libre
+            result = await asyncio.to_thread(backup.run_backup)
+            removed = await asyncio.to_thread(backup.rotate)
+            print(
+                f"💾 [BACKUP] {os.path.basename(result['path'])}: {result['pages']} páginas, "
+                f"{result['bytes'] / 1024 / 1024:.1f} MB en {result['seconds']:.1f}s "
+                f"({result['restarts']} reinicios, {len(removed)} rotados)"
+            )
+        except Exception as e:
+            print(f"❌ [BACKUP] Error haciendo backup: {e}")
+    
+    @backup_loop.before_loop
+    async def before_backup_loop(self):
+        await self.bot.wait_until_ready()
+    
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Invalida el permiso cacheado cuando cambian los roles de un miembro"""
+        if before.roles != after.roles:
+            permissions.invalidate(after)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        """Un cambio de permisos en un rol puede afectar a todos sus miembros"""
+        if before.permissions != after.permissions:
+            permissions.invalidate_guild(after.guild.id)
+    
     @app_commands.command(name="pendientes", description="[ADMIN] Ver todos los juegos pendientes de aprobación")
     @app_commands.check(is_admin)
     async def pendientes(self, interaction: discord.Interaction):
         """Muestra todos los juegos pendientes de aprobación"""
         
-        games = await Game.get_pending()
+        games = await Game.get_pending(await contest_id_for(interaction))
         
         if not games:
             embed = discord.Embed(
@@ -80,7 +150,7 @@ class Admin(commands.Cog):
     async def revisar(self, interaction: discord.Interaction, game_id: int):
         """Muestra los detalles de un juego y permite aprobarlo o rechazarlo"""
         
-        game = await Game.get_by_id(game_id)
+        game = await Game.get_by_id(game_id, await contest_id_for(interaction))
         
         if not game:
             embed = discord.Embed(
@@ -185,7 +255,7 @@ class Admin(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        game = await Game.get_by_id(game_id)
+        game = await Game.get_by_id(game_id, await contest_id_for(interaction))
         
         if not game:
             embed = discord.Embed(
@@ -209,9 +279,7 @@ class Admin(commands.Cog):
         success = await Game.approve(game_id, interaction.user.id)
         
         if success:
-            # Actualizar estadísticas del usuario
-            await User.update_stats(game.discord_user_id)
-            
+            # Los puntos ya se sumaron al plegar el evento de aprobación
             # Obtener usuario actualizado
             user = await User.get(game.discord_user_id)
             
@@ -280,8 +348,12 @@ class Admin(commands.Cog):
     ) -> list[app_commands.Choice[str]]:
         """Autocompletado para juegos pendientes"""
         
+        # Solo admins ven opciones (decisión cacheada, no recorre roles)
+        if not is_admin_user(interaction.user):
+            return []
+        
         # Obtener todos los juegos pendientes
-        games = await Game.get_pending()
+        games = await Game.get_pending(await contest_id_for(interaction))
         
         if not games:
             return [app_commands.Choice(name="No hay juegos pendientes", value="0:ninguno")]
@@ -324,7 +396,7 @@ class Admin(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        game = await Game.get_by_id(game_id)
+        game = await Game.get_by_id(game_id, await contest_id_for(interaction))
         
         if not game:
             embed = discord.Embed(
@@ -403,8 +475,12 @@ class Admin(commands.Cog):
     ) -> list[app_commands.Choice[str]]:
         """Autocompletado para juegos pendientes"""
         
+        # Solo admins ven opciones (decisión cacheada, no recorre roles)
+        if not is_admin_user(interaction.user):
+            return []
+        
         # Obtener todos los juegos pendientes
-        games = await Game.get_pending()
+        games = await Game.get_pending(await contest_id_for(interaction))
         
         if not games:
             return [app_commands.Choice(name="No hay juegos pendientes", value="0:ninguno")]
@@ -425,43 +501,248 @@ class Admin(commands.Cog):
             choices.append(app_commands.Choice(name=choice_name[:100], value=choice_value[:100]))
         
         return choices
-    
-    @app_commands.command(name="marcar-elkie", description="[ADMIN] Marcar o desmarcar a un usuario como Elkie")
+
+    @app_commands.command(name="revision-masiva", description="[ADMIN] Aprobar o rechazar varios juegos pendientes a la vez")
+    @app_commands.check(is_admin)
+    async def revision_masiva(self, interaction: discord.Interaction):
+        """Abre un menú de selección múltiple sobre los juegos pendientes"""
+
+        games = await Game.get_pending(await contest_id_for(interaction))
+
+        if not games:
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['info']} Juegos Pendientes",
+                description="No hay juegos pendientes de aprobación.",
+                color=config.COLORES['info']
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        from views.review_view import BulkReviewView
+
+        view = BulkReviewView(self, interaction.user.id, games)
+        await interaction.response.send_message(embed=view.get_embed(), view=view)
+
+    @app_commands.command(name="procesar-lote", description="[ADMIN] Aprobar o rechazar todos los pendientes que cumplan un filtro")
+    @app_commands.describe(
+        accion="Qué hacer con los juegos que cumplan el filtro",
+        usuario="Solo juegos de este usuario (opcional)",
+        categoria="Solo juegos de esta categoría (opcional)",
+        plataforma="Solo juegos de esta plataforma (opcional)",
+        razon="Razón del rechazo (obligatoria al rechazar)"
+    )
+    @app_commands.choices(accion=[
+        app_commands.Choice(name=f"{config.EMOJIS['aprobar']} Aprobar", value="aprobar"),
+        app_commands.Choice(name=f"{config.EMOJIS['rechazar']} Rechazar", value="rechazar"),
+    ])
+    @app_commands.choices(categoria=[
+        app_commands.Choice(name=f"{config.EMOJIS['retro']} Retro", value="Retro"),
+        app_commands.Choice(name=f"{config.EMOJIS['indie']} Indie", value="Indie"),
+        app_commands.Choice(name=f"{config.EMOJIS['aa']} AA", value="AA"),
+        app_commands.Choice(name=f"{config.EMOJIS['aaa']} AAA", value="AAA"),
+    ])
+    @app_commands.choices(plataforma=[
+        app_commands.Choice(name=f"{config.EMOJIS['ps5']} PlayStation 5", value="PS5"),
+        app_commands.Choice(name=f"{config.EMOJIS['steam']} Steam", value="Steam"),
+    ])
+    @app_commands.check(is_admin)
+    async def procesar_lote(
+        self,
+        interaction: discord.Interaction,
+        accion: app_commands.Choice[str],
+        usuario: discord.User = None,
+        categoria: app_commands.Choice[str] = None,
+        plataforma: app_commands.Choice[str] = None,
+        razon: str = None
+    ):
+        """Revisa en bloque los juegos pendientes que cumplan los filtros"""
+
+        approve = accion.value == "aprobar"
+
+        if not approve and not razon:
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['advertencia']} Falta la Razón",
+                description="Debes indicar una razón para rechazar juegos.",
+                color=config.COLORES['info']
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        await interaction.response.defer()
+
+        games = await Game.get_pending(await contest_id_for(interaction))
+
+        # Aplicar filtros (la categoría se guarda con distintas mayúsculas)
+        if usuario:
+            games = [game for game in games if game.discord_user_id == usuario.id]
+        if categoria:
+            games = [game for game in games if game.category.lower() == categoria.value.lower()]
+        if plataforma:
+            games = [game for game in games if game.platform == plataforma.value]
+
+        if not games:
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['info']} Sin Coincidencias",
+                description="Ningún juego pendiente cumple los filtros indicados.",
+                color=config.COLORES['info']
+            )
+            await interaction.followup.send(embed=embed)
+            return
+
+        await self.run_bulk_review(interaction, [game.id for game in games], approve, razon)
+
+    async def run_bulk_review(self, interaction: discord.Interaction, game_ids: list,
+                              approve: bool, reason: str = None, view=None):
+        """Revisa varios juegos en una transacción y envía un resumen por usuario"""
+
+        games = await Game.review_many(game_ids, interaction.user.id, approve, reason)
+
+        # Agrupar juegos revisados por usuario
+        games_by_user = {}
+        for game in games:
+            games_by_user.setdefault(game.discord_user_id, []).append(game)
+
+        # Stats ya recalculadas dentro de la transacción: solo leerlas
+        users = {}
+        if approve:
+            for user_id in games_by_user:
+                users[user_id] = await User.get(user_id)
+
+        embed = self.get_bulk_summary_embed(interaction, games_by_user, users, approve, reason)
+
+        if view:
+            view.disable_all()
+            view.stop()
+            await interaction.response.edit_message(embed=embed, view=view)
+        else:
+            await interaction.followup.send(embed=embed)
+
+        # Una sola notificación por usuario afectado
+        for user_id, user_games in games_by_user.items():
+            try:
+                user_discord = await self.bot.fetch_user(user_id)
+                games_text = "\n".join(
+                    f"• **{game.game_name}** ({game.total_points} pts)" for game in user_games
+                )
+
+                if approve:
+                    notif_embed = discord.Embed(
+                        title=f"{config.EMOJIS['exito']} ¡Tus Juegos Fueron Aprobados!",
+                        description=games_text[:4000],
+                        color=config.COLORES['aprobado']
+                    )
+                    notif_embed.add_field(
+                        name=f"{config.EMOJIS['puntos']} Puntos",
+                        value=f"+{sum(game.total_points for game in user_games)} puntos",
+                        inline=True
+                    )
+                    user = users.get(user_id)
+                    if user:
+                        notif_embed.add_field(
+                            name="Total",
+                            value=f"{user.total_points} pts",
+                            inline=True
+                        )
+                else:
+                    notif_embed = discord.Embed(
+                        title=f"{config.EMOJIS['rechazar']} Tus Juegos Fueron Rechazados",
+                        description=games_text[:4000],
+                        color=config.COLORES['rechazado']
+                    )
+                    notif_embed.add_field(
+                        name="Razón",
+                        value=reason,
+                        inline=False
+                    )
+                    notif_embed.set_footer(text="Puedes registrar otro juego si cumple las reglas")
+
+                await user_discord.send(embed=notif_embed)
+            except:
+                pass
+
+    def get_bulk_summary_embed(self, interaction: discord.Interaction, games_by_user: dict,
+                               users: dict, approve: bool, reason: str = None) -> discord.Embed:
+        """Embed de resumen de una revisión masiva"""
+
+        total = sum(len(user_games) for user_games in games_by_user.values())
+
+        if not total:
+            return discord.Embed(
+                title=f"{config.EMOJIS['advertencia']} Sin Cambios",
+                description="Ninguno de los juegos seleccionados seguía pendiente.",
+                color=config.COLORES['info']
+            )
+
+        if approve:
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['aprobar']} Juegos Aprobados",
+                description=f"Se aprobaron **{total}** juego(s) de **{len(games_by_user)}** usuario(s).",
+                color=config.COLORES['aprobado']
+            )
+        else:
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['rechazar']} Juegos Rechazados",
+                description=f"Se rechazaron **{total}** juego(s) de **{len(games_by_user)}** usuario(s).",
+                color=config.COLORES['rechazado']
+            )
+            embed.add_field(name="Razón", value=reason, inline=False)
+
+        for user_id, user_games in list(games_by_user.items())[:20]:
+            points = sum(game.total_points for game in user_games)
+            value = f"{len(user_games)} juego(s) • {points} pts"
+            user = users.get(user_id)
+            if user:
+                value += f"\n**Total:** {user.total_points} pts ({user.total_games} juegos)"
+
+            embed.add_field(
+                name=f"{config.EMOJIS['usuario']} {user_games[0].username}",
+                value=value,
+                inline=True
+            )
+
+        action = "Aprobado" if approve else "Rechazado"
+        embed.set_footer(text=f"{action} por {interaction.user.name}")
+
+        return embed
+
+    @app_commands.command(name="marcar-elkie", description="[ADMIN] Marcar o desmarcar a un usuario como Elkie del concurso")
     @app_commands.describe(usuario="Usuario a marcar/desmarcar como Elkie")
     @app_commands.check(is_admin)
     async def marcar_elkie(self, interaction: discord.Interaction, usuario: discord.User):
-        """Marca o desmarca a un usuario como Elkie"""
+        """Marca o desmarca a un usuario como Elkie del concurso activo del servidor"""
         
-        user = await User.get(usuario.id)
-        if not user:
-            await User.create(usuario.id, usuario.name)
-            user = await User.get(usuario.id)
+        await User.ensure_exists(usuario.id, usuario.name)
+        # Leído sin caché: otro shard pudo cambiar el Elkie hace un momento
+        contest = await Contest.get(await contest_id_for(interaction))
         
-        db = await get_db()
         try:
-            if user.is_elkie:
-                await db.execute('UPDATE users SET is_elkie = 0 WHERE discord_id = ?', (usuario.id,))
-                await db.commit()
+            if contest.elkie_id == usuario.id:
+                await Contest.set_elkie(contest.id, None)
                 
                 embed = discord.Embed(
                     title=f"{config.EMOJIS['config']} Elkie Desmarcado",
-                    description=f"**{usuario.name}** ya no es Elkie.\nLa regla especial de premios ya no aplica.",
+                    description=f"**{usuario.name}** ya no es Elkie en **{contest.name}**.\nLa regla especial de premios ya no aplica.",
                     color=config.COLORES['info']
                 )
             else:
-                await db.execute('UPDATE users SET is_elkie = 0')
-                await db.execute('UPDATE users SET is_elkie = 1 WHERE discord_id = ?', (usuario.id,))
-                await db.commit()
+                # Uno por concurso: marcar a alguien reemplaza al anterior
+                await Contest.set_elkie(contest.id, usuario.id)
                 
                 embed = discord.Embed(
                     title=f"{config.EMOJIS['config']} Elkie Marcado",
-                    description=f"**{usuario.name}** 👑 ahora es Elkie.\n\n**Regla especial activa:**\nSi Elkie gana, el 2do lugar recibirá premio de $20 USD.",
+                    description=f"**{usuario.name}** 👑 ahora es Elkie en **{contest.name}**.\n\n**Regla especial activa:**\nSi Elkie gana, el 2do lugar recibirá premio de $20 USD.",
                     color=config.COLORES['info']
                 )
             
             await interaction.response.send_message(embed=embed)
-        finally:
-            await db.close()
+        except Exception as e:
+            print(f'Error marcando Elkie: {e}')
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Error",
+                description="Hubo un error al actualizar el estado de Elkie.",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
             
      ## EDITAR JUEGO ##       
     @app_commands.command(name="editar-juego", description="[ADMIN] Editar un juego aprobado")
@@ -520,7 +801,7 @@ class Admin(commands.Cog):
             return
         
         # Obtener el juego
-        game = await Game.get_by_id(game_id)
+        game = await Game.get_by_id(game_id, await contest_id_for(interaction))
         
         if not game:
             embed = discord.Embed(
@@ -594,28 +875,19 @@ class Admin(commands.Cog):
             return
         
         # Recalcular puntos
-        nuevos_puntos = config.PUNTOS_CATEGORIA[nueva_categoria.lower()]
-        if nuevo_platino:
-            nuevos_puntos += config.PUNTOS_CATEGORIA['platino']
+        nuevos_puntos = scoring.score(nueva_categoria, nuevo_platino, nuevo_recompletado)
         
         # Actualizar en la base de datos
-        db = await get_db()
         try:
-            await db.execute('''
-                UPDATE games
-                SET game_name = ?,
-                    category = ?,
-                    platform = ?,
-                    has_platinum = ?,
-                    is_recompleted = ?,
-                    total_points = ?
-                WHERE id = ?
-            ''', (nuevo_nombre, nueva_categoria, nueva_plataforma, 
-                  int(nuevo_platino), int(nuevo_recompletado), nuevos_puntos, game_id))
-            await db.commit()
-            
-            # Actualizar estadísticas del usuario
-            await User.update_stats(game.discord_user_id)
+            # El evento de edición ajusta los puntos del usuario con la diferencia
+            await Game.edit(game_id, interaction.user.id, {
+                'game_name': nuevo_nombre,
+                'category': nueva_categoria,
+                'platform': nueva_plataforma,
+                'has_platinum': int(nuevo_platino),
+                'is_recompleted': int(nuevo_recompletado),
+                'total_points': nuevos_puntos,
+            })
             
             # Obtener usuario actualizado
             user = await User.get(game.discord_user_id)
@@ -671,8 +943,14 @@ class Admin(commands.Cog):
             except:
                 pass
             
-        finally:
-            await db.close()
+        except Exception as e:
+            print(f'Error editando juego: {e}')
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Error",
+                description="Hubo un error al editar el juego.",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
     
     @editar_juego.autocomplete('juego')
     async def juego_autocomplete(
@@ -682,6 +960,10 @@ class Admin(commands.Cog):
     ) -> list[app_commands.Choice[str]]:
         """Autocompletado dinámico para mostrar juegos del usuario seleccionado"""
         
+        # Solo admins ven opciones (decisión cacheada, no recorre roles)
+        if not is_admin_user(interaction.user):
+            return []
+        
         # Obtener el usuario que se seleccionó en el comando
         usuario = interaction.namespace.usuario
         
@@ -689,7 +971,7 @@ class Admin(commands.Cog):
             return []
         
         # Obtener todos los juegos del usuario
-        games = await Game.get_by_user(usuario.id, status='APPROVED')
+        games = await Game.get_by_user(usuario.id, status='APPROVED', contest_id=await contest_id_for(interaction))
         
         if not games:
             return [app_commands.Choice(name="Este usuario no tiene juegos", value="0:ninguno")]
@@ -732,7 +1014,7 @@ class Admin(commands.Cog):
             return
         
         # Obtener el juego
-        game = await Game.get_by_id(game_id)
+        game = await Game.get_by_id(game_id, await contest_id_for(interaction))
         
         if not game:
             embed = discord.Embed(
@@ -760,14 +1042,11 @@ class Admin(commands.Cog):
         user_id = game.discord_user_id
         
         # Eliminar el juego
-        db = await get_db()
         try:
-            await db.execute('DELETE FROM games WHERE id = ?', (game_id,))
-            await db.commit()
+            # El evento de eliminación descuenta los puntos si estaba aprobado
+            await Game.delete(game_id, interaction.user.id)
             
-            # Si era aprobado, actualizar stats del usuario
             if game_status == 'APPROVED':
-                await User.update_stats(user_id)
                 user = await User.get(user_id)
                 stats_text = f"\n\n**Stats actualizadas de {usuario.name}:**\nPuntos totales: {user.total_points} pts ({user.total_games} juegos)"
             else:
@@ -824,14 +1103,13 @@ class Admin(commands.Cog):
                 pass
             
         except Exception as e:
+            print(f'Error eliminando juego: {e}')
             embed = discord.Embed(
                 title=f"{config.EMOJIS['error']} Error",
                 description="Hubo un error al eliminar el juego.",
                 color=config.COLORES['rechazado']
             )
             await interaction.response.send_message(embed=embed, ephemeral=True)
-        finally:
-            await db.close()
     
     @eliminar_juego.autocomplete('juego')
     async def eliminar_juego_autocomplete(
@@ -841,6 +1119,10 @@ class Admin(commands.Cog):
     ) -> list[app_commands.Choice[str]]:
         """Autocompletado para juegos del usuario seleccionado"""
         
+        # Solo admins ven opciones (decisión cacheada, no recorre roles)
+        if not is_admin_user(interaction.user):
+            return []
+        
         # Obtener el usuario seleccionado
         usuario = interaction.namespace.usuario
         
@@ -848,8 +1130,9 @@ class Admin(commands.Cog):
             return []
         
         # Obtener todos los juegos del usuario (pendientes y aprobados)
-        pending_games = await Game.get_by_user(usuario.id, status='PENDING')
-        approved_games = await Game.get_by_user(usuario.id, status='APPROVED')
+        contest_id = await contest_id_for(interaction)
+        pending_games = await Game.get_by_user(usuario.id, status='PENDING', contest_id=contest_id)
+        approved_games = await Game.get_by_user(usuario.id, status='APPROVED', contest_id=contest_id)
         all_games = pending_games + approved_games
         
         if not all_games:
@@ -926,7 +1209,7 @@ class Admin(commands.Cog):
             return
         
         # Obtener el juego
-        game = await Game.get_by_id(game_id)
+        game = await Game.get_by_id(game_id, await contest_id_for(interaction))
         
         if not game:
             embed = discord.Embed(
@@ -972,9 +1255,7 @@ class Admin(commands.Cog):
         nuevo_platino = (platino.value == "si") if platino else game.has_platinum
         
         # Recalcular puntos
-        nuevos_puntos = config.PUNTOS_CATEGORIA[nueva_categoria.lower()]
-        if nuevo_platino:
-            nuevos_puntos += config.PUNTOS_CATEGORIA['platino']
+        nuevos_puntos = scoring.score(nueva_categoria, nuevo_platino, game.is_recompleted)
         
         # Registrar cambios
         cambios = []
@@ -998,17 +1279,13 @@ class Admin(commands.Cog):
             return
         
         # Actualizar en la BD
-        db = await get_db()
         try:
-            await db.execute('''
-                UPDATE games
-                SET category = ?,
-                    platform = ?,
-                    has_platinum = ?,
-                    total_points = ?
-                WHERE id = ?
-            ''', (nueva_categoria, nueva_plataforma, int(nuevo_platino), nuevos_puntos, game_id))
-            await db.commit()
+            await Game.edit(game_id, interaction.user.id, {
+                'category': nueva_categoria,
+                'platform': nueva_plataforma,
+                'has_platinum': int(nuevo_platino),
+                'total_points': nuevos_puntos,
+            })
             
             # Embed de confirmación
             embed = discord.Embed(
@@ -1055,8 +1332,14 @@ class Admin(commands.Cog):
             except:
                 pass
             
-        finally:
-            await db.close()
+        except Exception as e:
+            print(f'Error modificando juego: {e}')
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Error",
+                description="Hubo un error al modificar el juego.",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
     
     @modificar_pendiente.autocomplete('juego')
     async def modificar_pendiente_autocomplete(
@@ -1066,13 +1349,17 @@ class Admin(commands.Cog):
     ) -> list[app_commands.Choice[str]]:
         """Autocompletado para juegos pendientes del usuario"""
         
+        # Solo admins ven opciones (decisión cacheada, no recorre roles)
+        if not is_admin_user(interaction.user):
+            return []
+        
         usuario = interaction.namespace.usuario
         
         if not usuario:
             return []
         
         # Obtener juegos pendientes del usuario
-        games = await Game.get_by_user(usuario.id, status='PENDING')
+        games = await Game.get_by_user(usuario.id, status='PENDING', contest_id=await contest_id_for(interaction))
         
         if not games:
             return [app_commands.Choice(name="Este usuario no tiene juegos pendientes", value="0:ninguno")]
@@ -1101,10 +1388,9 @@ class Admin(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         from utils.rawg_api import rawg_client
-        from models.database import get_db
         
         # Obtener juegos sin imagen
-        db = await get_db()
+        db = await get_read_db()
         cursor = await db.execute('''
             SELECT id, game_name, evidence_url
             FROM games
@@ -1112,6 +1398,7 @@ class Admin(commands.Cog):
         ''')
         
         games_sin_imagen = await cursor.fetchall()
+        await db.close()
         
         if not games_sin_imagen:
             embed = discord.Embed(
@@ -1120,26 +1407,28 @@ class Admin(commands.Cog):
                 color=config.COLORES['aprobado']
             )
             await interaction.followup.send(embed=embed, ephemeral=True)
-            await db.close()
             return
         
         # Buscar y actualizar imágenes
         actualizados = 0
+        updates = []
         no_encontrados = []
         
         for game_id, game_name, current_url in games_sin_imagen:
             # Buscar en RAWG
-            results = rawg_client.search_games(game_name, limit=1)
+            # HTTP y caché compartida en un hilo: el event loop sigue libre
+            results = await asyncio.to_thread(rawg_client.search_games, game_name, limit=1)
             
             if results and results[0]['image']:
                 image_url = results[0]['image']
                 
-                # Actualizar en BD
-                await db.execute('''
+                # Acumular para escribir todo en un solo commit (con su evento)
+                updates.extend(edited_statements(game_id, interaction.user.id, {'evidence_url': image_url}))
+                updates.append(('''
                     UPDATE games
                     SET evidence_url = ?
                     WHERE id = ?
-                ''', (image_url, game_id))
+                ''', (image_url, game_id)))
                 
                 actualizados += 1
                 print(f"✅ Actualizado: {game_name}")
@@ -1147,8 +1436,8 @@ class Admin(commands.Cog):
                 no_encontrados.append(game_name)
                 print(f"⚠️ No encontrado: {game_name}")
         
-        await db.commit()
-        await db.close()
+        if updates:
+            await db_writer.submit(updates)
         
         # Embed de resultados
         embed = discord.Embed(
@@ -1172,21 +1461,382 @@ class Admin(commands.Cog):
         
         await interaction.followup.send(embed=embed, ephemeral=True)
     
+    @app_commands.command(name="nuevo-concurso", description="[ADMIN] Iniciar un nuevo concurso en este servidor")
+    @app_commands.describe(
+        nombre="Nombre del concurso",
+        inicio="Fecha de inicio (AAAA-MM-DD)",
+        fin="Fecha de fin (AAAA-MM-DD)"
+    )
+    @app_commands.check(is_admin)
+    async def nuevo_concurso(self, interaction: discord.Interaction, nombre: str, inicio: str, fin: str):
+        """Crea un concurso y lo deja como el activo del servidor"""
+        
+        try:
+            start_date = datetime.strptime(inicio, '%Y-%m-%d')
+            end_date = datetime.strptime(fin, '%Y-%m-%d')
+        except ValueError:
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Fecha Inválida",
+                description="Usa el formato **AAAA-MM-DD** (ej. 2026-01-01).",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        if end_date <= start_date:
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Fechas Inválidas",
+                description="La fecha de fin debe ser posterior a la de inicio.",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        contest = await Contest.create(interaction.guild_id, nombre, start_date, end_date)
+        
+        if not contest:
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Error",
+                description="No se pudo crear el concurso.",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        embed = discord.Embed(
+            title=f"{config.EMOJIS['exito']} Nuevo Concurso",
+            description=(
+                f"**{contest.name}** es ahora el concurso activo de este servidor.\n"
+                f"{config.EMOJIS['fecha']} {start_date.strftime('%d/%m/%Y')} - {end_date.strftime('%d/%m/%Y')}"
+            ),
+            color=config.COLORES['aprobado']
+        )
+        embed.set_footer(text="El ranking y los registros nuevos usarán este concurso")
+        
+        await interaction.response.send_message(embed=embed)
+    
+    @app_commands.command(name="reconstruir-stats", description="[ADMIN] Recalcular puntos desde el log de eventos")
+    @app_commands.check(is_admin)
+    async def reconstruir_stats(self, interaction: discord.Interaction):
+        """Rehace los puntos de todos desde cero y compara el log con la tabla de juegos"""
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        try:
+            events = await GameEvent.replay_scores()
+            mismatched = await GameEvent.verify()
+        except Exception as e:
+            print(f'Error reconstruyendo stats: {e}')
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Error",
+                description="No se pudo reconstruir desde el log de eventos.",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+        
+        embed = discord.Embed(
+            title=f"{config.EMOJIS['config']} Stats Reconstruidas",
+            description=f"Se plegaron **{events}** eventos sobre los puntos de usuarios y concursos.",
+            color=config.COLORES['aprobado'] if not mismatched else config.COLORES['pendiente']
+        )
+        
+        if mismatched:
+            shown = ', '.join(f'#{game_id}' for game_id in mismatched[:20])
+            embed.add_field(
+                name=f"{config.EMOJIS['advertencia']} Juegos que no coinciden con el log ({len(mismatched)})",
+                value=shown,
+                inline=False
+            )
+        else:
+            embed.set_footer(text="La tabla de juegos coincide con el replay del log")
+        
+        await interaction.followup.send(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="recalcular-puntos", description="[ADMIN] Aplicar la tabla de puntos actual a los juegos del concurso activo")
+    @app_commands.check(is_admin)
+    async def recalcular_puntos(self, interaction: discord.Interaction):
+        """Recalcula los puntos del concurso activo del servidor con PUNTOS_CATEGORIA en una transacción"""
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        # Un concurso cerrado conserva los puntos con los que terminó
+        contest = await Contest.get_for_guild(interaction.guild_id)
+        if not contest.is_open():
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Concurso Cerrado",
+                description=f"**{contest.name}** ya terminó; sus puntos no se recalculan.",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+        
+        try:
+            result = await ScoringRules.recompute(interaction.user.id, contest.id)
+        except Exception as e:
+            print(f'Error recalculando puntos: {e}')
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Error",
+                description="No se pudieron recalcular los puntos. No se cambió nada.",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+        
+        print(f"🧮 [PUNTOS] Versión {result['version']} en el concurso {contest.id}: "
+              f"{result['games_updated']} juegos en {result['elapsed_ms']:.0f}ms")
+        
+        rules_text = " • ".join(
+            f"{config.EMOJIS.get(name, '🎮')} {name.upper() if len(name) <= 3 else name.capitalize()}: {points}"
+            for name, points in scoring.rules.items()
+        )
+        embed = discord.Embed(
+            title=f"🧮 Puntos Recalculados - Versión {result['version']}",
+            description=(
+                ("Se registró una **nueva versión** de la tabla de puntos.\n" if result['new_version']
+                 else "La tabla de puntos no cambió; se corrigieron los juegos desalineados.\n")
+                + rules_text
+            ),
+            color=config.COLORES['aprobado']
+        )
+        embed.add_field(
+            name="🎮 Juegos actualizados",
+            value=f"**{result['games_updated']}**",
+            inline=True
+        )
+        embed.add_field(
+            name=f"{config.EMOJIS['tiempo']} Tiempo",
+            value=(
+                f"Juegos: {result['games_ms']:.0f}ms\n"
+                f"Totales: {result['totals_ms']:.0f}ms\n"
+                f"**Total: {result['elapsed_ms']:.0f}ms**"
+            ),
+            inline=True
+        )
+        embed.set_footer(text=f"Solo se recalculó {contest.name}; los demás concursos no cambian")
+        
+        await interaction.followup.send(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="exportar", description="[ADMIN] Descargar los datos del concurso en un archivo comprimido")
+    @app_commands.describe(
+        datos="Qué exportar (por defecto, todo)",
+        formato="Formato de cada archivo (por defecto, CSV)"
+    )
+    @app_commands.choices(
+        datos=[
+            app_commands.Choice(name="Todo", value="todo"),
+            app_commands.Choice(name="Juegos", value="juegos"),
+            app_commands.Choice(name="Usuarios", value="usuarios"),
+            app_commands.Choice(name="Eventos", value="eventos"),
+        ],
+        formato=[
+            app_commands.Choice(name="CSV", value="csv"),
+            app_commands.Choice(name="NDJSON", value="ndjson"),
+        ]
+    )
+    @app_commands.check(is_admin)
+    async def exportar(self, interaction: discord.Interaction,
+                       datos: app_commands.Choice[str] = None,
+                       formato: app_commands.Choice[str] = None):
+        """Exporta juegos, usuarios y eventos del concurso como un .zip adjunto"""
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        contest = await Contest.get_for_guild(interaction.guild_id)
+        tables = list(EXPORT_QUERIES) if not datos or datos.value == 'todo' else [datos.value]
+        fmt = formato.value if formato else 'csv'
+        
+        try:
+            # Lectura y compresión en un hilo: el event loop sigue atendiendo
+            result = await asyncio.to_thread(export_contest, contest.id, tables, fmt)
+        except Exception as e:
+            print(f'Error exportando concurso {contest.id}: {e}')
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Error",
+                description="No se pudo generar la exportación.",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+        
+        try:
+            size_mb = result['bytes'] / 1024 / 1024
+            print(f"📤 [EXPORTAR] {result['rows']} en {size_mb:.1f} MB ({result['seconds']:.1f}s)")
+            
+            limit = interaction.guild.filesize_limit if interaction.guild else 25 * 1024 * 1024
+            if result['bytes'] > limit:
+                embed = discord.Embed(
+                    title=f"{config.EMOJIS['advertencia']} Archivo Demasiado Grande",
+                    description=(
+                        f"La exportación pesa **{size_mb:.1f} MB** y Discord permite "
+                        f"**{limit / 1024 / 1024:.0f} MB** en este servidor.\n"
+                        f"Prueba exportando una sola tabla."
+                    ),
+                    color=config.COLORES['pendiente']
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+                return
+            
+            embed = discord.Embed(
+                title=f"📤 Exportación - {contest.name}",
+                description="\n".join(
+                    f"• **{table}**: {count} filas" for table, count in result['rows'].items()
+                ),
+                color=config.COLORES['aprobado']
+            )
+            embed.set_footer(text=f"{fmt.upper()} comprimido • {size_mb:.1f} MB • {result['seconds']:.1f}s")
+            
+            filename = f"concurso{contest.id}-{datetime.now().strftime('%Y%m%d-%H%M')}-{fmt}.zip"
+            await interaction.followup.send(
+                embed=embed,
+                file=discord.File(result['path'], filename=filename),
+                ephemeral=True
+            )
+        finally:
+            os.remove(result['path'])
+    
+    @app_commands.command(name="verificar-backup", description="[DUEÑO] Restaurar un backup en solo lectura y comprobarlo")
+    @app_commands.describe(archivo="Backup a verificar (por defecto, el más reciente)")
+    @app_commands.check(is_owner)
+    async def verificar_backup(self, interaction: discord.Interaction, archivo: str = None):
+        """Comprueba integridad, conteos y checksums del ranking de un backup
+
+        El backup es de la BD entera (todos los servidores), por eso solo lo
+        puede ver el dueño del bot y no los admins de cada concurso.
+        """
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        backups = backup.list_backups()
+        paths = {os.path.basename(path): path for path in backups}
+        if not backups or (archivo and archivo not in paths):
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Backup No Encontrado",
+                description="No hay backups todavía." if not backups else f"No existe **{archivo}**.",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+        
+        try:
+            result = await asyncio.to_thread(backup.verify_backup, paths.get(archivo, backups[0]))
+        except Exception as e:
+            print(f'Error verificando backup: {e}')
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['error']} Backup Ilegible",
+                description=f"No se pudo restaurar el backup: {e}",
+                color=config.COLORES['rechazado']
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+        
+        saved, live = result['backup'], result['live']
+        embed = discord.Embed(
+            title=f"💾 {os.path.basename(result['path'])}",
+            description=(
+                f"{config.EMOJIS['fecha']} Tomado el {result['taken_at'].strftime('%d/%m/%Y %H:%M')}\n"
+                f"🩺 Integridad: **{result['integrity']}**"
+            ),
+            color=config.COLORES['aprobado'] if result['ok'] else config.COLORES['rechazado']
+        )
+        
+        embed.add_field(
+            name="📋 Filas (backup / actual)",
+            value="\n".join(
+                f"• **{table}**: {count} / {live['counts'][table]}"
+                for table, count in saved['counts'].items()
+            ),
+            inline=False
+        )
+        
+        checksum_ok = saved['stored'] == saved['recomputed']
+        embed.add_field(
+            name=f"{config.EMOJIS['ranking']} Checksum del Ranking",
+            value=(
+                f"{'✅' if checksum_ok else '❌'} Guardado `{saved['stored']}` • "
+                f"recalculado `{saved['recomputed']}`\n"
+                f"{'🟰 Igual' if saved['stored'] == live['stored'] else '🔀 Distinto'} al ranking actual `{live['stored']}`"
+            ),
+            inline=False
+        )
+        embed.set_footer(text=f"{len(backups)} backups conservados • el ranking actual puede haber cambiado desde el backup")
+        
+        await interaction.followup.send(embed=embed, ephemeral=True)
+    
+    @verificar_backup.autocomplete('archivo')
+    async def verificar_backup_autocomplete(self, interaction: discord.Interaction, current: str):
+        # Solo el dueño del bot puede ver los backups
+        if not await is_owner(interaction):
+            return []
+        
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in map(os.path.basename, backup.list_backups())
+            if current.lower() in name.lower()
+        ][:25]
+    
+    @app_commands.command(name="metricas", description="[ADMIN] Ver latencias de comandos, vistas, SQL y RAWG")
+    @app_commands.describe(tipo="Qué tipo de operación mostrar (por defecto, todas)")
+    @app_commands.choices(tipo=[
+        app_commands.Choice(name="Comandos", value="command"),
+        app_commands.Choice(name="Autocompletado", value="autocomplete"),
+        app_commands.Choice(name="Vistas", value="view"),
+        app_commands.Choice(name="SQL", value="sql"),
+        app_commands.Choice(name="RAWG", value="rawg"),
+    ])
+    @app_commands.check(is_admin)
+    async def metricas(self, interaction: discord.Interaction, tipo: app_commands.Choice[str] = None):
+        """Muestra las operaciones que más tiempo acumulan desde el arranque"""
+        
+        kind = tipo.value if tipo else None
+        series = metrics.top(kind, limit=10)
+        
+        uptime_h = metrics.uptime() / 3600
+        embed = discord.Embed(
+            title=f"📈 Métricas{f' - {tipo.name}' if tipo else ''}",
+            description=f"Top 10 por tiempo acumulado en las últimas **{uptime_h:.1f}h**",
+            color=config.COLORES['info']
+        )
+        
+        if not series:
+            embed.description = "Todavía no hay mediciones."
+        
+        for (series_kind, name), hist in series:
+            embed.add_field(
+                name=f"{name}" if kind else f"[{series_kind}] {name}",
+                value=(
+                    f"n={hist.count} • p50 **{hist.percentile(50) * 1000:.0f}ms** • "
+                    f"p95 **{hist.percentile(95) * 1000:.0f}ms** • máx {hist.max * 1000:.0f}ms\n"
+                    f"total {hist.total:.1f}s • errores {hist.errors}"
+                ),
+                inline=False
+            )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
     @pendientes.error
     @revisar.error
     @aprobar.error
     @rechazar.error
+    @revision_masiva.error
+    @procesar_lote.error
     @marcar_elkie.error
     @editar_juego.error
     @eliminar_juego.error
     @modificar_pendiente.error
     @fix_imagenes.error
+    @metricas.error
+    @nuevo_concurso.error
+    @reconstruir_stats.error
+    @exportar.error
+    @recalcular_puntos.error
+    @verificar_backup.error
     async def admin_error(self, interaction: discord.Interaction, error):
         """Maneja errores de permisos de admin"""
         if isinstance(error, app_commands.CheckFailure):
             embed = discord.Embed(
                 title=f"{config.EMOJIS['error']} Sin Permisos",
-                description="No tienes permisos de administrador para usar este comando.",
+                description="No tienes permisos para usar este comando.",
                 color=config.COLORES['rechazado']
             )
             await interaction.response.send_message(embed=embed, ephemeral=True)
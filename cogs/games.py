@@ -1,9 +1,12 @@
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
 import config
 from models.game import Game
 from models.user import User
+from models.contest import Contest
+from utils.calculators import scoring
 
 class Games(commands.Cog):
     """Comandos relacionados con el registro y gestión de juegos"""
@@ -49,6 +52,36 @@ class Games(commands.Cog):
             game_id = None
             game_name = nombre
         
+        # Duplicados por título normalizado antes de ir a RAWG
+        contest = await Contest.get_for_guild(interaction.guild_id)
+        duplicates, previous = await Game.find_duplicates(interaction.user.id, game_name, contest.id)
+        
+        if duplicates:
+            # Solo un aviso: el usuario puede confirmar si es otro juego
+            from views.duplicate_view import DuplicateWarningView
+            
+            existing = duplicates[0]
+            estado = "pendiente de aprobación" if existing.status == 'PENDING' else "aprobado"
+            embed = discord.Embed(
+                title=f"{config.EMOJIS['advertencia']} ¿Juego Ya Registrado?",
+                description=(
+                    f"Ya registraste **{existing.game_name}** en este concurso "
+                    f"(ID: {existing.id}, {estado}).\n"
+                    f"¿Quieres registrar **{game_name}** de todas formas?"
+                ),
+                color=config.COLORES['pendiente']
+            )
+            view = DuplicateWarningView(interaction.user.id)
+            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+            
+            await view.wait()
+            if not view.confirmed:
+                await interaction.followup.send("❌ Registro cancelado.", ephemeral=True)
+                return
+        
+        # Aprobado en un concurso anterior: se registra como re-completado
+        is_recompleted = bool(previous)
+        
         # Si viene de RAWG, obtener detalles completos
         if game_id:
             from utils.rawg_api import rawg_client
@@ -118,16 +151,16 @@ class Games(commands.Cog):
             categoria_nombre = 'AA'
             game_image = ''
         
-        # Crear/obtener usuario
-        await User.get_or_create(interaction.user.id, interaction.user.name)
+        # Crear usuario si es su primer registro (los conocidos no tocan la BD)
+        await User.ensure_exists(interaction.user.id, interaction.user.name)
         
         # Calcular puntos
-        puntos_categoria = config.PUNTOS_CATEGORIA[categoria_nombre.lower()]
-        puntos_platino = config.PUNTOS_CATEGORIA['platino'] if platino.value == "si" else 0
-        puntos_totales = puntos_categoria + puntos_platino
-        
-        # Registrar el juego
         has_platinum = platino.value == "si"
+        puntos_categoria = scoring.score(categoria_nombre)
+        puntos_totales = scoring.score(categoria_nombre, has_platinum, is_recompleted)
+        puntos_platino = scoring.score(categoria_nombre, has_platinum) - puntos_categoria
+        
+        # Registrar el juego en el concurso activo de este servidor
         success = await Game.create(
             discord_user_id=interaction.user.id,
             username=interaction.user.name,
@@ -135,8 +168,9 @@ class Games(commands.Cog):
             category=categoria_nombre,
             platform=plataforma.value,
             has_platinum=has_platinum,
-            is_recompleted=False,
-            image_url=game_image  # ← AGREGAR ESTO
+            is_recompleted=is_recompleted,
+            image_url=game_image,  # ← AGREGAR ESTO
+            contest_id=contest.id
         )
         
         if success:
@@ -160,6 +194,8 @@ class Games(commands.Cog):
             
             if has_platinum:
                 info_text += f"\n{config.EMOJIS['platino']} **Platino:** Sí"
+            if is_recompleted:
+                info_text += "\n🔄 **Re-completado:** ya lo terminaste en un concurso anterior"
             
             embed.add_field(
                 name="📋 Información",
@@ -209,7 +245,8 @@ class Games(commands.Cog):
         
         # Buscar en RAWG
         from utils.rawg_api import rawg_client
-        games = rawg_client.search_games(current, limit=24)  # 24 para dejar espacio al manual
+        # HTTP y caché compartida en un hilo: el event loop sigue libre
+        games = await asyncio.to_thread(rawg_client.search_games, current, limit=24)  # 24 para dejar espacio al manual
         
         choices = []
         
@@ -2,10 +2,19 @@ from __future__ import annotations
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
+from datetime import datetime, timedelta
 import config
 from models.user import User
 from models.game import Game
+from models.contest import Contest
+from models.rank_snapshot import RankSnapshot
+from models.user_stats import user_stats_cache
+from utils.shared_state import shared_state
+
+# Cada cuánto se revisa si toca una foto: a lo sumo 1 h y nunca menos de 5 min
+SNAPSHOT_CHECK_H = min(1.0, max(config.RANK_SNAPSHOT_INTERVAL_H, 5 / 60))
+
 
 class Ranking(commands.Cog):
     """Comandos relacionados con el ranking y estadísticas"""
@@ -13,6 +22,38 @@ class Ranking(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
     
+    async def cog_load(self):
+        if config.RANK_SNAPSHOT_INTERVAL_H > 0:
+            self.snapshot_loop.start()
+    
+    async def cog_unload(self):
+        self.snapshot_loop.cancel()
+    
+    @tasks.loop(hours=SNAPSHOT_CHECK_H)
+    async def snapshot_loop(self):
+        """Toma una foto del ranking de cada concurso activo cuando toca"""
+        # Un error (BD ocupada, disco lleno...) no debe detener el loop: se
+        # registra y se reintenta en la siguiente vuelta
+        try:
+            # Con varios shards solo un proceso toma las fotos; el dueño renueva
+            # el claim en cada vuelta y otro lo toma si deja de hacerlo
+            if not await shared_state.aclaim('rank-snapshots', ttl=2 * 3600):
+                return
+            
+            interval = timedelta(hours=config.RANK_SNAPSHOT_INTERVAL_H)
+            for contest in await Contest.get_active():
+                last = await RankSnapshot.latest_time(contest.id)
+                if last and datetime.now() - last < interval:
+                    continue
+                count = await RankSnapshot.take(contest.id)
+                print(f"📸 [RANKING] Foto del concurso {contest.id}: {count} participantes")
+        except Exception as e:
+            print(f"❌ [RANKING] Error tomando foto del ranking: {e}")
+    
+    @snapshot_loop.before_loop
+    async def before_snapshot_loop(self):
+        await self.bot.wait_until_ready()
+    
     @app_commands.command(name="ranking", description="Ver el ranking interactivo del concurso")
     async def ranking(self, interaction: discord.Interaction):
         """Muestra el ranking con pestañas interactivas"""
@@ -22,13 +63,16 @@ class Ranking(commands.Cog):
             
             print("🔍 [RANKING] Obteniendo usuarios...")
             
-            # Obtener usuarios y juegos
-            users = await User.get_all_ranked()
-            ranked_users = [user for user in users if user.total_games > 0]
+            # Ranking del concurso activo de este servidor: totales y la
+            # primera página; las demás se piden al navegar
+            from views.ranking_view import RankingTabView, PAGE_SIZE
             
-            print(f"✅ [RANKING] Usuarios encontrados: {len(ranked_users)}")
+            contest = await Contest.get_for_guild(interaction.guild_id)
+            summary = await User.get_leaderboard_summary(contest.id)
             
-            if not ranked_users:
+            print(f"✅ [RANKING] Usuarios encontrados: {summary['participants']}")
+            
+            if not summary['participants']:
                 embed = discord.Embed(
                     title=f"{config.EMOJIS['ranking']} Ranking del Concurso",
                     description="Aún no hay participantes con juegos aprobados.",
@@ -37,21 +81,17 @@ class Ranking(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            print("🔍 [RANKING] Obteniendo juegos...")
-            
-            # Obtener todos los juegos aprobados
-            all_games = []
-            for user in ranked_users:
-                games = await Game.get_by_user(user.discord_id, status='APPROVED')
-                all_games.extend(games)
+            # Primera página y sus puestos en la foto de hace RANK_MOVEMENT_DAYS
+            # (para ▲/▼); los totales por categoría se piden al abrir esa pestaña
+            page_users = await User.get_leaderboard(contest.id, 1, PAGE_SIZE)
+            since = datetime.now() - timedelta(days=config.RANK_MOVEMENT_DAYS)
+            previous_ranks = await RankSnapshot.ranks_at(contest.id, since, [user.discord_id for user in page_users])
+            movers = await RankSnapshot.movers(contest.id, since)
             
-            print(f"✅ [RANKING] Juegos encontrados: {len(all_games)}")
             print("🔍 [RANKING] Creando vista con pestañas...")
             
             # Crear vista con pestañas
-            from views.ranking_view import RankingTabView
-            
-            view = RankingTabView(ranked_users, all_games)
+            view = RankingTabView(page_users, summary, contest.id, since, previous_ranks, movers)
             
             print("🔍 [RANKING] Generando embed...")
             embed = view.get_embed()
@@ -84,9 +124,12 @@ class Ranking(commands.Cog):
     async def mi_posicion(self, interaction: discord.Interaction):
         """Muestra la posición del usuario en el ranking"""
         
-        user = await User.get(interaction.user.id)
+        contest = await Contest.get_for_guild(interaction.guild_id)
+        
+        # Puesto y distancias en una sola consulta (sin traer el ranking entero)
+        user = await User.get_standing(interaction.user.id, contest.id)
         
-        if not user or user.total_games == 0:
+        if not user:
             embed = discord.Embed(
                 title=f"{config.EMOJIS['info']} Tu Posición",
                 description="Aún no tienes juegos aprobados.\nUsa `/registrar` para comenzar!",
@@ -95,28 +138,23 @@ class Ranking(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Obtener todos los usuarios rankeados
-        all_users = await User.get_all_ranked()
-        ranked_users = [u for u in all_users if u.total_games > 0]
+        # Emoji de puesto (los empatados comparten puesto)
+        position_emoji = {1: '🥇', 2: '🥈', 3: '🥉'}.get(user.rank, f'{user.rank}°')
+        tie_text = " (empatado)" if user.tied_count > 1 else ""
         
-        # Encontrar posición
-        position = next((i for i, u in enumerate(ranked_users, 1) if u.discord_id == user.discord_id), None)
-        
-        if not position:
-            embed = discord.Embed(
-                title=f"{config.EMOJIS['error']} Error",
-                description="No se pudo determinar tu posición.",
-                color=config.COLORES['rechazado']
-            )
-            await interaction.response.send_message(embed=embed, ephemeral=True)
-            return
-        
-        # Emoji de posición
-        position_emoji = {1: '🥇', 2: '🥈', 3: '🥉'}.get(position, f'{position}°')
+        # Movimiento respecto a la foto de hace RANK_MOVEMENT_DAYS (las fotos
+        # guardan la posición única, así que se compara con position)
+        since = datetime.now() - timedelta(days=config.RANK_MOVEMENT_DAYS)
+        previous = await RankSnapshot.rank_at(user.discord_id, contest.id, since)
+        movement = ""
+        if previous and previous.rank > user.position:
+            movement = f"\n📈 Subiste **{previous.rank - user.position}** puesto(s) en los últimos {config.RANK_MOVEMENT_DAYS} días"
+        elif previous and previous.rank < user.position:
+            movement = f"\n📉 Bajaste **{user.position - previous.rank}** puesto(s) en los últimos {config.RANK_MOVEMENT_DAYS} días"
         
         embed = discord.Embed(
             title=f"{config.EMOJIS['usuario']} Tu Posición Actual",
-            description=f"Estás en el puesto **{position_emoji}** de {len(ranked_users)}",
+            description=f"Estás en el puesto **{position_emoji}**{tie_text} de {user.ranked_count}{movement}",
             color=config.COLORES['info']
         )
         
@@ -141,31 +179,25 @@ class Ranking(commands.Cog):
             inline=True
         )
         
-        # Diferencia con el primero (si no es el primero)
-        if position > 1:
-            first_user = ranked_users[0]
-            diff_points = first_user.total_points - user.total_points
-            diff_games = first_user.total_games - user.total_games
-            
+        # Diferencia con el primero (si no comparte el primer puesto)
+        if user.rank > 1:
             embed.add_field(
                 name=f"📈 Diferencia con 1° lugar",
-                value=f"-{diff_points} pts ({diff_games} juegos menos)",
+                value=f"-{user.gap_leader} pts ({user.games_behind_leader} juegos menos)",
                 inline=False
             )
         
-        # Diferencia con el siguiente (si no es el último)
-        if position < len(ranked_users):
-            next_user = ranked_users[position]  # siguiente posición
-            diff_points = user.total_points - next_user.total_points
-            
+        # Diferencia con el siguiente puesto (si no está en el último); tras
+        # un empate el siguiente puesto salta como en RANK
+        if user.gap_next is not None:
             embed.add_field(
-                name=f"📉 Ventaja sobre {position + 1}° lugar",
-                value=f"+{diff_points} pts",
+                name=f"📉 Ventaja sobre {user.rank + user.tied_count}° lugar",
+                value=f"+{user.gap_next} pts",
                 inline=False
             )
         
         # Obtener juegos aprobados para más detalles
-        games = await Game.get_by_user(user.discord_id, status='APPROVED')
+        games = await Game.get_by_user(user.discord_id, status='APPROVED', contest_id=contest.id)
         
         # Contar platinos
         platinos = sum(1 for game in games if game.has_platinum)
@@ -195,9 +227,13 @@ class Ranking(commands.Cog):
         
         target_user = usuario or interaction.user
         
-        user = await User.get(target_user.id)
+        contest = await Contest.get_for_guild(interaction.guild_id)
+        
+        # Puesto con empates y totales en una consulta; los desgloses salen del
+        # resumen de user_stats (caché en memoria), sin cargar sus juegos
+        user = await User.get_standing(target_user.id, contest.id)
         
-        if not user or user.total_games == 0:
+        if not user:
             embed = discord.Embed(
                 title=f"{config.EMOJIS['info']} Estadísticas",
                 description=f"**{target_user.name}** aún no tiene juegos aprobados.",
@@ -206,8 +242,7 @@ class Ranking(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Obtener juegos
-        games = await Game.get_by_user(user.discord_id, status='APPROVED')
+        stats = await user_stats_cache.get(user.discord_id, contest.id)
         
         embed = discord.Embed(
             title=f"{config.EMOJIS['ranking']} Estadísticas de {user.username}",
@@ -227,11 +262,7 @@ class Ranking(commands.Cog):
             inline=True
         )
         
-        # Calcular posición
-        all_users = await User.get_all_ranked()
-        ranked_users = [u for u in all_users if u.total_games > 0]
-        position = next((i for i, u in enumerate(ranked_users, 1) if u.discord_id == user.discord_id), 0)
-        position_emoji = {1: '🥇', 2: '🥈', 3: '🥉'}.get(position, f'{position}°')
+        position_emoji = {1: '🥇', 2: '🥈', 3: '🥉'}.get(user.rank, f'{user.rank}°')
         
         embed.add_field(
             name="🏆 Posición",
@@ -239,27 +270,9 @@ class Ranking(commands.Cog):
             inline=True
         )
         
-        # Estadísticas por categoría
-        categories = {}
-        platforms = {}
-        platinos = 0
-        recompletados = 0
-        
-        for game in games:
-            # Contar por categoría
-            categories[game.category] = categories.get(game.category, 0) + 1
-            # Contar por plataforma
-            platforms[game.platform] = platforms.get(game.platform, 0) + 1
-            # Contar platinos
-            if game.has_platinum:
-                platinos += 1
-            # Contar re-completados
-            if game.is_recompleted:
-                recompletados += 1
-        
         # Distribución por categoría
         cat_text = ""
-        for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
+        for cat, count in sorted(stats.categories.items(), key=lambda x: x[1], reverse=True):
             emoji = config.EMOJIS.get(cat.lower(), '🎮')
             cat_text += f"{emoji} {cat}: {count}\n"
         
@@ -271,7 +284,7 @@ class Ranking(commands.Cog):
         
         # Distribución por plataforma
         plat_text = ""
-        for plat, count in sorted(platforms.items(), key=lambda x: x[1], reverse=True):
+        for plat, count in sorted(stats.platforms.items(), key=lambda x: x[1], reverse=True):
             emoji = config.EMOJIS.get(plat.lower(), '🎮')
             plat_text += f"{emoji} {plat}: {count}\n"
         
@@ -282,9 +295,9 @@ class Ranking(commands.Cog):
         )
         
         # Logros especiales
-        special_text = f"{config.EMOJIS['platino']} Platinos: {platinos}\n"
-        if recompletados > 0:
-            special_text += f"🔄 Re-completados: {recompletados}\n"
+        special_text = f"{config.EMOJIS['platino']} Platinos: {stats.platinums}\n"
+        if stats.recompleted > 0:
+            special_text += f"🔄 Re-completados: {stats.recompleted}\n"
         
         avg_points = round(user.total_points / user.total_games, 1)
         special_text += f"📈 Promedio: {avg_points} pts/juego"
@@ -296,12 +309,11 @@ class Ranking(commands.Cog):
         )
         
         # Top 3 juegos con más puntos
-        top_games = sorted(games, key=lambda x: x.total_points, reverse=True)[:3]
-        if top_games:
+        if stats.top_games:
             top_text = ""
-            for i, game in enumerate(top_games, 1):
-                platino_icon = f" {config.EMOJIS['platino']}" if game.has_platinum else ""
-                top_text += f"{i}. {game.game_name}{platino_icon} - {game.total_points} pts\n"
+            for i, (game_name, points, has_platinum) in enumerate(stats.top_games, 1):
+                platino_icon = f" {config.EMOJIS['platino']}" if has_platinum else ""
+                top_text += f"{i}. {game_name}{platino_icon} - {points} pts\n"
             
             embed.add_field(
                 name="⭐ Top Juegos",
@@ -322,11 +334,14 @@ class Ranking(commands.Cog):
             
             print("🔍 [TABLERO] Obteniendo datos...")
             
-            # Obtener todos los usuarios
-            users = await User.get_all_ranked()
-            ranked_users = [user for user in users if user.total_games > 0]
+            from views.dashboard_view import DashboardView, RefreshButton
+            
+            # Agregados del concurso de este servidor: O(días) y O(participantes),
+            # sin cargar la lista de juegos
+            contest = await Contest.get_for_guild(interaction.guild_id)
+            data = await DashboardView.load(contest)
             
-            if not ranked_users:
+            if not data['summary']['participants']:
                 embed = discord.Embed(
                     title=f"{config.EMOJIS['ranking']} Dashboard del Concurso",
                     description="Aún no hay actividad. ¡Sé el primero en registrar un juego!",
@@ -335,18 +350,10 @@ class Ranking(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            # Obtener todos los juegos
-            all_games = []
-            for user in ranked_users:
-                games = await Game.get_by_user(user.discord_id, status='APPROVED')
-                all_games.extend(games)
-            
-            print(f"✅ [TABLERO] {len(ranked_users)} usuarios, {len(all_games)} juegos")
+            print(f"✅ [TABLERO] {data['summary']['participants']} usuarios, {data['activity']['games']} juegos")
             
             # Crear vista con select menu
-            from views.dashboard_view import DashboardView, RefreshButton
-            
-            view = DashboardView(ranked_users, all_games)
+            view = DashboardView(**data, contest=contest)
             view.add_item(RefreshButton())  # Agregar botón de actualizar
             
             await interaction.followup.send(
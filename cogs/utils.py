@@ -2,6 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import config
+from models.contest import Contest
 
 class Utils(commands.Cog):
     """Comandos de utilidad e información"""
@@ -19,10 +20,11 @@ class Utils(commands.Cog):
             color=config.COLORES['info']
         )
         
-        # Periodo
+        # Periodo del concurso activo de este servidor
+        contest = await Contest.get_for_guild(interaction.guild_id)
         embed.add_field(
             name=f"{config.EMOJIS['fecha']} Periodo del Concurso",
-            value=f"**{config.CONTEST_START_DATE.strftime('%d/%m/%Y')}** - **{config.CONTEST_END_DATE.strftime('%d/%m/%Y')}**",
+            value=f"**{contest.start_date.strftime('%d/%m/%Y')}** - **{contest.end_date.strftime('%d/%m/%Y')}**",
             inline=False
         )
         
@@ -11,14 +11,81 @@ GUILD_ID = os.getenv('GUILD_ID')
 
 # API de RAWG para búsqueda de juegos
 RAWG_API_KEY = os.getenv('RAWG_API_KEY')
-RAWG_BASE_URL = 'https://api.rawg.io/api'
+RAWG_BASE_URL = os.getenv('RAWG_BASE_URL', 'https://api.rawg.io/api')
 
 # Configuración del concurso
 CONTEST_START_DATE = datetime.strptime(os.getenv('CONTEST_START_DATE', '2025-12-25'), '%Y-%m-%d')
 CONTEST_END_DATE = datetime.strptime(os.getenv('CONTEST_END_DATE', '2027-01-01'), '%Y-%m-%d')
+CONTEST_NAME = os.getenv('CONTEST_NAME', 'Concurso Anual')
+
+# Servidores donde se publican los comandos (por defecto, solo GUILD_ID)
+GUILD_IDS = [int(g) for g in os.getenv('GUILD_IDS', GUILD_ID or '').split(',') if g.strip()]
+
+# Intents y cachés del gateway: nada lee el contenido de los mensajes y los
+# roles llegan con cada interacción, así que por defecto no se cachean miembros
+INTENT_MEMBERS = os.getenv('INTENT_MEMBERS', '0') == '1'
+INTENT_MESSAGE_CONTENT = os.getenv('INTENT_MESSAGE_CONTENT', '0') == '1'
+CACHE_MEMBERS = os.getenv('CACHE_MEMBERS', '0') == '1'  # Requiere INTENT_MEMBERS
+CHUNK_GUILDS = os.getenv('CHUNK_GUILDS', '0') == '1'
+MESSAGE_CACHE_SIZE = int(os.getenv('MESSAGE_CACHE_SIZE', '0'))  # 0 = sin caché
+
+# Sharding: vacío = un solo proceso sin shards, "auto" = los que recomiende
+# Discord, o un número fijo de shards que SHARD_IDS reparte entre procesos
+SHARD_COUNT = os.getenv('SHARD_COUNT', '').strip().lower()
+SHARD_IDS = [int(s) for s in os.getenv('SHARD_IDS', '').split(',') if s.strip()]
+
+# Estado compartido entre procesos/shards (SQLite en WAL)
+SHARED_STATE_PATH = os.getenv('SHARED_STATE_PATH', 'data/shared_state.db')
+RAWG_SHARED_CACHE_TTL_S = int(os.getenv('RAWG_SHARED_CACHE_TTL_S', '86400'))
+
+# Fotos del ranking: cada cuántas horas y contra cuántos días atrás se
+# muestran los movimientos (▲/▼)
+RANK_SNAPSHOT_INTERVAL_H = float(os.getenv('RANK_SNAPSHOT_INTERVAL_H', '24'))  # 0 = desactivado
+RANK_MOVEMENT_DAYS = int(os.getenv('RANK_MOVEMENT_DAYS', '7'))
+
+# Backups en caliente de data/games.db: cada cuántas horas, cuántos se
+# conservan y cuántas páginas se copian por paso (con una pausa entre pasos)
+BACKUP_DIR = os.getenv('BACKUP_DIR', 'data/backups')
+BACKUP_INTERVAL_H = float(os.getenv('BACKUP_INTERVAL_H', '6'))  # 0 = desactivado
+BACKUP_KEEP = int(os.getenv('BACKUP_KEEP', '14'))
+BACKUP_PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP', '256'))
+BACKUP_STEP_SLEEP_MS = int(os.getenv('BACKUP_STEP_SLEEP_MS', '5'))
+BACKUP_MAX_RESTARTS = int(os.getenv('BACKUP_MAX_RESTARTS', '3'))
+
+# /exportar: filas leídas por lote (la memoria no crece con el concurso)
+EXPORT_CHUNK_ROWS = int(os.getenv('EXPORT_CHUNK_ROWS', '5000'))
+
+# Caché en memoria de user_stats (/estadisticas): cuántos usuarios guarda y
+# cuántos segundos vale una entrada (acota lo desfasado entre shards)
+USER_STATS_CACHE_SIZE = int(os.getenv('USER_STATS_CACHE_SIZE', '1000'))
+USER_STATS_CACHE_TTL_S = int(os.getenv('USER_STATS_CACHE_TTL_S', '60'))
+
+# Conexiones de solo lectura que se mantienen abiertas para reusar
+READ_POOL_SIZE = int(os.getenv('READ_POOL_SIZE', '4'))
+
+# Ventana (ms) para agrupar registros concurrentes en un solo commit
+REGISTRATION_BATCH_WINDOW_MS = int(os.getenv('REGISTRATION_BATCH_WINDOW_MS', '5'))
+
+# Endpoint de métricas Prometheus (0 = desactivado)
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+
+# Profiler de SQL (opcional) y umbral del log de consultas lentas
+SQL_PROFILE = os.getenv('SQL_PROFILE', '0') == '1'
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))
+
+# Monitor del event loop: cada cuánto se muestrea y desde cuándo es un bloqueo
+LOOP_SAMPLE_MS = int(os.getenv('LOOP_SAMPLE_MS', '100'))
+LOOP_STALL_MS = int(os.getenv('LOOP_STALL_MS', '250'))
+
+# Forzar tree.sync() aunque el hash de los comandos no haya cambiado
+FORCE_COMMAND_SYNC = os.getenv('FORCE_COMMAND_SYNC', '0') == '1'
+
+# Presupuesto (segundos) de conexión al gateway hasta on_ready
+READY_BUDGET_S = float(os.getenv('READY_BUDGET_S', '5'))
 
 # ID del rol de administrador
-ADMIN_ROLE_ID = int(os.getenv('ADMIN_ROLE_ID', '0'))
+ADMIN_ROLE_ID = int(os.getenv('ADMIN_ROLE_ID', '1316957507982970951'))
 
 # Colores para embeds (en hexadecimal)
 COLORES = {
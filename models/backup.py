@@ -0,0 +1,181 @@
+import glob
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+import config
+from models.database import DATABASE_PATH
+
+BACKUP_PREFIX = 'games-'
+BACKUP_SUFFIX = '.db.gz'
+
+# Tablas cuyo conteo se compara entre el backup y la BD viva
+COUNTED_TABLES = ('games', 'users', 'contests', 'contest_scores', 'game_events')
+
+# Ranking guardado vs. el que sale de sumar los juegos aprobados
+STORED_LEADERBOARD = '''
+    SELECT contest_id, discord_id, total_points, total_games
+    FROM contest_scores
+    WHERE total_games > 0
+    ORDER BY contest_id, discord_id
+'''
+RECOMPUTED_LEADERBOARD = '''
+    SELECT contest_id, discord_user_id, SUM(total_points), COUNT(*)
+    FROM games
+    WHERE status = 'APPROVED'
+    GROUP BY contest_id, discord_user_id
+    ORDER BY contest_id, discord_user_id
+'''
+
+
+class _Restarted(Exception):
+    """La BD cambió tantas veces durante la copia que conviene hacerla de un tirón"""
+
+
+def list_backups(backup_dir: str = None) -> list:
+    """Rutas de los backups, del más reciente al más antiguo"""
+    pattern = os.path.join(backup_dir or config.BACKUP_DIR, f'{BACKUP_PREFIX}*{BACKUP_SUFFIX}')
+    return sorted(glob.glob(pattern), reverse=True)
+
+
+def latest_backup_time(backup_dir: str = None):
+    """Momento del último backup (None si no hay)"""
+    backups = list_backups(backup_dir)
+    return datetime.fromtimestamp(os.path.getmtime(backups[0])) if backups else None
+
+
+def rotate(keep: int = None, backup_dir: str = None) -> list:
+    """Borra los backups más viejos dejando los `keep` más recientes"""
+    keep = keep if keep is not None else config.BACKUP_KEEP
+    removed = list_backups(backup_dir)[keep:]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def run_backup(database_path: str = None, backup_dir: str = None) -> dict:
+    """Copia en caliente la BD con la API de backup de SQLite y la comprime.
+
+    Es bloqueante (pensado para asyncio.to_thread). Copia
+    BACKUP_PAGES_PER_STEP páginas por paso y duerme entre pasos, así que
+    nunca retiene la BD más que un paso. Si otra conexión escribe a mitad de
+    copia SQLite la reinicia; tras BACKUP_MAX_RESTARTS reinicios se copia
+    el resto en un solo paso (con WAL eso tampoco bloquea a los escritores).
+    Retorna {path, pages, bytes, restarts, seconds}.
+    """
+    backup_dir = backup_dir or config.BACKUP_DIR
+    os.makedirs(backup_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    name = f"{BACKUP_PREFIX}{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    raw_path = os.path.join(backup_dir, f'{name}.db.tmp')
+    final_path = os.path.join(backup_dir, f'{name}{BACKUP_SUFFIX}')
+
+    src = sqlite3.connect(f'file:{database_path or DATABASE_PATH}?mode=ro', uri=True)
+    dst = sqlite3.connect(raw_path)
+    restarts = 0
+    last_remaining = None
+    total_pages = 0
+
+    def progress(status, remaining, total):
+        nonlocal restarts, last_remaining, total_pages
+        total_pages = total
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > config.BACKUP_MAX_RESTARTS:
+                raise _Restarted()
+        last_remaining = remaining
+
+    try:
+        try:
+            src.backup(dst, pages=config.BACKUP_PAGES_PER_STEP, progress=progress,
+                       sleep=config.BACKUP_STEP_SLEEP_MS / 1000)
+        except _Restarted:
+            src.backup(dst, pages=-1)
+        dst.close()
+
+        # Comprimir a un .tmp y renombrar: un backup a medias nunca queda en la lista
+        with open(raw_path, 'rb') as raw, gzip.open(f'{final_path}.tmp', 'wb', compresslevel=6) as gz:
+            shutil.copyfileobj(raw, gz, 1024 * 1024)
+        os.replace(f'{final_path}.tmp', final_path)
+    finally:
+        src.close()
+        dst.close()
+        for leftover in (raw_path, f'{final_path}.tmp'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    return {
+        'path': final_path,
+        'pages': total_pages,
+        'bytes': os.path.getsize(final_path),
+        'restarts': restarts,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _leaderboard_checksum(conn: sqlite3.Connection, sql: str) -> str:
+    digest = hashlib.sha256()
+    for row in conn.execute(sql):
+        digest.update(('|'.join(str(value) for value in row) + '\n').encode())
+    return digest.hexdigest()[:16]
+
+
+def _summary(conn: sqlite3.Connection) -> dict:
+    return {
+        'counts': {
+            table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            for table in COUNTED_TABLES
+        },
+        'stored': _leaderboard_checksum(conn, STORED_LEADERBOARD),
+        'recomputed': _leaderboard_checksum(conn, RECOMPUTED_LEADERBOARD),
+    }
+
+
+def verify_backup(path: str = None, database_path: str = None) -> dict:
+    """Restaura un backup a un archivo temporal, lo abre en solo lectura y lo revisa.
+
+    Comprueba integridad, conteos por tabla y que el ranking guardado
+    coincida con el recalculado desde sus juegos; también lo compara con la
+    BD viva (que puede haber cambiado desde el backup). Bloqueante.
+    """
+    if path is None:
+        backups = list_backups()
+        if not backups:
+            raise FileNotFoundError('No hay backups')
+        path = backups[0]
+
+    fd, restored = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        with gzip.open(path, 'rb') as gz, open(restored, 'wb') as out:
+            shutil.copyfileobj(gz, out, 1024 * 1024)
+
+        conn = sqlite3.connect(f'file:{restored}?mode=ro', uri=True)
+        try:
+            integrity = conn.execute('PRAGMA integrity_check').fetchone()[0]
+            backup = _summary(conn)
+        finally:
+            conn.close()
+    finally:
+        os.remove(restored)
+
+    live_conn = sqlite3.connect(f'file:{database_path or DATABASE_PATH}?mode=ro', uri=True)
+    try:
+        live = _summary(live_conn)
+    finally:
+        live_conn.close()
+
+    return {
+        'path': path,
+        'taken_at': datetime.fromtimestamp(os.path.getmtime(path)),
+        'integrity': integrity,
+        'backup': backup,
+        'live': live,
+        'ok': integrity == 'ok' and backup['stored'] == backup['recomputed'],
+    }
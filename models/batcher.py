@@ -0,0 +1,173 @@
+import asyncio
+import time
+from models.database import get_db
+import config
+
+
+class WriteBatcher:
+    """Escritor único de la BD: agrupa escrituras concurrentes en una transacción
+
+    Todas las escrituras pasan por una sola tarea con una sola conexión, así
+    que nunca compiten por el lock de SQLite. Cada llamada encola su trabajo y
+    espera a que el lote que lo contiene haga commit; una ráfaga de /registrar
+    paga un solo fsync en lugar de uno por registro.
+
+    Un trabajo es una lista de sentencias [(sql, params), ...] (submit) o una
+    corrutina que recibe la conexión y puede leer antes de escribir (run).
+    Si un lote de varios trabajos falla, cada uno se reintenta solo: las
+    funciones de run pueden ejecutarse dos veces y deben ser idempotentes
+    fuera de la BD (sin prints, cachés ni contadores con efectos).
+    """
+
+    def __init__(self, window_ms: int = 5, max_batch: int = 200):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.queue = None
+        self.worker = None
+        self.db = None
+
+        # Estadísticas
+        self.batches = 0
+        self.jobs = 0
+        self.max_batch_size = 0
+        self.total_commit_time = 0.0
+        self.max_commit_time = 0.0
+
+    def _ensure_worker(self):
+        """Arranca la tarea de escritura en el event loop actual"""
+        if self.worker is None or self.worker.done():
+            # Lo que quedó en la cola de un escritor caído nunca se escribirá
+            while self.queue is not None and not self.queue.empty():
+                _, future = self.queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError('El escritor de la BD se detuvo'))
+            self.queue = asyncio.Queue()
+            self.db = None
+            self.worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, statements: list) -> bool:
+        """Encola [(sql, params), ...] y retorna True cuando el lote hizo commit.
+
+        Si la escritura falla, la excepción se propaga al llamador.
+        """
+        return await self._enqueue(statements)
+
+    async def run(self, func):
+        """Ejecuta `await func(db)` dentro de la transacción del escritor.
+
+        Retorna lo que retorne func una vez hecho el commit; si falla, la
+        excepción se propaga al llamador. func debe ser idempotente fuera de
+        la BD: si el lote que la contiene falla, se vuelve a ejecutar sola.
+        """
+        return await self._enqueue(func)
+
+    async def _enqueue(self, job):
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((job, future))
+        return await future
+
+    async def _run(self):
+        """Bucle principal: espera trabajo, junta una ventana y lo escribe"""
+        try:
+            while True:
+                job = await self.queue.get()
+                batch = [job]
+
+                # Dar unos milisegundos para que lleguen más escrituras
+                await asyncio.sleep(self.window)
+                while len(batch) < self.max_batch and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+
+                await self._flush(batch)
+        finally:
+            if self.db:
+                await self.db.close()
+                self.db = None
+
+    async def _execute_job(self, job):
+        """Ejecuta un trabajo sobre la conexión del escritor"""
+        if callable(job):
+            return await job(self.db)
+
+        for sql, params in job:
+            await self.db.execute(sql, params)
+        return True
+
+    async def _flush(self, batch: list):
+        """Escribe el lote en una transacción y resuelve a cada llamador"""
+        start = time.perf_counter()
+        outcomes = []
+
+        try:
+            if self.db is None:
+                self.db = await get_db()
+
+            try:
+                results = [await self._execute_job(job) for job, _ in batch]
+                await self.db.commit()
+                outcomes = [(True, result) for result in results]
+            except Exception as e:
+                await self.db.rollback()
+                if len(batch) == 1:
+                    # Un solo trabajo: su error es el resultado, sin repetirlo
+                    outcomes = [(False, e)]
+                else:
+                    # Un trabajo inválido no debe tumbar al resto: reintentar uno por uno
+                    print(f'⚠️ [BATCH] Lote falló ({e}), reintentando individualmente')
+                    for job, _ in batch:
+                        try:
+                            result = await self._execute_job(job)
+                            await self.db.commit()
+                            outcomes.append((True, result))
+                        except Exception as e:
+                            await self.db.rollback()
+                            outcomes.append((False, e))
+        except Exception as e:
+            print(f'❌ [BATCH] Error escribiendo lote: {e}')
+            outcomes = [(False, e)] * len(batch)
+            # Reconectar en el siguiente lote
+            if self.db:
+                try:
+                    await self.db.close()
+                except Exception:
+                    pass
+                self.db = None
+
+        elapsed = time.perf_counter() - start
+        self._record(len(batch), elapsed)
+
+        # Confirmar a cada llamador solo después del commit
+        for (_, future), (ok, value) in zip(batch, outcomes):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _record(self, size: int, elapsed: float):
+        """Registra tamaño de lote y latencia de commit"""
+        self.batches += 1
+        self.jobs += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.total_commit_time += elapsed
+        self.max_commit_time = max(self.max_commit_time, elapsed)
+
+        if size > 1:
+            print(f'📦 [BATCH] {size} escrituras en un commit ({elapsed * 1000:.1f}ms)')
+
+    def get_stats(self) -> dict:
+        """Resumen de tamaños de lote y latencia de commit"""
+        return {
+            'batches': self.batches,
+            'jobs': self.jobs,
+            'avg_batch_size': round(self.jobs / self.batches, 2) if self.batches else 0,
+            'max_batch_size': self.max_batch_size,
+            'avg_commit_ms': round(self.total_commit_time / self.batches * 1000, 2) if self.batches else 0,
+            'max_commit_ms': round(self.max_commit_time * 1000, 2),
+        }
+
+
+# Escritor único de la BD (registros, revisiones y ediciones de admins)
+db_writer = WriteBatcher(window_ms=config.REGISTRATION_BATCH_WINDOW_MS)
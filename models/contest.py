@@ -0,0 +1,160 @@
+import time
+from datetime import datetime
+from models.database import get_read_db
+from models.batcher import db_writer
+from utils.shared_state import shared_state
+
+# Concurso configurado por variables de entorno (creado en init_db)
+DEFAULT_CONTEST_ID = 1
+
+# guild_id -> Contest activo; vale mientras coincida con la versión compartida
+_active_by_guild = {}
+
+# La versión compartida se consulta como mucho cada VERSION_CHECK_S segundos
+# por servidor (un concurso nuevo tarda eso en verse en los otros procesos)
+VERSION_CHECK_S = 5
+_version_checked = {}  # guild_id -> time.monotonic() de la última consulta
+
+
+def _version_key(guild_id: int) -> str:
+    """Clave en shared_state con el id del último concurso creado en el servidor"""
+    return f'contest-version:{guild_id}'
+
+class Contest:
+    """Modelo para manejar concursos (uno activo por servidor)"""
+
+    def __init__(self, id, guild_id, name, start_date, end_date, is_active=True, created_at=None,
+                 elkie_id=None):
+        self.id = id
+        self.guild_id = guild_id
+        self.name = name
+        self.start_date = _parse_date(start_date)
+        self.end_date = _parse_date(end_date)
+        self.is_active = bool(is_active)
+        self.created_at = created_at
+        # Participante con la regla Elkie en este concurso (uno como máximo)
+        self.elkie_id = elkie_id
+
+    def is_open(self, when: datetime = None) -> bool:
+        """True si la fecha cae dentro del periodo del concurso"""
+        when = when or datetime.now()
+        return self.start_date <= when < self.end_date
+
+    @staticmethod
+    async def get(contest_id: int):
+        """Obtiene un concurso por ID"""
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT id, guild_id, name, start_date, end_date, is_active, created_at, elkie_id
+                FROM contests
+                WHERE id = ?
+            ''', (contest_id,))
+            row = await cursor.fetchone()
+            return Contest(*row) if row else None
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def get_for_guild(guild_id: int):
+        """Concurso activo del servidor; sin uno propio se usa el por defecto.
+
+        La caché del proceso se descarta si otro proceso creó un concurso
+        para el servidor (su id queda publicado en shared_state).
+        """
+        cached = _active_by_guild.get(guild_id)
+        if cached:
+            if time.monotonic() - _version_checked.get(guild_id, 0) < VERSION_CHECK_S:
+                return cached
+            version = await shared_state.aget(_version_key(guild_id))
+            _version_checked[guild_id] = time.monotonic()
+            if version is None or version == cached.id:
+                return cached
+
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT id, guild_id, name, start_date, end_date, is_active, created_at, elkie_id
+                FROM contests
+                WHERE guild_id = ? AND is_active = 1
+                ORDER BY start_date DESC
+                LIMIT 1
+            ''', (guild_id,))
+            row = await cursor.fetchone()
+        finally:
+            await db.close()
+
+        contest = Contest(*row) if row else await Contest.get(DEFAULT_CONTEST_ID)
+        _active_by_guild[guild_id] = contest
+        _version_checked[guild_id] = time.monotonic()
+        return contest
+
+    @staticmethod
+    async def get_by_guild(guild_id: int) -> list:
+        """Todos los concursos de un servidor, del más reciente al más antiguo"""
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT id, guild_id, name, start_date, end_date, is_active, created_at, elkie_id
+                FROM contests
+                WHERE guild_id = ?
+                ORDER BY start_date DESC
+            ''', (guild_id,))
+            return [Contest(*row) for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def get_active() -> list:
+        """Concursos activos de todos los servidores"""
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT id, guild_id, name, start_date, end_date, is_active, created_at, elkie_id
+                FROM contests
+                WHERE is_active = 1
+            ''')
+            return [Contest(*row) for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def create(guild_id: int, name: str, start_date: datetime, end_date: datetime):
+        """Crea un concurso y lo deja como el activo del servidor"""
+        async def insert(db):
+            # Un solo concurso activo por servidor
+            await db.execute('''
+                UPDATE contests SET is_active = 0 WHERE guild_id = ? AND is_active = 1
+            ''', (guild_id,))
+            cursor = await db.execute('''
+                INSERT INTO contests (guild_id, name, start_date, end_date)
+                VALUES (?, ?, ?, ?)
+                RETURNING id, guild_id, name, start_date, end_date, is_active, created_at, elkie_id
+            ''', (guild_id, name, start_date.isoformat(), end_date.isoformat()))
+            return await cursor.fetchone()
+
+        try:
+            row = await db_writer.run(insert)
+        except Exception as e:
+            print(f'Error creando concurso: {e}')
+            return None
+
+        contest = Contest(*row)
+        _active_by_guild[guild_id] = contest
+        _version_checked[guild_id] = time.monotonic()
+        await shared_state.aset(_version_key(guild_id), contest.id)
+        return contest
+
+
+    @staticmethod
+    async def set_elkie(contest_id: int, discord_id: int = None):
+        """Marca a discord_id como el Elkie del concurso (None lo desmarca)"""
+        await db_writer.submit([
+            ('UPDATE contests SET elkie_id = ? WHERE id = ?', (discord_id, contest_id)),
+        ])
+
+
+def _parse_date(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
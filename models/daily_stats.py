@@ -0,0 +1,38 @@
+from models.database import get_read_db
+
+# Ventanas (en días) de las tasas de actividad del tablero
+WINDOWS = (7, 30)
+
+
+class DailyStats:
+    """Agregados por día (juegos, puntos, platinos) que mantiene el pliegue de eventos"""
+
+    @staticmethod
+    async def activity(contest_id: int, discord_id: int = 0) -> dict:
+        """Totales y sumas de los últimos 7 y 30 días (discord_id = 0: todo el concurso).
+
+        Lee a lo sumo una fila por día, sin importar cuántos juegos haya.
+        Retorna {games, points, platinums, games_7, points_7, games_30, points_30}.
+        """
+        windows = ',\n'.join(
+            f"COALESCE(SUM(CASE WHEN day >= date('now', '-{days - 1} days') THEN {column} END), 0)"
+            for days in WINDOWS for column in ('games', 'points')
+        )
+        db = await get_read_db()
+        try:
+            cursor = await db.execute(f'''
+                SELECT COALESCE(SUM(games), 0), COALESCE(SUM(points), 0),
+                       COALESCE(SUM(platinums), 0),
+                       {windows}
+                FROM daily_stats
+                WHERE contest_id = ? AND discord_id = ?
+            ''', (contest_id, discord_id))
+            games, points, platinums, *window_sums = await cursor.fetchone()
+        finally:
+            await db.close()
+
+        activity = {'games': games, 'points': points, 'platinums': platinums}
+        for i, days in enumerate(WINDOWS):
+            activity[f'games_{days}'] = window_sums[2 * i]
+            activity[f'points_{days}'] = window_sums[2 * i + 1]
+        return activity
@@ -1,12 +1,32 @@
 import aiosqlite
+import json
+from aiosqlite.context import Result
 import os
+import time
+import config
+from utils.metrics import metrics, sql_label
+from models.profiler import profiler
+from utils.validators import title_key, TITLE_KEY_VERSION
 
 DATABASE_PATH = 'data/games.db'
 
-async def debug_schema():
-    """Muestra el esquema completo de la BD"""
+# Ajustes de SQLite aplicados a cada conexión
+BUSY_TIMEOUT_MS = 5000          # Esperar en vez de fallar con "database is locked"
+CACHE_SIZE_KB = 16384           # 16 MB de caché de páginas por conexión
+MMAP_SIZE = 64 * 1024 * 1024    # 64 MB de lectura vía mmap
+
+# init_db y las verificaciones de esquema corren una vez por proceso
+_initialized = False
+
+# Conexiones de solo lectura libres, ya con sus PRAGMA (ver get_read_db)
+_read_pool = []
+
+async def debug_schema(db=None):
+    """Muestra el esquema completo de la BD (reusa la conexión si se la pasan)"""
+    own_connection = db is None
     try:
-        db = await get_db()
+        if own_connection:
+            db = await get_db()
         
         print("\n" + "="*60)
         print("🔍 DEBUG: ESTRUCTURA DE LA BASE DE DATOS")
@@ -24,26 +44,122 @@ async def debug_schema():
         
         print("\n" + "="*60 + "\n")
         
-        await db.close()
+        if own_connection:
+            await db.close()
         
     except Exception as e:
         print(f"❌ Error en debug_schema: {e}")
 
+async def _apply_pragmas(db):
+    """Aplica los PRAGMA de rendimiento a una conexión"""
+    await db.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    await db.execute(f'PRAGMA cache_size = -{CACHE_SIZE_KB}')
+    await db.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+    # Con WAL, NORMAL solo arriesga la última transacción ante un corte de luz,
+    # nunca la integridad de la BD
+    await db.execute('PRAGMA synchronous = NORMAL')
+    await db.execute('PRAGMA temp_store = MEMORY')
+    return _instrument(db)
+
+
+def _instrument(db):
+    """Mide cada sentencia SQL de la conexión (después de los PRAGMA)"""
+    explain = db.execute
+    for method_name in ('execute', 'execute_fetchall', 'execute_insert', 'executemany'):
+        # EXPLAIN solo tiene sentido con los parámetros de una única sentencia
+        can_explain = method_name in ('execute', 'execute_fetchall')
+        setattr(db, method_name, _timed_statement(getattr(db, method_name), explain if can_explain else None))
+    return db
+
+
+def _timed_statement(method, explain):
+    # aiosqlite devuelve un Result que sirve con await y con async with
+    async def run(sql, parameters=None):
+        start = time.perf_counter()
+        with metrics.span('sql', sql_label(sql)):
+            result = await method(sql, parameters)
+        
+        if profiler.enabled:
+            await profiler.record(explain, sql, parameters, result, time.perf_counter() - start)
+        return result
+    
+    def wrapper(sql, parameters=None):
+        return Result(run(sql, parameters))
+    
+    return wrapper
+
+
 async def get_db():
-    """Retorna una conexión a la base de datos"""
-    return await aiosqlite.connect(DATABASE_PATH)
+    """Retorna una conexión de escritura a la base de datos.
+    
+    Las escrituras normales deben pasar por models.batcher.db_writer, que
+    serializa todo en una sola tarea; esta conexión queda para init y scripts.
+    """
+    db = await aiosqlite.connect(DATABASE_PATH)
+    return await _apply_pragmas(db)
+
+
+async def get_read_db():
+    """Retorna una conexión de solo lectura (varias pueden leer en paralelo con WAL).
+
+    Las conexiones se reciclan: close() la devuelve al pool en vez de cerrarla,
+    así que abrir el archivo y aplicar los PRAGMA se paga una vez por conexión
+    y no por consulta. El pool guarda hasta config.READ_POOL_SIZE libres.
+    """
+    while _read_pool:
+        db = _read_pool.pop()
+        if db._running:
+            db._in_pool = False
+            return db
+
+    connector = aiosqlite.connect(f'file:{DATABASE_PATH}?mode=ro', uri=True)
+    # Las libres no deben impedir que el proceso termine
+    connector.daemon = True
+    db = await _apply_pragmas(await connector)
+
+    db._in_pool = False
+    db.close_connection = db.close
+    db.close = lambda: _release_read_db(db)
+    return db
+
+
+async def _release_read_db(db):
+    """Devuelve una conexión de lectura al pool (o la cierra si sobra)"""
+    if db._in_pool:
+        return
+    if db._running and len(_read_pool) < config.READ_POOL_SIZE:
+        db._in_pool = True
+        _read_pool.append(db)
+    else:
+        await db.close_connection()
+
+
+async def close_read_pool():
+    """Cierra las conexiones de lectura libres (p. ej. antes de reemplazar el archivo)"""
+    while _read_pool:
+        await _read_pool.pop().close_connection()
 
 
 async def init_db():
-    """Inicializa la base de datos y crea las tablas necesarias"""
+    """Inicializa la base de datos y crea las tablas necesarias.
+    
+    Solo trabaja la primera vez por proceso; las llamadas siguientes no
+    abren conexión.
+    """
+    global _initialized
+    if _initialized:
+        return
     
     # Crear carpeta data si no existe
-    os.makedirs('data', exist_ok=True)
+    os.makedirs(os.path.dirname(DATABASE_PATH) or '.', exist_ok=True)
     
     db = await get_db()
     
     try:
-        # Tabla de usuarios
+        # WAL: lectores y el escritor no se bloquean entre sí (persistente en el archivo)
+        await db.execute('PRAGMA journal_mode = WAL')
+        
+        # Tabla de usuarios (is_elkie ya no se usa: Elkie es por concurso, contests.elkie_id)
         await db.execute('''
             CREATE TABLE IF NOT EXISTS users (
                 discord_id INTEGER PRIMARY KEY,
@@ -51,7 +167,8 @@ async def init_db():
                 total_points INTEGER DEFAULT 0,
                 total_games INTEGER DEFAULT 0,
                 is_elkie INTEGER DEFAULT 0,
-                join_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                join_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                role TEXT DEFAULT 'NORMAL'
             )
         ''')
         
@@ -70,21 +187,157 @@ async def init_db():
                 status TEXT DEFAULT 'PENDING',
                 submission_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 reviewed_by INTEGER,
-                reviewed_at TIMESTAMP,
+                review_date TIMESTAMP,
                 rejection_reason TEXT,
-                image_url TEXT DEFAULT ''
+                evidence_url TEXT DEFAULT '',
+                contest_id INTEGER NOT NULL DEFAULT 1,
+                title_key TEXT
+            )
+        ''')
+        
+        # Concursos: cada servidor puede tener el suyo (o varios a lo largo del tiempo)
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS contests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                start_date TIMESTAMP NOT NULL,
+                end_date TIMESTAMP NOT NULL,
+                is_active INTEGER DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                elkie_id INTEGER
+            )
+        ''')
+        
+        # Puntos por concurso; users.total_points queda como total histórico
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS contest_scores (
+                contest_id INTEGER NOT NULL,
+                discord_id INTEGER NOT NULL,
+                total_points INTEGER DEFAULT 0,
+                total_games INTEGER DEFAULT 0,
+                PRIMARY KEY (contest_id, discord_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Log append-only de cambios de juegos; los agregados se derivan de él
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS game_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                game_id INTEGER NOT NULL,
+                contest_id INTEGER NOT NULL,
+                discord_user_id INTEGER NOT NULL,
+                event_type TEXT NOT NULL,
+                day TEXT,
+                points_delta INTEGER NOT NULL DEFAULT 0,
+                games_delta INTEGER NOT NULL DEFAULT 0,
+                platinums_delta INTEGER NOT NULL DEFAULT 0,
+                payload TEXT,
+                actor_id INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Fotos periódicas del ranking: (concurso, momento, usuario) → puesto
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS rank_snapshots (
+                contest_id INTEGER NOT NULL,
+                taken_at TEXT NOT NULL,
+                discord_id INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                points INTEGER NOT NULL,
+                games INTEGER NOT NULL,
+                PRIMARY KEY (contest_id, taken_at, discord_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Agregados por día para las tasas de actividad (discord_id = 0 es el
+        # total del concurso); discord_id va antes que day para que el total
+        # sea un rango contiguo
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS daily_stats (
+                contest_id INTEGER NOT NULL,
+                discord_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                games INTEGER NOT NULL DEFAULT 0,
+                points INTEGER NOT NULL DEFAULT 0,
+                platinums INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (contest_id, discord_id, day)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Resumen por usuario de /estadisticas y la biblioteca; lo mantiene el
+        # pliegue de eventos (categories/platforms: {nombre: juegos},
+        # top_games: [[nombre, puntos, platino], ...])
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS user_stats (
+                contest_id INTEGER NOT NULL,
+                discord_id INTEGER NOT NULL,
+                games INTEGER NOT NULL DEFAULT 0,
+                points INTEGER NOT NULL DEFAULT 0,
+                platinums INTEGER NOT NULL DEFAULT 0,
+                recompleted INTEGER NOT NULL DEFAULT 0,
+                categories TEXT NOT NULL DEFAULT '{}',
+                platforms TEXT NOT NULL DEFAULT '{}',
+                top_games TEXT NOT NULL DEFAULT '[]',
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (contest_id, discord_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Versiones de la tabla de puntos y cuándo se aplicó cada una
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS scoring_rules (
+                version INTEGER PRIMARY KEY AUTOINCREMENT,
+                rules TEXT NOT NULL,
+                created_by INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                applied_at TIMESTAMP,
+                games_updated INTEGER,
+                elapsed_ms REAL
             )
         ''')
         
+        # Valores internos de la BD (p. ej. con qué versión se calcularon las title_key)
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS db_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        
+        # Hasta qué evento están plegados users, contest_scores, daily_stats y user_stats
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS event_checkpoints (
+                name TEXT PRIMARY KEY,
+                last_event_id INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) WITHOUT ROWID
+        ''')
+        
         await db.commit()
         
         print('✅ Base de datos inicializada correctamente')
         
         # DEBUG: Mostrar estructura real
-        await debug_schema()
+        await debug_schema(db)
         
         # Verificar esquema
-        await fix_database_schema()
+        await fix_database_schema(db)
+        
+        # Índices y concurso por defecto (requieren la columna contest_id)
+        await _init_contests(db)
+        
+        # Log de eventos (requiere contest_id y contest_scores)
+        await _init_events(db)
+        
+        # Claves de título para detectar registros duplicados
+        await _init_title_keys(db)
+        
+        # Versión 1 de los puntos = los de config al crear la tabla
+        await _init_scoring(db)
+        
+        _initialized = True
         
     except Exception as e:
         print(f"❌ Error inicializando base de datos: {e}")
@@ -92,19 +345,178 @@ async def init_db():
         await db.close()
 
 
-async def fix_database_schema():
-    """Verifica que el esquema esté correcto"""
+async def fix_database_schema(db=None):
+    """Verifica que el esquema esté correcto (reusa la conexión si se la pasan)"""
+    own_connection = db is None
     try:
-        db = await get_db()
+        if own_connection:
+            db = await get_db()
         
         cursor = await db.execute("PRAGMA table_info(games)")
         columns = await cursor.fetchall()
         column_names = [col[1] for col in columns]
         
         print(f"📋 Columnas actuales en 'games': {', '.join(column_names)}")
+        
+        # Columnas que usan los modelos y que BDs antiguas pueden no tener
+        expected = {
+            'games': [
+                ('evidence_url', "TEXT DEFAULT ''"),
+                ('review_date', 'TIMESTAMP'),
+                ('contest_id', 'INTEGER NOT NULL DEFAULT 1'),
+                ('title_key', 'TEXT'),
+            ],
+            'users': [('role', "TEXT DEFAULT 'NORMAL'")],
+            'contests': [('elkie_id', 'INTEGER')],
+            'game_events': [
+                ('day', 'TEXT'),
+                ('platinums_delta', 'INTEGER NOT NULL DEFAULT 0'),
+            ],
+        }
+        
+        for table, table_columns in expected.items():
+            cursor = await db.execute(f"PRAGMA table_info({table})")
+            existing = {col[1] for col in await cursor.fetchall()}
+            for name, definition in table_columns:
+                if name not in existing:
+                    await db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+                    print(f"🔧 Columna agregada: {table}.{name}")
+        
+        await db.commit()
         print("✅ Esquema de BD está correcto")
         
-        await db.close()
+        if own_connection:
+            await db.close()
         
     except Exception as e:
-        print(f"⚠️ Error verificando esquema: {e}")
\ No newline at end of file
+        print(f"⚠️ Error verificando esquema: {e}")
+
+async def _init_events(db):
+    """Índices y triggers del log de eventos; lo siembra en BDs anteriores a él"""
+    from models.events import BOOTSTRAP_STATEMENTS
+    
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_game_events_game
+        ON game_events (game_id, id)
+    ''')
+    
+    # Append-only: los eventos no se modifican ni se borran
+    for action in ('UPDATE', 'DELETE'):
+        await db.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS game_events_no_{action.lower()}
+            BEFORE {action} ON game_events
+            BEGIN
+                SELECT RAISE(ABORT, 'game_events es append-only');
+            END
+        ''')
+    
+    for sql in BOOTSTRAP_STATEMENTS:
+        await db.execute(sql)
+    
+    await db.commit()
+
+
+async def _init_title_keys(db):
+    """Calcula title_key de los juegos que no la tienen y crea su índice.
+    
+    Si la clave cambió de versión (TITLE_KEY_VERSION) se recalculan todas.
+    """
+    await db.create_function('title_key', 1, title_key, deterministic=True)
+    
+    cursor = await db.execute("SELECT value FROM db_meta WHERE key = 'title_key_version'")
+    row = await cursor.fetchone()
+    # Sin fila: claves de la versión 1 (anterior a db_meta)
+    outdated = int(row[0] if row else 1) != TITLE_KEY_VERSION
+    
+    cursor = await db.execute(f'''
+        UPDATE games SET title_key = title_key(game_name)
+        WHERE {'title_key IS NOT title_key(game_name)' if outdated else 'title_key IS NULL'}
+    ''')
+    if cursor.rowcount:
+        print(f"🔑 title_key calculada para {cursor.rowcount} juegos")
+    
+    await db.execute('''
+        INSERT INTO db_meta (key, value) VALUES ('title_key_version', ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+    ''', (str(TITLE_KEY_VERSION),))
+    
+    # "¿Este usuario ya registró este juego?" sin recorrer sus juegos
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_games_user_title
+        ON games (discord_user_id, title_key)
+    ''')
+    await db.commit()
+
+
+async def _init_scoring(db):
+    """Registra la tabla de puntos inicial y avisa si config ya no coincide"""
+    rules = json.dumps(config.PUNTOS_CATEGORIA, sort_keys=True)
+    await db.execute('''
+        INSERT INTO scoring_rules (rules, applied_at)
+        SELECT ?, datetime('now')
+        WHERE NOT EXISTS (SELECT 1 FROM scoring_rules)
+    ''', (rules,))
+    await db.commit()
+    
+    cursor = await db.execute('SELECT version, rules FROM scoring_rules ORDER BY version DESC LIMIT 1')
+    version, latest = await cursor.fetchone()
+    if json.loads(latest) != config.PUNTOS_CATEGORIA:
+        print(f"⚠️ PUNTOS_CATEGORIA cambió desde la versión {version}; usa /recalcular-puntos para aplicarlo")
+
+
+async def _init_contests(db):
+    """Crea los índices por concurso y el concurso por defecto (id 1)"""
+    # Todos los índices empiezan por contest_id: el ranking de un servidor
+    # solo recorre sus propias filas, no las de los demás
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_games_contest_status_user
+        ON games (contest_id, status, discord_user_id)
+    ''')
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_games_contest_user_date
+        ON games (contest_id, discord_user_id, submission_date)
+    ''')
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_contest_scores_ranking
+        ON contest_scores (contest_id, total_points DESC, total_games DESC)
+    ''')
+    # "Puesto de X en el momento T" sin recorrer las fotos de los demás
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_rank_snapshots_user
+        ON rank_snapshots (contest_id, discord_id, taken_at)
+    ''')
+    await db.execute('''
+        CREATE INDEX IF NOT EXISTS idx_contests_guild
+        ON contests (guild_id, is_active)
+    ''')
+    
+    # El concurso configurado por variables de entorno es el id 1; los
+    # registros anteriores a esta tabla ya tienen contest_id = 1
+    await db.execute('''
+        INSERT OR IGNORE INTO contests (id, guild_id, name, start_date, end_date)
+        VALUES (1, ?, ?, ?, ?)
+    ''', (int(config.GUILD_ID or 0), config.CONTEST_NAME,
+          config.CONTEST_START_DATE.isoformat(), config.CONTEST_END_DATE.isoformat()))
+    
+    # Elkie era global (users.is_elkie); ahora es por concurso. El marcado
+    # de antes pasa al concurso por defecto y la columna vieja queda en 0
+    await db.execute('''
+        UPDATE contests
+        SET elkie_id = (SELECT MIN(discord_id) FROM users WHERE is_elkie = 1)
+        WHERE id = 1 AND EXISTS (SELECT 1 FROM users WHERE is_elkie = 1)
+    ''')
+    await db.execute('UPDATE users SET is_elkie = 0 WHERE is_elkie = 1')
+    
+    # Primera vez: calcular los puntos por concurso a partir de los juegos
+    # (OR IGNORE: otro shard puede estar haciendo lo mismo al mismo tiempo)
+    cursor = await db.execute('SELECT 1 FROM contest_scores LIMIT 1')
+    if await cursor.fetchone() is None:
+        await db.execute('''
+            INSERT OR IGNORE INTO contest_scores (contest_id, discord_id, total_points, total_games)
+            SELECT contest_id, discord_user_id, SUM(total_points), COUNT(*)
+            FROM games
+            WHERE status = 'APPROVED'
+            GROUP BY contest_id, discord_user_id
+        ''')
+    
+    await db.commit()
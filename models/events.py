@@ -0,0 +1,417 @@
+import json
+from models.database import get_read_db
+from models.batcher import db_writer
+
+# Fila completa de games tal como queda guardada en el evento 'created'
+ROW_JSON = '''json_object(
+    'discord_user_id', discord_user_id, 'username', username, 'game_name', game_name,
+    'category', category, 'platform', platform, 'has_platinum', has_platinum,
+    'is_recompleted', is_recompleted, 'total_points', total_points, 'status', status,
+    'evidence_url', evidence_url, 'submission_date', submission_date, 'contest_id', contest_id
+)'''
+
+# Lo que cambia al revisar un juego
+REVIEW_JSON = '''json_object(
+    'status', status, 'reviewed_by', reviewed_by, 'review_date', review_date,
+    'rejection_reason', rejection_reason
+)'''
+
+INSERT_EVENT = '''
+    INSERT INTO game_events (
+        game_id, contest_id, discord_user_id, event_type, day,
+        points_delta, games_delta, platinums_delta, payload, actor_id
+    )
+'''
+
+# Día al que se imputa el juego en daily_stats (el de su registro)
+DAY = 'date(submission_date)'
+
+# Último evento ya sumado a users, contest_scores y daily_stats
+CHECKPOINT = "(SELECT last_event_id FROM event_checkpoints WHERE name = 'scores')"
+
+# Resumen de /estadisticas por usuario (totales, desgloses y top 3), recalculado
+# desde sus juegos aprobados para los pares (contest_id, discord_user_id) de {touched}
+USER_STATS_UPSERT = '''
+    INSERT INTO user_stats (
+        contest_id, discord_id, games, points, platinums, recompleted,
+        categories, platforms, top_games, updated_at
+    )
+    SELECT t.contest_id, t.discord_user_id,
+           COUNT(g.id), COALESCE(SUM(g.total_points), 0),
+           COALESCE(SUM(g.has_platinum), 0), COALESCE(SUM(g.is_recompleted), 0),
+           (SELECT json_group_object(category, n) FROM (
+               SELECT category, COUNT(*) AS n FROM games
+               WHERE contest_id = t.contest_id AND discord_user_id = t.discord_user_id
+                 AND status = 'APPROVED'
+               GROUP BY category)),
+           (SELECT json_group_object(platform, n) FROM (
+               SELECT platform, COUNT(*) AS n FROM games
+               WHERE contest_id = t.contest_id AND discord_user_id = t.discord_user_id
+                 AND status = 'APPROVED'
+               GROUP BY platform)),
+           (SELECT json_group_array(json_array(game_name, total_points, has_platinum)) FROM (
+               SELECT game_name, total_points, has_platinum FROM games
+               WHERE contest_id = t.contest_id AND discord_user_id = t.discord_user_id
+                 AND status = 'APPROVED'
+               ORDER BY total_points DESC, id
+               LIMIT 3)),
+           datetime('now')
+    FROM ({touched}) AS t
+    LEFT JOIN games g ON g.contest_id = t.contest_id
+                     AND g.discord_user_id = t.discord_user_id
+                     AND g.status = 'APPROVED'
+    WHERE true
+    GROUP BY t.contest_id, t.discord_user_id
+    ON CONFLICT(contest_id, discord_id) DO UPDATE SET
+        games = excluded.games,
+        points = excluded.points,
+        platinums = excluded.platinums,
+        recompleted = excluded.recompleted,
+        categories = excluded.categories,
+        platforms = excluded.platforms,
+        top_games = excluded.top_games,
+        updated_at = excluded.updated_at
+'''
+
+# Para bases de datos anteriores al log: un 'created' por juego y un
+# 'approved'/'rejected' por cada juego ya revisado. Los agregados ya reflejan
+# esos juegos, así que el checkpoint arranca en el último evento.
+BOOTSTRAP_STATEMENTS = [
+    f'''
+        INSERT INTO game_events (
+            game_id, contest_id, discord_user_id, event_type, day,
+            points_delta, games_delta, platinums_delta, payload, actor_id, created_at
+        )
+        SELECT id, contest_id, discord_user_id, 'created', {DAY}, 0, 0, 0,
+               json_set({ROW_JSON}, '$.status', 'PENDING'), discord_user_id,
+               COALESCE(submission_date, datetime('now'))
+        FROM games
+        WHERE NOT EXISTS (SELECT 1 FROM game_events)
+        ORDER BY id
+    ''',
+    f'''
+        INSERT INTO game_events (
+            game_id, contest_id, discord_user_id, event_type, day,
+            points_delta, games_delta, platinums_delta, payload, actor_id, created_at
+        )
+        SELECT id, contest_id, discord_user_id,
+               CASE status WHEN 'APPROVED' THEN 'approved' ELSE 'rejected' END, {DAY},
+               CASE status WHEN 'APPROVED' THEN total_points ELSE 0 END,
+               CASE status WHEN 'APPROVED' THEN 1 ELSE 0 END,
+               CASE status WHEN 'APPROVED' THEN has_platinum ELSE 0 END,
+               {REVIEW_JSON}, reviewed_by, COALESCE(review_date, datetime('now'))
+        FROM games
+        WHERE status IN ('APPROVED', 'REJECTED')
+          AND NOT EXISTS (SELECT 1 FROM game_events WHERE event_type != 'created')
+        ORDER BY id
+    ''',
+    # daily_stats de lo que ya estaba aprobado (por usuario y total = 0)
+    f'''
+        INSERT INTO daily_stats (contest_id, discord_id, day, games, points, platinums)
+        SELECT contest_id, discord_user_id, {DAY}, COUNT(*), SUM(total_points), SUM(has_platinum)
+        FROM games
+        WHERE status = 'APPROVED' AND NOT EXISTS (SELECT 1 FROM daily_stats)
+        GROUP BY contest_id, discord_user_id, {DAY}
+        UNION ALL
+        SELECT contest_id, 0, {DAY}, COUNT(*), SUM(total_points), SUM(has_platinum)
+        FROM games
+        WHERE status = 'APPROVED' AND NOT EXISTS (SELECT 1 FROM daily_stats)
+        GROUP BY contest_id, {DAY}
+    ''',
+    # user_stats de quienes ya tienen juegos aprobados
+    USER_STATS_UPSERT.format(touched='''
+        SELECT DISTINCT contest_id, discord_user_id
+        FROM games
+        WHERE status = 'APPROVED' AND NOT EXISTS (SELECT 1 FROM user_stats)
+    '''),
+    '''
+        INSERT OR IGNORE INTO event_checkpoints (name, last_event_id)
+        VALUES ('scores', (SELECT COALESCE(MAX(id), 0) FROM game_events))
+    ''',
+]
+
+
+def created_statements(actor_id: int) -> list:
+    """Evento del INSERT INTO games que se acaba de ejecutar"""
+    return [(f'''{INSERT_EVENT}
+        SELECT id, contest_id, discord_user_id, 'created', {DAY}, 0, 0, 0, {ROW_JSON}, ?
+        FROM games
+        WHERE id = last_insert_rowid() AND changes() > 0
+    ''', (actor_id,))]
+
+
+def reviewed_statements(game_ids: list, admin_id: int, approve: bool,
+                        only_if_changed: bool = False) -> list:
+    """Eventos de aprobación/rechazo (después del UPDATE).
+
+    only_if_changed: el UPDATE anterior pudo no tocar nada (ya revisado).
+    """
+    placeholders = ', '.join('?' for _ in game_ids)
+    guard = 'AND changes() > 0' if only_if_changed else ''
+    if approve:
+        event, points, games, platinums, status = 'approved', 'total_points', '1', 'has_platinum', 'APPROVED'
+    else:
+        event, points, games, platinums, status = 'rejected', '0', '0', '0', 'REJECTED'
+
+    return [(f'''{INSERT_EVENT}
+        SELECT id, contest_id, discord_user_id, '{event}', {DAY},
+               {points}, {games}, {platinums}, {REVIEW_JSON}, ?
+        FROM games
+        WHERE id IN ({placeholders}) AND status = '{status}' {guard}
+    ''', [admin_id, *game_ids])]
+
+
+def edited_statements(game_id: int, admin_id: int, changes: dict) -> list:
+    """Evento de edición (antes del UPDATE, para conocer los valores viejos)"""
+    deltas, params = [], []
+    for field in ('total_points', 'has_platinum'):
+        if field in changes:
+            deltas.append(f"CASE WHEN status = 'APPROVED' THEN ? - {field} ELSE 0 END")
+            params.append(changes[field])
+        else:
+            deltas.append('0')
+
+    return [(f'''{INSERT_EVENT}
+        SELECT id, contest_id, discord_user_id, 'edited', {DAY}, {deltas[0]}, 0, {deltas[1]}, ?, ?
+        FROM games
+        WHERE id = ?
+    ''', [*params, json.dumps(changes, ensure_ascii=False), admin_id, game_id])]
+
+
+def rescored_statements(points_sql: str, params: list, admin_id: int, contest_id: int) -> list:
+    """Eventos de un recálculo de puntos del concurso (antes del UPDATE de games).
+
+    points_sql es la expresión de los puntos nuevos (sobre columnas de games)
+    y params sus parámetros; solo se registran los juegos que cambian.
+    """
+    return [(f'''{INSERT_EVENT}
+        SELECT id, contest_id, discord_user_id, 'rescored', {DAY},
+               CASE WHEN status = 'APPROVED' THEN ({points_sql}) - total_points ELSE 0 END,
+               0, 0, json_object('total_points', {points_sql}), ?
+        FROM games
+        WHERE contest_id = ? AND total_points != ({points_sql})
+    ''', [*params, *params, admin_id, contest_id, *params])]
+
+
+def deleted_statements(game_id: int, admin_id: int) -> list:
+    """Evento de eliminación (antes del DELETE): descuenta lo que sumaba"""
+    return [(f'''{INSERT_EVENT}
+        SELECT id, contest_id, discord_user_id, 'deleted', {DAY},
+               CASE WHEN status = 'APPROVED' THEN -total_points ELSE 0 END,
+               CASE WHEN status = 'APPROVED' THEN -1 ELSE 0 END,
+               CASE WHEN status = 'APPROVED' THEN -has_platinum ELSE 0 END,
+               NULL, ?
+        FROM games
+        WHERE id = ?
+    ''', (admin_id, game_id))]
+
+
+def fold_statements() -> list:
+    """Suma a users, contest_scores y daily_stats los eventos posteriores al checkpoint.
+
+    Va en la misma transacción que los eventos: los agregados nunca quedan
+    a medio camino y solo se leen las filas nuevas del log. user_stats se
+    recalcula solo para los usuarios que esos eventos tocan.
+    """
+    return [
+        (f'''
+            UPDATE users
+            SET total_points = total_points + delta.points,
+                total_games = total_games + delta.games
+            FROM (
+                SELECT discord_user_id, SUM(points_delta) AS points, SUM(games_delta) AS games
+                FROM game_events
+                WHERE id > {CHECKPOINT}
+                GROUP BY discord_user_id
+            ) AS delta
+            WHERE users.discord_id = delta.discord_user_id
+        ''', ()),
+        (f'''
+            INSERT INTO contest_scores (contest_id, discord_id, total_points, total_games)
+            SELECT contest_id, discord_user_id, SUM(points_delta), SUM(games_delta)
+            FROM game_events
+            WHERE id > {CHECKPOINT}
+            GROUP BY contest_id, discord_user_id
+            HAVING SUM(points_delta) != 0 OR SUM(games_delta) != 0
+            ON CONFLICT(contest_id, discord_id) DO UPDATE SET
+                total_points = contest_scores.total_points + excluded.total_points,
+                total_games = contest_scores.total_games + excluded.total_games
+        ''', ()),
+        # Por día: una fila por usuario y otra con el total del concurso (discord_id = 0)
+        (f'''
+            INSERT INTO daily_stats (contest_id, discord_id, day, games, points, platinums)
+            SELECT contest_id, discord_user_id, day,
+                   SUM(games_delta), SUM(points_delta), SUM(platinums_delta)
+            FROM game_events
+            WHERE id > {CHECKPOINT} AND day IS NOT NULL
+            GROUP BY contest_id, discord_user_id, day
+            HAVING SUM(games_delta) != 0 OR SUM(points_delta) != 0 OR SUM(platinums_delta) != 0
+            UNION ALL
+            SELECT contest_id, 0, day,
+                   SUM(games_delta), SUM(points_delta), SUM(platinums_delta)
+            FROM game_events
+            WHERE id > {CHECKPOINT} AND day IS NOT NULL
+            GROUP BY contest_id, day
+            HAVING SUM(games_delta) != 0 OR SUM(points_delta) != 0 OR SUM(platinums_delta) != 0
+            ON CONFLICT(contest_id, discord_id, day) DO UPDATE SET
+                games = daily_stats.games + excluded.games,
+                points = daily_stats.points + excluded.points,
+                platinums = daily_stats.platinums + excluded.platinums
+        ''', ()),
+        # 'created' deja el juego pendiente: no cambia las estadísticas
+        (USER_STATS_UPSERT.format(touched=f'''
+            SELECT DISTINCT contest_id, discord_user_id
+            FROM game_events
+            WHERE id > {CHECKPOINT} AND event_type != 'created'
+        '''), ()),
+        ('''
+            UPDATE event_checkpoints
+            SET last_event_id = COALESCE((SELECT MAX(id) FROM game_events), last_event_id),
+                updated_at = datetime('now')
+            WHERE name = 'scores'
+        ''', ()),
+    ]
+
+
+def _apply_event(games: dict, game_id: int, event_type: str, payload: str):
+    """Aplica un evento sobre {game_id: fila} (ver GameEvent.replay_games)"""
+    if event_type == 'deleted':
+        games.pop(game_id, None)
+    elif event_type == 'created':
+        games[game_id] = json.loads(payload)
+    elif game_id in games:
+        games[game_id].update(json.loads(payload))
+
+
+async def _legacy_daily_statements(db) -> list:
+    """daily_stats de los eventos anteriores a las columnas day/platinums_delta.
+
+    Esos eventos tienen day NULL y no los pliega fold_statements. Al migrar,
+    la BD armó daily_stats desde games (BOOTSTRAP_STATEMENTS), y ese estado de
+    games es el que deja el log hasta el último evento sin day. Se reconstruye
+    ese estado (no el games actual, que ya incluye los eventos posteriores) y
+    se suman sus juegos aprobados como lo hizo el bootstrap.
+    """
+    cursor = await db.execute('SELECT MAX(id) FROM game_events WHERE day IS NULL')
+    boundary = (await cursor.fetchone())[0]
+    if boundary is None:
+        return []
+
+    games = {}
+    async with db.execute('''
+        SELECT game_id, event_type, payload FROM game_events WHERE id <= ? ORDER BY id
+    ''', (boundary,)) as cursor:
+        async for game_id, event_type, payload in cursor:
+            _apply_event(games, game_id, event_type, payload)
+
+    rows = []
+    for game in games.values():
+        if game.get('status') != 'APPROVED':
+            continue
+        values = (game['submission_date'], game['total_points'] or 0, game['has_platinum'] or 0)
+        # Una fila para el usuario y otra para el total del concurso (discord_id = 0)
+        rows.append((game['contest_id'], game['discord_user_id'], *values))
+        rows.append((game['contest_id'], 0, *values))
+
+    return [('''
+        INSERT INTO daily_stats (contest_id, discord_id, day, games, points, platinums)
+        VALUES (?, ?, date(?), 1, ?, ?)
+        ON CONFLICT(contest_id, discord_id, day) DO UPDATE SET
+            games = daily_stats.games + excluded.games,
+            points = daily_stats.points + excluded.points,
+            platinums = daily_stats.platinums + excluded.platinums
+    ''', rows)] if rows else []
+
+
+class GameEvent:
+    """Log append-only de cambios de juegos (created/approved/rejected/edited/rescored/deleted)"""
+
+    def __init__(self, id, game_id, contest_id, discord_user_id, event_type, day,
+                 points_delta, games_delta, platinums_delta, payload, actor_id, created_at):
+        self.id = id
+        self.game_id = game_id
+        self.contest_id = contest_id
+        self.discord_user_id = discord_user_id
+        self.event_type = event_type
+        self.day = day
+        self.points_delta = points_delta
+        self.games_delta = games_delta
+        self.platinums_delta = platinums_delta
+        self.payload = json.loads(payload) if payload else {}
+        self.actor_id = actor_id
+        self.created_at = created_at
+
+    @staticmethod
+    async def history(game_id: int) -> list:
+        """Todos los eventos de un juego, del más antiguo al más reciente"""
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT id, game_id, contest_id, discord_user_id, event_type, day,
+                       points_delta, games_delta, platinums_delta, payload, actor_id, created_at
+                FROM game_events
+                WHERE game_id = ?
+                ORDER BY id
+            ''', (game_id,))
+            return [GameEvent(*row) for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def replay_games() -> dict:
+        """Reconstruye las filas de games aplicando los eventos en orden.
+
+        Retorna {game_id: fila} con los juegos que siguen existiendo.
+        """
+        db = await get_read_db()
+        games = {}
+        try:
+            async with db.execute('''
+                SELECT game_id, event_type, payload FROM game_events ORDER BY id
+            ''') as cursor:
+                async for game_id, event_type, payload in cursor:
+                    _apply_event(games, game_id, event_type, payload)
+            return games
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def verify() -> list:
+        """IDs de juegos cuyo estado en games no coincide con el del log"""
+        replayed = await GameEvent.replay_games()
+
+        db = await get_read_db()
+        try:
+            cursor = await db.execute(f'SELECT id, {ROW_JSON} FROM games')
+            current = {game_id: json.loads(row) for game_id, row in await cursor.fetchall()}
+        finally:
+            await db.close()
+
+        mismatched = set(current) ^ set(replayed)
+        for game_id in set(current) & set(replayed):
+            if any(replayed[game_id].get(key) != value for key, value in current[game_id].items()):
+                mismatched.add(game_id)
+        return sorted(mismatched)
+
+    @staticmethod
+    async def replay_scores() -> int:
+        """Recalcula users, contest_scores, daily_stats y user_stats desde cero plegando todo el log.
+
+        Los eventos anteriores a la columna day (BDs migradas) no se pliegan
+        por día: su parte de daily_stats sale del estado de los juegos al migrar.
+        Retorna cuántos eventos se plegaron.
+        """
+        async def replay(db):
+            await db.execute('UPDATE users SET total_points = 0, total_games = 0')
+            await db.execute('DELETE FROM contest_scores')
+            await db.execute('DELETE FROM daily_stats')
+            await db.execute('DELETE FROM user_stats')
+            for sql, rows in await _legacy_daily_statements(db):
+                await db.executemany(sql, rows)
+            await db.execute("UPDATE event_checkpoints SET last_event_id = 0 WHERE name = 'scores'")
+            for sql, params in fold_statements():
+                await db.execute(sql, params)
+            cursor = await db.execute('SELECT COUNT(*) FROM game_events')
+            return (await cursor.fetchone())[0]
+
+        return await db_writer.run(replay)
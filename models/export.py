@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zipfile
+
+import config
+from models.database import DATABASE_PATH
+
+# Consultas de cada tabla exportable, filtradas por concurso
+EXPORT_QUERIES = {
+    'juegos': '''
+        SELECT id, discord_user_id, username, game_name, category, platform,
+               has_platinum, is_recompleted, total_points, status, evidence_url,
+               submission_date, reviewed_by, review_date, rejection_reason
+        FROM games
+        WHERE contest_id = ?
+        ORDER BY id
+    ''',
+    'usuarios': '''
+        SELECT u.discord_id, u.username,
+               s.discord_id IS (SELECT elkie_id FROM contests WHERE id = s.contest_id) AS is_elkie,
+               u.role, u.join_date,
+               s.total_points, s.total_games
+        FROM contest_scores s
+        JOIN users u ON u.discord_id = s.discord_id
+        WHERE s.contest_id = ?
+        ORDER BY s.total_points DESC, s.total_games DESC, u.discord_id
+    ''',
+    'eventos': '''
+        SELECT id, game_id, discord_user_id, event_type, day, points_delta,
+               games_delta, platinums_delta, payload, actor_id, created_at
+        FROM game_events
+        WHERE contest_id = ?
+        ORDER BY id
+    ''',
+}
+
+FORMATS = ('csv', 'ndjson')
+
+
+def _write_csv(out, cursor, chunk_rows: int) -> int:
+    writer = csv.writer(out)
+    writer.writerow([col[0] for col in cursor.description])
+    count = 0
+    while rows := cursor.fetchmany(chunk_rows):
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def _write_ndjson(out, cursor, chunk_rows: int) -> int:
+    columns = [col[0] for col in cursor.description]
+    count = 0
+    while rows := cursor.fetchmany(chunk_rows):
+        out.writelines(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
+            for row in rows
+        )
+        count += len(rows)
+    return count
+
+
+def export_contest(contest_id: int, tables: list, fmt: str = 'csv',
+                   chunk_rows: int = None, database_path: str = None) -> dict:
+    """Escribe las tablas del concurso a un .zip comprimido (un archivo por tabla).
+
+    Es bloqueante: pensado para correr en un hilo (asyncio.to_thread). Lee por
+    lotes de `chunk_rows` filas y escribe directo al zip, así que la memoria
+    no depende del tamaño del concurso. Todas las tablas salen de la misma
+    foto de la BD. Retorna {path, rows: {tabla: n}, bytes, seconds}; quien
+    llama borra el archivo.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'Formato no soportado: {fmt}')
+    chunk_rows = chunk_rows or config.EXPORT_CHUNK_ROWS
+    write = _write_csv if fmt == 'csv' else _write_ndjson
+
+    start = time.perf_counter()
+    fd, path = tempfile.mkstemp(prefix=f'concurso{contest_id}-', suffix='.zip')
+    os.close(fd)
+
+    conn = sqlite3.connect(f'file:{database_path or DATABASE_PATH}?mode=ro', uri=True)
+    rows = {}
+    try:
+        # Una sola transacción de lectura: juegos, usuarios y eventos consistentes
+        conn.execute('BEGIN')
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+            for table in tables:
+                cursor = conn.execute(EXPORT_QUERIES[table], (contest_id,))
+                with zf.open(f'{table}.{fmt}', 'w', force_zip64=True) as member:
+                    out = io.TextIOWrapper(member, encoding='utf-8', newline='')
+                    rows[table] = write(out, cursor, chunk_rows)
+                    out.flush()
+                    out.detach()
+        conn.rollback()
+    except Exception:
+        os.remove(path)
+        raise
+    finally:
+        conn.close()
+
+    return {
+        'path': path,
+        'rows': rows,
+        'bytes': os.path.getsize(path),
+        'seconds': time.perf_counter() - start,
+    }
@@ -1,7 +1,22 @@
 from datetime import datetime
-from models.database import get_db
+from models.database import get_read_db
+from models.batcher import db_writer
+from models.contest import DEFAULT_CONTEST_ID
+from models.user_stats import user_stats_cache
+from models.events import (
+    created_statements, reviewed_statements, edited_statements,
+    deleted_statements, fold_statements
+)
+from utils.validators import title_key
+from utils.calculators import scoring
 import config
 
+# Columnas que Game.edit puede modificar
+EDITABLE_FIELDS = {
+    'game_name', 'category', 'platform', 'has_platinum',
+    'is_recompleted', 'total_points', 'evidence_url'
+}
+
 class Game:
     """Modelo para manejar juegos registrados"""
     
@@ -32,52 +47,48 @@ class Game:
     @staticmethod
     async def create(discord_user_id: int, username: str, game_name: str, 
                     category: str, platform: str, has_platinum: bool, 
-                    is_recompleted: bool, image_url: str = '') -> bool:
+                    is_recompleted: bool, image_url: str = '',
+                    contest_id: int = DEFAULT_CONTEST_ID) -> bool:
         """Crea un nuevo juego"""
         try:
-            from models.database import get_db
-            
-            # Calcular puntos
-            points = config.PUNTOS_CATEGORIA[category.lower()]
-            if has_platinum:
-                points += config.PUNTOS_CATEGORIA['platino']
-            
-            db = await get_db()
+            points = scoring.score(category, has_platinum, is_recompleted)
             
-            # Usar evidence_url y asegurar submission_date
-            await db.execute('''
+            # Usar evidence_url y asegurar submission_date.
+            # El INSERT (y su evento) se agrupa con otros registros concurrentes
+            # en un solo commit
+            return await db_writer.submit([('''
                 INSERT INTO games (
                     discord_user_id, username, game_name, category, 
                     platform, has_platinum, is_recompleted, total_points,
-                    status, evidence_url, submission_date
+                    status, evidence_url, submission_date, contest_id, title_key
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'PENDING', ?, datetime('now'))
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'PENDING', ?, datetime('now'), ?, ?)
             ''', (discord_user_id, username, game_name, category, 
                   platform, int(has_platinum), int(is_recompleted), 
-                  points, image_url))
-            
-            await db.commit()
-            await db.close()
-            return True
+                  points, image_url, contest_id, title_key(game_name))),
+                *created_statements(discord_user_id)])
             
         except Exception as e:
             print(f'Error creando juego: {e}')
             return False
     
     @staticmethod
-    async def get_pending() -> list:
-        """Obtiene todos los juegos pendientes"""
+    async def get_pending(contest_id: int = None) -> list:
+        """Obtiene todos los juegos pendientes (de un concurso, si se indica)"""
         try:
-            db = await get_db()
-            cursor = await db.execute('''
+            db = await get_read_db()
+            
+            contest_filter = 'AND contest_id = ?' if contest_id is not None else ''
+            params = (contest_id,) if contest_id is not None else ()
+            cursor = await db.execute(f'''
                 SELECT id, discord_user_id, username, game_name, category,
                        platform, has_platinum, is_recompleted, total_points,
                        status, evidence_url, submission_date, reviewed_by, 
                        review_date, rejection_reason
                 FROM games
-                WHERE status = 'PENDING'
+                WHERE status = 'PENDING' {contest_filter}
                 ORDER BY submission_date ASC
-            ''')
+            ''', params)
             
             rows = await cursor.fetchall()
             await db.close()
@@ -92,31 +103,29 @@ class Game:
             return []
     
     @staticmethod
-    async def get_by_user(discord_user_id: int, status: str = None) -> list:
-        """Obtiene todos los juegos de un usuario"""
+    async def get_by_user(discord_user_id: int, status: str = None, contest_id: int = None) -> list:
+        """Obtiene todos los juegos de un usuario (de un concurso, si se indica)"""
         try:
-            db = await get_db()
+            db = await get_read_db()
             
+            conditions = ['discord_user_id = ?']
+            params = [discord_user_id]
             if status:
-                cursor = await db.execute('''
-                    SELECT id, discord_user_id, username, game_name, category,
-                           platform, has_platinum, is_recompleted, total_points,
-                           status, evidence_url, submission_date, reviewed_by, 
-                           review_date, rejection_reason
-                    FROM games
-                    WHERE discord_user_id = ? AND status = ?
-                    ORDER BY submission_date DESC
-                ''', (discord_user_id, status))
-            else:
-                cursor = await db.execute('''
-                    SELECT id, discord_user_id, username, game_name, category,
-                           platform, has_platinum, is_recompleted, total_points,
-                           status, evidence_url, submission_date, reviewed_by, 
-                           review_date, rejection_reason
-                    FROM games
-                    WHERE discord_user_id = ?
-                    ORDER BY submission_date DESC
-                ''', (discord_user_id,))
+                conditions.append('status = ?')
+                params.append(status)
+            if contest_id is not None:
+                conditions.append('contest_id = ?')
+                params.append(contest_id)
+            
+            cursor = await db.execute(f'''
+                SELECT id, discord_user_id, username, game_name, category,
+                       platform, has_platinum, is_recompleted, total_points,
+                       status, evidence_url, submission_date, reviewed_by, 
+                       review_date, rejection_reason
+                FROM games
+                WHERE {' AND '.join(conditions)}
+                ORDER BY submission_date DESC
+            ''', params)
             
             rows = await cursor.fetchall()
             await db.close()
@@ -131,18 +140,77 @@ class Game:
             return []
     
     @staticmethod
-    async def get_by_id(game_id: int):
-        """Obtiene un juego por ID"""
+    async def find_duplicates(discord_user_id: int, game_name: str, contest_id: int) -> tuple:
+        """Juegos del usuario con el mismo título normalizado (índice user + title_key).
+        
+        Retorna (registrados en este concurso y no rechazados,
+                 aprobados en otros concursos = re-completado).
+        """
+        key = title_key(game_name)
+        if not key:
+            return [], []
+        
         try:
-            db = await get_db()
+            db = await get_read_db()
+            cursor = await db.execute('''
+                SELECT id, discord_user_id, username, game_name, category,
+                       platform, has_platinum, is_recompleted, total_points,
+                       status, evidence_url, submission_date, reviewed_by, 
+                       review_date, rejection_reason, contest_id
+                FROM games
+                WHERE discord_user_id = ? AND title_key = ? AND status != 'REJECTED'
+                ORDER BY submission_date DESC
+            ''', (discord_user_id, key))
+            
+            rows = await cursor.fetchall()
+            await db.close()
+            
+            duplicates = [Game(*row[:-1]) for row in rows if row[-1] == contest_id]
+            previous = [Game(*row[:-1]) for row in rows
+                        if row[-1] != contest_id and row[9] == 'APPROVED']
+            return duplicates, previous
+        except Exception as e:
+            print(f'Error buscando duplicados: {e}')
+            return [], []
+    
+    @staticmethod
+    async def get_approved_by_contest(contest_id: int) -> list:
+        """Todos los juegos aprobados de un concurso en una sola consulta"""
+        try:
+            db = await get_read_db()
             cursor = await db.execute('''
                 SELECT id, discord_user_id, username, game_name, category,
                        platform, has_platinum, is_recompleted, total_points,
                        status, evidence_url, submission_date, reviewed_by, 
                        review_date, rejection_reason
                 FROM games
-                WHERE id = ?
-            ''', (game_id,))
+                WHERE contest_id = ? AND status = 'APPROVED'
+                ORDER BY submission_date DESC
+            ''', (contest_id,))
+            
+            rows = await cursor.fetchall()
+            await db.close()
+            
+            return [Game(*row) for row in rows]
+        except Exception as e:
+            print(f'Error obteniendo juegos del concurso: {e}')
+            return []
+    
+    @staticmethod
+    async def get_by_id(game_id: int, contest_id: int = None):
+        """Obtiene un juego por ID (None si no existe o es de otro concurso)"""
+        try:
+            db = await get_read_db()
+            contest_filter = 'AND contest_id = ?' if contest_id is not None else ''
+            params = (game_id, contest_id) if contest_id is not None else (game_id,)
+            cursor = await db.execute(f'''
+                SELECT id, discord_user_id, username, game_name, category,
+                       platform, has_platinum, is_recompleted, total_points,
+                       status, evidence_url, submission_date, reviewed_by, 
+                       review_date, rejection_reason
+                FROM games
+                WHERE id = ? {contest_filter}
+            ''', params)
             
             row = await cursor.fetchone()
             await db.close()
@@ -154,21 +222,34 @@ class Game:
             print(f'Error obteniendo juego: {e}')
             return None
     
+    @staticmethod
+    async def _write_and_invalidate(game_id: int, statements: list):
+        """Ejecuta las sentencias de un juego en la transacción del escritor y
+        olvida las estadísticas cacheadas de su dueño (leído en esa misma transacción)"""
+        async def write(db):
+            cursor = await db.execute('SELECT discord_user_id FROM games WHERE id = ?', (game_id,))
+            row = await cursor.fetchone()
+            for sql, params in statements:
+                await db.execute(sql, params)
+            return row[0] if row else None
+        
+        discord_user_id = await db_writer.run(write)
+        if discord_user_id is not None:
+            user_stats_cache.invalidate(discord_user_id)
+    
     @staticmethod
     async def approve(game_id: int, admin_id: int) -> bool:
-        """Aprueba un juego"""
+        """Aprueba un juego y suma sus puntos (evento + pliegue)"""
         try:
-            db = await get_db()
-            await db.execute('''
+            await Game._write_and_invalidate(game_id, [('''
                 UPDATE games
                 SET status = 'APPROVED',
                     reviewed_by = ?,
                     review_date = datetime('now')
                 WHERE id = ? AND status = 'PENDING'
-            ''', (admin_id, game_id))
-            
-            await db.commit()
-            await db.close()
+            ''', (admin_id, game_id)),
+                *reviewed_statements([game_id], admin_id, approve=True, only_if_changed=True),
+                *fold_statements()])
             return True
         except Exception as e:
             print(f'Error aprobando juego: {e}')
@@ -178,19 +259,115 @@ class Game:
     async def reject(game_id: int, admin_id: int, reason: str) -> bool:
         """Rechaza un juego"""
         try:
-            db = await get_db()
-            await db.execute('''
+            await Game._write_and_invalidate(game_id, [('''
                 UPDATE games
                 SET status = 'REJECTED',
                     reviewed_by = ?,
                     review_date = datetime('now'),
                     rejection_reason = ?
                 WHERE id = ? AND status = 'PENDING'
-            ''', (admin_id, reason, game_id))
-            
-            await db.commit()
-            await db.close()
+            ''', (admin_id, reason, game_id)),
+                *reviewed_statements([game_id], admin_id, approve=False, only_if_changed=True)])
             return True
         except Exception as e:
             print(f'Error rechazando juego: {e}')
-            return False
\ No newline at end of file
+            return False
+    
+    @staticmethod
+    async def review_many(game_ids: list, admin_id: int, approve: bool, reason: str = None) -> list:
+        """Aprueba o rechaza varios juegos pendientes en una sola transacción.
+        
+        Registra un evento por juego, pliega los eventos sobre los puntos de
+        cada usuario y retorna los juegos que realmente fueron revisados.
+        """
+        if not game_ids:
+            return []
+        
+        async def review(db):
+            placeholders = ', '.join('?' for _ in game_ids)
+            cursor = await db.execute(f'''
+                SELECT id, discord_user_id, username, game_name, category,
+                       platform, has_platinum, is_recompleted, total_points,
+                       status, evidence_url, submission_date, reviewed_by, 
+                       review_date, rejection_reason
+                FROM games
+                WHERE id IN ({placeholders}) AND status = 'PENDING'
+                ORDER BY submission_date ASC
+            ''', list(game_ids))
+            
+            games = [Game(*row) for row in await cursor.fetchall()]
+            
+            if not games:
+                return []
+            
+            ids = [game.id for game in games]
+            placeholders = ', '.join('?' for _ in ids)
+            
+            if approve:
+                await db.execute(f'''
+                    UPDATE games
+                    SET status = 'APPROVED',
+                        reviewed_by = ?,
+                        review_date = datetime('now')
+                    WHERE id IN ({placeholders}) AND status = 'PENDING'
+                ''', [admin_id, *ids])
+            else:
+                await db.execute(f'''
+                    UPDATE games
+                    SET status = 'REJECTED',
+                        reviewed_by = ?,
+                        review_date = datetime('now'),
+                        rejection_reason = ?
+                    WHERE id IN ({placeholders}) AND status = 'PENDING'
+                ''', [admin_id, reason, *ids])
+            
+            # Eventos de cada juego revisado y pliegue sobre users/contest_scores
+            for sql, params in [*reviewed_statements(ids, admin_id, approve), *fold_statements()]:
+                await db.execute(sql, params)
+            
+            return games
+        
+        try:
+            games = await db_writer.run(review)
+            for discord_user_id in {game.discord_user_id for game in games}:
+                user_stats_cache.invalidate(discord_user_id)
+            return games
+        except Exception as e:
+            print(f'Error en revisión masiva: {e}')
+            return []
+    
+    @staticmethod
+    async def edit(game_id: int, admin_id: int, changes: dict) -> bool:
+        """Edita columnas de un juego registrando el evento (y la diferencia de puntos).
+        
+        Si la escritura falla, la excepción se propaga al llamador.
+        """
+        invalid = set(changes) - EDITABLE_FIELDS
+        if invalid:
+            raise ValueError(f'Campos no editables: {sorted(invalid)}')
+        
+        # La clave de duplicados sigue al nombre (sin entrar en el evento)
+        columns = dict(changes)
+        if 'game_name' in changes:
+            columns['title_key'] = title_key(changes['game_name'])
+        
+        assignments = ', '.join(f'{field} = ?' for field in columns)
+        await Game._write_and_invalidate(game_id, [
+            *edited_statements(game_id, admin_id, changes),
+            (f'UPDATE games SET {assignments} WHERE id = ?', [*columns.values(), game_id]),
+            *fold_statements(),
+        ])
+        return True
+    
+    @staticmethod
+    async def delete(game_id: int, admin_id: int) -> bool:
+        """Elimina un juego; el evento descuenta sus puntos si estaba aprobado.
+        
+        Si la escritura falla, la excepción se propaga al llamador.
+        """
+        await Game._write_and_invalidate(game_id, [
+            *deleted_statements(game_id, admin_id),
+            ('DELETE FROM games WHERE id = ?', (game_id,)),
+            *fold_statements(),
+        ])
+        return True
@@ -0,0 +1,157 @@
+import re
+import time
+from collections import deque
+from datetime import datetime
+import config
+
+
+class QueryStats:
+    """Acumulado de una sentencia normalizada"""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows = 0
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+class QueryProfiler:
+    """Profiler opcional de SQL (SQL_PROFILE=1)
+
+    Agrupa por SQL normalizado (literales y listas IN colapsados) y guarda
+    llamadas, tiempo total y máximo, y filas devueltas o afectadas. Las
+    sentencias que superan SLOW_QUERY_MS van al log de consultas lentas con
+    su EXPLAIN QUERY PLAN, capturado una vez por sentencia.
+    """
+
+    def __init__(self, enabled: bool = False, slow_ms: float = 100):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.stats = {}
+        self.plans = {}
+        self.slow_log = deque(maxlen=50)
+
+    @staticmethod
+    def normalize(sql: str) -> str:
+        """Quita literales para agrupar variantes de la misma consulta"""
+        sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+        sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+        sql = re.sub(r'\s+', ' ', sql).strip()
+        return re.sub(r'IN \((?:\?\s*,\s*)*\?\)', 'IN (...)', sql, flags=re.IGNORECASE)
+
+    async def record(self, explain, sql: str, params, result, elapsed: float):
+        """Registra una ejecución; si retorna un cursor, sus fetch también cuentan"""
+        key = self.normalize(sql)
+        if key not in self.stats:
+            self.stats[key] = QueryStats(key)
+        stats = self.stats[key]
+
+        stats.calls += 1
+        stats.total_time += elapsed
+        stats.max_time = max(stats.max_time, elapsed)
+
+        if isinstance(result, list):
+            stats.rows += len(result)
+        elif hasattr(result, 'fetchall'):
+            if result._cursor.description is None:
+                # Escritura: filas afectadas
+                stats.rows += max(result._cursor.rowcount, 0)
+            else:
+                self._wrap_cursor(result, explain, sql, params, stats, elapsed)
+                return
+
+        await self._check_slow(explain, sql, params, key, elapsed)
+
+    def _wrap_cursor(self, cursor, explain, sql, params, stats, elapsed):
+        """Suma al total las filas y el tiempo de fetchone/fetchmany/fetchall"""
+        profiler = self
+        call = {'time': elapsed, 'checked': False}
+
+        def timed(fetch):
+            async def wrapper(*args):
+                start = time.perf_counter()
+                rows = await fetch(*args)
+                fetch_time = time.perf_counter() - start
+
+                stats.total_time += fetch_time
+                call['time'] += fetch_time
+                stats.max_time = max(stats.max_time, call['time'])
+                if isinstance(rows, list):
+                    stats.rows += len(rows)
+                elif rows is not None:
+                    stats.rows += 1
+
+                if not call['checked'] and call['time'] * 1000 >= profiler.slow_ms:
+                    call['checked'] = True
+                    await profiler._check_slow(explain, sql, params, stats.sql, call['time'])
+                return rows
+            return wrapper
+
+        cursor.fetchone = timed(cursor.fetchone)
+        cursor.fetchmany = timed(cursor.fetchmany)
+        cursor.fetchall = timed(cursor.fetchall)
+
+    async def _check_slow(self, explain, sql: str, params, key: str, elapsed: float):
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms < self.slow_ms:
+            return
+
+        if key not in self.plans:
+            self.plans[key] = await self._explain(explain, sql, params)
+        plan = self.plans[key]
+
+        self.slow_log.append({
+            'when': datetime.now(),
+            'ms': elapsed_ms,
+            'sql': key,
+            'plan': plan,
+        })
+
+        print(f'🐢 [SQL LENTA] {elapsed_ms:.0f}ms: {key[:200]}')
+        for line in plan:
+            print(f'   {line}')
+
+    @staticmethod
+    async def _explain(explain, sql: str, params) -> list:
+        """EXPLAIN QUERY PLAN con los mismos parámetros, en la misma conexión"""
+        if explain is None or not sql.lstrip().upper().startswith(('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')):
+            return []
+        try:
+            async with explain(f'EXPLAIN QUERY PLAN {sql}', params or []) as cursor:
+                rows = await cursor.fetchall()
+            # (id, parent, notused, detail): indentar según la profundidad
+            depth = {0: 0}
+            lines = []
+            for row_id, parent, _, detail in rows:
+                depth[row_id] = depth.get(parent, 0) + 1
+                lines.append('  ' * (depth[row_id] - 1) + detail)
+            return lines
+        except Exception as e:
+            return [f'(sin plan: {e})']
+
+    def top(self, order_by: str = 'total_time', limit: int = 15) -> list:
+        return sorted(self.stats.values(), key=lambda s: getattr(s, order_by), reverse=True)[:limit]
+
+    def report(self, limit: int = 15) -> str:
+        """Tabla de texto con las sentencias que más tiempo acumulan"""
+        lines = [f"{'llamadas':>8} {'total ms':>10} {'media ms':>9} {'máx ms':>8} {'filas':>8}  sql"]
+        for stats in self.top(limit=limit):
+            lines.append(
+                f'{stats.calls:>8} {stats.total_time * 1000:>10.1f} {stats.avg_time * 1000:>9.2f} '
+                f'{stats.max_time * 1000:>8.1f} {stats.rows:>8}  {stats.sql[:120]}'
+            )
+        return '\n'.join(lines)
+
+    def reset(self):
+        self.stats.clear()
+        self.plans.clear()
+        self.slow_log.clear()
+
+
+# Instancia global
+profiler = QueryProfiler(config.SQL_PROFILE, config.SLOW_QUERY_MS)
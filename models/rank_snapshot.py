@@ -0,0 +1,137 @@
+from datetime import datetime
+from models.database import get_read_db
+from models.batcher import db_writer
+
+
+def _timestamp(when: datetime) -> str:
+    return when.isoformat(sep=' ', timespec='seconds')
+
+
+class RankSnapshot:
+    """Foto compacta del ranking de un concurso (usuario → puesto, puntos)"""
+
+    def __init__(self, discord_id, rank, points, games, taken_at):
+        self.discord_id = discord_id
+        self.rank = rank
+        self.points = points
+        self.games = games
+        self.taken_at = taken_at
+
+    @staticmethod
+    async def take(contest_id: int, when: datetime = None) -> int:
+        """Guarda el ranking actual del concurso; retorna cuántos usuarios entraron"""
+        taken_at = _timestamp(when or datetime.now())
+
+        async def insert(db):
+            # Mismo orden y mismo filtro (al menos un juego) que /ranking
+            cursor = await db.execute('''
+                INSERT OR IGNORE INTO rank_snapshots (contest_id, taken_at, discord_id, rank, points, games)
+                SELECT contest_id, ?, discord_id,
+                       ROW_NUMBER() OVER (ORDER BY total_points DESC, total_games DESC, discord_id),
+                       total_points, total_games
+                FROM contest_scores
+                WHERE contest_id = ? AND total_games > 0
+            ''', (taken_at, contest_id))
+            return cursor.rowcount
+
+        return await db_writer.run(insert)
+
+    @staticmethod
+    async def latest_time(contest_id: int):
+        """Momento de la última foto del concurso (None si no hay)"""
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT MAX(taken_at) FROM rank_snapshots WHERE contest_id = ?
+            ''', (contest_id,))
+            row = await cursor.fetchone()
+            return datetime.fromisoformat(row[0]) if row and row[0] else None
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def rank_at(discord_id: int, contest_id: int, when: datetime):
+        """Puesto del usuario en la última foto tomada hasta `when` (o None)"""
+        db = await get_read_db()
+        try:
+            # Sin ANALYZE el planner prefiere el rango de la PK (todas las fotos
+            # ≤ when); el índice por usuario salta directo a la más reciente
+            cursor = await db.execute('''
+                SELECT discord_id, rank, points, games, taken_at
+                FROM rank_snapshots INDEXED BY idx_rank_snapshots_user
+                WHERE contest_id = ? AND discord_id = ? AND taken_at <= ?
+                ORDER BY taken_at DESC
+                LIMIT 1
+            ''', (contest_id, discord_id, _timestamp(when)))
+            row = await cursor.fetchone()
+            return RankSnapshot(*row) if row else None
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def ranks_at(contest_id: int, when: datetime, discord_ids: list = None):
+        """{discord_id: puesto} de la última foto tomada hasta `when`.
+
+        Con discord_ids solo se leen esos usuarios (la página visible).
+        Retorna None si no hay ninguna foto hasta `when`.
+        """
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT MAX(taken_at) FROM rank_snapshots
+                WHERE contest_id = ? AND taken_at <= ?
+            ''', (contest_id, _timestamp(when)))
+            taken_at = (await cursor.fetchone())[0]
+            if taken_at is None:
+                return None
+
+            user_filter = ''
+            params = [contest_id, taken_at]
+            if discord_ids is not None:
+                user_filter = f"AND discord_id IN ({', '.join('?' for _ in discord_ids)})"
+                params += list(discord_ids)
+            cursor = await db.execute(f'''
+                SELECT discord_id, rank
+                FROM rank_snapshots
+                WHERE contest_id = ? AND taken_at = ? {user_filter}
+            ''', params)
+            return dict(await cursor.fetchall())
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def movers(contest_id: int, since: datetime, limit: int = 5) -> list:
+        """Quienes más puestos subieron entre la foto de `since` y la última.
+
+        Retorna [{discord_id, username, old_rank, new_rank, moved, points_gained}];
+        quienes no estaban en la foto vieja no cuentan como movimiento.
+        """
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                WITH bounds AS (
+                    SELECT (SELECT MAX(taken_at) FROM rank_snapshots
+                            WHERE contest_id = ? AND taken_at <= ?) AS since_at,
+                           (SELECT MAX(taken_at) FROM rank_snapshots
+                            WHERE contest_id = ?) AS latest_at
+                )
+                SELECT cur.discord_id, u.username, prev.rank, cur.rank,
+                       prev.rank - cur.rank AS moved, cur.points - prev.points
+                FROM bounds
+                JOIN rank_snapshots cur
+                    ON cur.contest_id = ? AND cur.taken_at = bounds.latest_at
+                JOIN rank_snapshots prev
+                    ON prev.contest_id = ? AND prev.taken_at = bounds.since_at
+                   AND prev.discord_id = cur.discord_id
+                JOIN users u ON u.discord_id = cur.discord_id
+                WHERE bounds.since_at < bounds.latest_at AND prev.rank > cur.rank
+                ORDER BY moved DESC, cur.rank
+                LIMIT ?
+            ''', (contest_id, _timestamp(since), contest_id, contest_id, contest_id, limit))
+            return [
+                {'discord_id': row[0], 'username': row[1], 'old_rank': row[2],
+                 'new_rank': row[3], 'moved': row[4], 'points_gained': row[5]}
+                for row in await cursor.fetchall()
+            ]
+        finally:
+            await db.close()
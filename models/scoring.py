@@ -0,0 +1,100 @@
+import json
+import time
+from models.database import get_read_db
+from models.batcher import db_writer
+from models.events import rescored_statements, fold_statements
+from models.user_stats import user_stats_cache
+from utils.calculators import ScoringEngine, scoring
+
+
+class ScoringRules:
+    """Versiones de la tabla de puntos (config.PUNTOS_CATEGORIA en cada momento)"""
+
+    def __init__(self, version, rules, created_by, created_at, applied_at,
+                 games_updated, elapsed_ms):
+        self.version = version
+        self.rules = json.loads(rules)
+        self.created_by = created_by
+        self.created_at = created_at
+        self.applied_at = applied_at
+        self.games_updated = games_updated
+        self.elapsed_ms = elapsed_ms
+
+    @staticmethod
+    async def latest():
+        """Última versión registrada (None si la tabla está vacía)"""
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT version, rules, created_by, created_at, applied_at,
+                       games_updated, elapsed_ms
+                FROM scoring_rules
+                ORDER BY version DESC
+                LIMIT 1
+            ''')
+            row = await cursor.fetchone()
+            return ScoringRules(*row) if row else None
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def recompute(admin_id: int, contest_id: int, rules: dict = None) -> dict:
+        """Aplica `rules` (por defecto, las del motor de puntos) a los juegos de un concurso.
+
+        Los demás concursos (de este u otros servidores) no se tocan. En una
+        sola transacción: registra una versión nueva si las reglas
+        cambiaron, un evento 'rescored' por juego afectado, un UPDATE de games
+        con CASE sobre categoría y platino, y el pliegue agrupado sobre users,
+        contest_scores, daily_stats y user_stats. Retorna {version, new_version,
+        games_updated, games_ms, totals_ms, elapsed_ms}.
+        """
+        rules = dict(rules or scoring.rules)
+        rules_json = json.dumps(rules, sort_keys=True)
+        points_sql, params = ScoringEngine(rules).sql_expression()
+
+        async def apply(db):
+            start = time.perf_counter()
+
+            cursor = await db.execute('SELECT version, rules FROM scoring_rules ORDER BY version DESC LIMIT 1')
+            row = await cursor.fetchone()
+            new_version = row is None or json.loads(row[1]) != rules
+            if new_version:
+                cursor = await db.execute('''
+                    INSERT INTO scoring_rules (rules, created_by) VALUES (?, ?)
+                ''', (rules_json, admin_id))
+                version = cursor.lastrowid
+            else:
+                version = row[0]
+
+            for sql, event_params in rescored_statements(points_sql, params, admin_id, contest_id):
+                await db.execute(sql, event_params)
+            cursor = await db.execute(f'''
+                UPDATE games SET total_points = {points_sql}
+                WHERE contest_id = ? AND total_points != ({points_sql})
+            ''', [*params, contest_id, *params])
+            games_updated = cursor.rowcount
+            games_done = time.perf_counter()
+
+            for sql, fold_params in fold_statements():
+                await db.execute(sql, fold_params)
+            totals_done = time.perf_counter()
+
+            elapsed_ms = (totals_done - start) * 1000
+            await db.execute('''
+                UPDATE scoring_rules
+                SET applied_at = datetime('now'), games_updated = ?, elapsed_ms = ?
+                WHERE version = ?
+            ''', (games_updated, elapsed_ms, version))
+
+            return {
+                'version': version,
+                'new_version': new_version,
+                'games_updated': games_updated,
+                'games_ms': (games_done - start) * 1000,
+                'totals_ms': (totals_done - games_done) * 1000,
+                'elapsed_ms': elapsed_ms,
+            }
+
+        result = await db_writer.run(apply)
+        user_stats_cache.invalidate()
+        return result
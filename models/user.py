@@ -1,5 +1,60 @@
 from datetime import datetime
-from models.database import get_db
+from models.database import get_read_db
+from models.batcher import db_writer
+
+# IDs que ya sabemos que existen en la BD: /registrar no vuelve a consultarlos
+_known_users = set()
+
+# Si el usuario de la fila `s` es el Elkie de su concurso (contests.elkie_id)
+ELKIE_SQL = 's.discord_id IS (SELECT elkie_id FROM contests WHERE id = s.contest_id)'
+
+# Ranking de un concurso en una pasada: puesto con empates (RANK/DENSE_RANK),
+# posición única para paginar y distancias al puesto de arriba, al de abajo y
+# al líder. Las distancias van contra el grupo de empatados vecino (GROUPS),
+# no contra la fila vecina, para que coincidan con rank
+RANKING_CTE = f'''
+    WITH ranked AS (
+        SELECT discord_id, total_points, total_games,
+               {ELKIE_SQL} AS is_elkie,
+               RANK() OVER podium AS rank,
+               DENSE_RANK() OVER podium AS dense_rank,
+               ROW_NUMBER() OVER ordered AS position,
+               COUNT(*) OVER (podium GROUPS CURRENT ROW) AS tied_count,
+               FIRST_VALUE(total_points) OVER (podium GROUPS BETWEEN 1 PRECEDING AND 1 PRECEDING)
+                   - total_points AS gap_ahead,
+               total_points
+                   - FIRST_VALUE(total_points) OVER (podium GROUPS BETWEEN 1 FOLLOWING AND 1 FOLLOWING) AS gap_next,
+               FIRST_VALUE(total_points) OVER ordered - total_points AS gap_leader,
+               FIRST_VALUE(total_games) OVER ordered - total_games AS games_behind_leader,
+               COUNT(*) OVER () AS ranked_count
+        FROM contest_scores s
+        WHERE contest_id = ? AND total_games > 0
+        WINDOW podium AS (ORDER BY total_points DESC, total_games DESC),
+               ordered AS (ORDER BY total_points DESC, total_games DESC, discord_id)
+    )
+'''
+
+RANKED_COLUMNS = '''
+    u.discord_id, u.username, r.total_points, r.total_games, r.is_elkie, u.join_date, u.role,
+    r.rank, r.dense_rank, r.position, r.tied_count, r.gap_ahead, r.gap_next, r.gap_leader,
+    r.games_behind_leader, r.ranked_count
+'''
+
+
+def _ranked_user(row) -> 'User':
+    """User con los campos de RANKED_COLUMNS (puesto y distancias)"""
+    user = User(
+        discord_id=row[0],
+        username=row[1],
+        total_points=row[2],
+        total_games=row[3],
+        is_elkie=bool(row[4]),
+        join_date=row[5],
+        role=row[6]
+    )
+    (user.rank, user.dense_rank, user.position, user.tied_count, user.gap_ahead,
+     user.gap_next, user.gap_leader, user.games_behind_leader, user.ranked_count) = row[7:]
+    return user
 
 class User:
     """Modelo para manejar usuarios del concurso"""
@@ -17,30 +72,29 @@ class User:
     @staticmethod
     async def create(discord_id, username):
         """Crea un nuevo usuario en la base de datos"""
-        db = await get_db()
         try:
-            await db.execute('''
+            # Se agrupa con otros registros concurrentes en un solo commit
+            await db_writer.submit([('''
                 INSERT INTO users (discord_id, username, join_date)
                 VALUES (?, ?, ?)
-            ''', (discord_id, username, datetime.now().isoformat()))
-            await db.commit()
+            ''', (discord_id, username, datetime.now().isoformat()))])
+            _known_users.add(discord_id)
             return True
         except Exception as e:
             print(f'Error al crear usuario: {e}')
             return False
-        finally:
-            await db.close()
     
     @staticmethod
     async def get(discord_id):
         """Obtiene un usuario por su Discord ID"""
-        db = await get_db()
+        db = await get_read_db()
         try:
             async with db.execute('''
                 SELECT * FROM users WHERE discord_id = ?
             ''', (discord_id,)) as cursor:
                 row = await cursor.fetchone()
                 if row:
+                    _known_users.add(discord_id)
                     return User(
                         discord_id=row[0],
                         username=row[1],
@@ -56,47 +110,49 @@ class User:
     
     @staticmethod
     async def get_or_create(discord_id, username):
-        """Obtiene un usuario o lo crea si no existe"""
-        user = await User.get(discord_id)
-        if not user:
-            await User.create(discord_id, username)
-            user = await User.get(discord_id)
-        return user
+        """Obtiene un usuario o lo crea si no existe.
+        
+        Un solo upsert atómico: dos registros simultáneos del mismo usuario
+        no pueden chocar entre el SELECT y el INSERT.
+        """
+        async def upsert(db):
+            cursor = await db.execute('''
+                INSERT INTO users (discord_id, username, join_date)
+                VALUES (?, ?, ?)
+                ON CONFLICT(discord_id) DO UPDATE SET username = excluded.username
+                RETURNING discord_id, username, total_points, total_games,
+                          is_elkie, join_date, role
+            ''', (discord_id, username, datetime.now().isoformat()))
+            return await cursor.fetchone()
+        
+        try:
+            row = await db_writer.run(upsert)
+        except Exception as e:
+            print(f'Error al obtener/crear usuario: {e}')
+            return None
+        
+        _known_users.add(discord_id)
+        return User(
+            discord_id=row[0],
+            username=row[1],
+            total_points=row[2],
+            total_games=row[3],
+            is_elkie=bool(row[4]),
+            join_date=row[5],
+            role=row[6]
+        )
     
     @staticmethod
-    async def update_stats(discord_id):
-        """Actualiza las estadísticas del usuario (puntos y juegos totales)"""
-        db = await get_db()
-        try:
-            # Calcular puntos totales de juegos aprobados
-            async with db.execute('''
-                SELECT COUNT(*), COALESCE(SUM(total_points), 0)
-                FROM games
-                WHERE discord_user_id = ? AND status = 'APPROVED'
-            ''', (discord_id,)) as cursor:
-                row = await cursor.fetchone()
-                total_games = row[0]
-                total_points = row[1]
-            
-            # Actualizar usuario
-            await db.execute('''
-                UPDATE users
-                SET total_points = ?, total_games = ?
-                WHERE discord_id = ?
-            ''', (total_points, total_games, discord_id))
-            
-            await db.commit()
+    async def ensure_exists(discord_id, username) -> bool:
+        """Garantiza que el usuario exista; si ya lo conocemos no toca la BD"""
+        if discord_id in _known_users:
             return True
-        except Exception as e:
-            print(f'Error al actualizar stats: {e}')
-            return False
-        finally:
-            await db.close()
+        return await User.get_or_create(discord_id, username) is not None
     
     @staticmethod
     async def get_all_ranked():
         """Obtiene todos los usuarios ordenados por puntos (ranking)"""
-        db = await get_db()
+        db = await get_read_db()
         try:
             users = []
             async with db.execute('''
@@ -115,4 +171,139 @@ class User:
                     ))
             return users
         finally:
-            await db.close()
\ No newline at end of file
+            await db.close()
+    
+    @staticmethod
+    async def get_ranked_for_contest(contest_id: int) -> list:
+        """Ranking de un concurso: usuarios con sus puntos en ese concurso"""
+        db = await get_read_db()
+        try:
+            users = []
+            # Recorre idx_contest_scores_ranking: solo las filas del concurso
+            async with db.execute(f'''
+                SELECT u.discord_id, u.username, s.total_points, s.total_games,
+                       {ELKIE_SQL}, u.join_date, u.role
+                FROM contest_scores s
+                JOIN users u ON u.discord_id = s.discord_id
+                WHERE s.contest_id = ?
+                ORDER BY s.total_points DESC, s.total_games DESC, s.discord_id
+            ''', (contest_id,)) as cursor:
+                async for row in cursor:
+                    users.append(User(
+                        discord_id=row[0],
+                        username=row[1],
+                        total_points=row[2],
+                        total_games=row[3],
+                        is_elkie=bool(row[4]),
+                        join_date=row[5],
+                        role=row[6]
+                    ))
+            return users
+        finally:
+            await db.close()
+    
+    @staticmethod
+    async def get_in_contest(discord_id: int, contest_id: int):
+        """Usuario con sus puntos en un concurso (0 si aún no participa)"""
+        db = await get_read_db()
+        try:
+            async with db.execute('''
+                SELECT u.discord_id, u.username,
+                       COALESCE(s.total_points, 0), COALESCE(s.total_games, 0),
+                       u.discord_id IS (SELECT elkie_id FROM contests WHERE id = ?),
+                       u.join_date, u.role
+                FROM users u
+                LEFT JOIN contest_scores s
+                    ON s.contest_id = ? AND s.discord_id = u.discord_id
+                WHERE u.discord_id = ?
+            ''', (contest_id, contest_id, discord_id)) as cursor:
+                row = await cursor.fetchone()
+                if row:
+                    _known_users.add(discord_id)
+                    return User(
+                        discord_id=row[0],
+                        username=row[1],
+                        total_points=row[2],
+                        total_games=row[3],
+                        is_elkie=bool(row[4]),
+                        join_date=row[5],
+                        role=row[6]
+                    )
+                return None
+        finally:
+            await db.close()
+    
+    @staticmethod
+    async def get_leaderboard(contest_id: int, first: int = 1, last: int = None) -> list:
+        """Ranking con puestos del concurso, solo las posiciones first..last.
+        
+        Cada User trae rank (empates comparten puesto), dense_rank, position
+        (única, para paginar), gap_ahead, gap_next, gap_leader,
+        games_behind_leader y ranked_count.
+        """
+        last_filter = 'AND r.position <= ?' if last is not None else ''
+        params = (contest_id, first, last) if last is not None else (contest_id, first)
+        
+        db = await get_read_db()
+        try:
+            cursor = await db.execute(f'''{RANKING_CTE}
+                SELECT {RANKED_COLUMNS}
+                FROM ranked r
+                JOIN users u ON u.discord_id = r.discord_id
+                WHERE r.position >= ? {last_filter}
+                ORDER BY r.position
+            ''', params)
+            return [_ranked_user(row) for row in await cursor.fetchall()]
+        finally:
+            await db.close()
+    
+    @staticmethod
+    async def get_standing(discord_id: int, contest_id: int):
+        """Puesto y distancias de un usuario (None si no tiene juegos aprobados)"""
+        db = await get_read_db()
+        try:
+            cursor = await db.execute(f'''{RANKING_CTE}
+                SELECT {RANKED_COLUMNS}
+                FROM ranked r
+                JOIN users u ON u.discord_id = r.discord_id
+                WHERE r.discord_id = ?
+            ''', (contest_id, discord_id))
+            row = await cursor.fetchone()
+            return _ranked_user(row) if row else None
+        finally:
+            await db.close()
+    
+    @staticmethod
+    async def get_leaderboard_summary(contest_id: int) -> dict:
+        """Totales del ranking sin traer a todos: participantes, puntos, juegos,
+        el líder y quien tiene más juegos"""
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT COUNT(*), COALESCE(SUM(total_points), 0), COALESCE(SUM(total_games), 0)
+                FROM contest_scores
+                WHERE contest_id = ? AND total_games > 0
+            ''', (contest_id,))
+            participants, total_points, total_games = await cursor.fetchone()
+            
+            cursor = await db.execute(f'''
+                SELECT u.discord_id, u.username, s.total_points, s.total_games,
+                       {ELKIE_SQL}, u.join_date, u.role
+                FROM contest_scores s
+                JOIN users u ON u.discord_id = s.discord_id
+                WHERE s.contest_id = ? AND s.total_games > 0
+                ORDER BY s.total_games DESC, s.total_points DESC, s.discord_id
+                LIMIT 1
+            ''', (contest_id,))
+            row = await cursor.fetchone()
+        finally:
+            await db.close()
+        
+        leaders = await User.get_leaderboard(contest_id, 1, 1)
+        return {
+            'participants': participants,
+            'total_points': total_points,
+            'total_games': total_games,
+            'leader': leaders[0] if leaders else None,
+            'most_games': User(row[0], row[1], row[2], row[3], bool(row[4]), row[5], row[6]) if row else None,
+        }
@@ -0,0 +1,143 @@
+import json
+import time
+from collections import OrderedDict
+
+import config
+from models.database import get_read_db
+
+
+class UserStats:
+    """Resumen de un usuario en un concurso (fila de user_stats)"""
+
+    def __init__(self, contest_id, discord_id, games=0, points=0, platinums=0,
+                 recompleted=0, categories='{}', platforms='{}', top_games='[]'):
+        self.contest_id = contest_id
+        self.discord_id = discord_id
+        self.games = games
+        self.points = points
+        self.platinums = platinums
+        self.recompleted = recompleted
+        self.categories = json.loads(categories)  # {categoría: juegos}
+        self.platforms = json.loads(platforms)    # {plataforma: juegos}
+        # [(nombre, puntos, platino), ...] de mayor a menor
+        self.top_games = [tuple(game) for game in json.loads(top_games)]
+
+    @staticmethod
+    async def load(discord_id: int, contest_id: int) -> 'UserStats':
+        """Lee la fila de la BD (vacía si el usuario no tiene juegos aprobados)"""
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT contest_id, discord_id, games, points, platinums, recompleted,
+                       categories, platforms, top_games
+                FROM user_stats
+                WHERE contest_id = ? AND discord_id = ?
+            ''', (contest_id, discord_id))
+            row = await cursor.fetchone()
+            return UserStats(*row) if row else UserStats(contest_id, discord_id)
+        finally:
+            await db.close()
+
+    @staticmethod
+    async def contest_totals(contest_id: int) -> dict:
+        """Totales del concurso sumando las filas de user_stats (una por usuario).
+
+        No lee juegos: el costo depende de los participantes, no de cuántos
+        juegos haya. Retorna {games, points, platinums, recompleted,
+        categories: {categoría: juegos}, platforms: {plataforma: juegos},
+        platinum_leader: (username, platinos) o None}.
+        """
+        db = await get_read_db()
+        try:
+            cursor = await db.execute('''
+                SELECT COALESCE(SUM(games), 0), COALESCE(SUM(points), 0),
+                       COALESCE(SUM(platinums), 0), COALESCE(SUM(recompleted), 0)
+                FROM user_stats
+                WHERE contest_id = ?
+            ''', (contest_id,))
+            games, points, platinums, recompleted = await cursor.fetchone()
+
+            breakdowns = {}
+            for column in ('categories', 'platforms'):
+                cursor = await db.execute(f'''
+                    SELECT item.key, SUM(item.value)
+                    FROM user_stats, json_each(user_stats.{column}) AS item
+                    WHERE user_stats.contest_id = ?
+                    GROUP BY item.key
+                ''', (contest_id,))
+                breakdowns[column] = dict(await cursor.fetchall())
+
+            cursor = await db.execute('''
+                SELECT u.username, s.platinums
+                FROM user_stats s
+                JOIN users u ON u.discord_id = s.discord_id
+                WHERE s.contest_id = ? AND s.platinums > 0
+                ORDER BY s.platinums DESC, s.discord_id
+                LIMIT 1
+            ''', (contest_id,))
+            platinum_leader = await cursor.fetchone()
+        finally:
+            await db.close()
+
+        return {
+            'games': games,
+            'points': points,
+            'platinums': platinums,
+            'recompleted': recompleted,
+            **breakdowns,
+            'platinum_leader': tuple(platinum_leader) if platinum_leader else None,
+        }
+
+
+class UserStatsCache:
+    """LRU acotado de UserStats con vencimiento; si no está, se lee de la BD.
+
+    Las escrituras de este proceso invalidan al usuario (o todo, si no se sabe
+    a quién tocaron); lo que escriban otros shards se ve al vencer la entrada.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # (contest_id, discord_id) -> (vence, UserStats)
+
+        # Estadísticas
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, discord_id: int, contest_id: int) -> UserStats:
+        key = (contest_id, discord_id)
+        entry = self.entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        stats = await UserStats.load(discord_id, contest_id)
+        self.entries[key] = (time.monotonic() + self.ttl, stats)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return stats
+
+    def invalidate(self, discord_id: int = None):
+        """Olvida a un usuario (en todos los concursos), o todo si discord_id es None"""
+        if discord_id is None:
+            self.entries.clear()
+            return
+        for key in [key for key in self.entries if key[1] == discord_id]:
+            del self.entries[key]
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0,
+        }
+
+
+# Caché compartida por /estadisticas y la biblioteca del ranking
+user_stats_cache = UserStatsCache(config.USER_STATS_CACHE_SIZE, config.USER_STATS_CACHE_TTL_S)
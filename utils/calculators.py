@@ -0,0 +1,70 @@
+from itertools import repeat
+from operator import add, mul
+
+import config
+
+# Claves de la tabla de puntos que son bonos y no categorías
+BONUS_KEYS = ('platino', 'recompletado')
+
+
+class ScoringEngine:
+    """Tabla de puntos compilada: puntos base por grafía de categoría y bonos.
+
+    Las grafías en que llega la categoría ('aaa', 'AAA', 'Aaa') se resuelven
+    al construirla, así que puntuar un juego es un acceso a diccionario y
+    puntuar miles son maps en C sobre columnas, sin bucle de Python por
+    juego. También genera la expresión SQL equivalente para los recálculos
+    masivos dentro de SQLite.
+    """
+
+    def __init__(self, rules: dict):
+        self.rules = dict(rules)
+        self.categories = [name for name in self.rules if name not in BONUS_KEYS]
+        self.platinum_bonus = self.rules.get('platino', 0)
+        self.recompleted_bonus = self.rules.get('recompletado', 0)
+
+        self._base = {}
+        for name in self.categories:
+            for spelling in (name, name.upper(), name.capitalize()):
+                self._base[spelling] = self.rules[name]
+
+    def score(self, category: str, has_platinum=False, is_recompleted=False) -> int:
+        """Puntos de un juego (KeyError si la categoría no existe)"""
+        base = self._base.get(category)
+        if base is None:
+            base = self._base[category.lower()]
+        return (
+            base
+            + (self.platinum_bonus if has_platinum else 0)
+            + (self.recompleted_bonus if is_recompleted else 0)
+        )
+
+    def score_many(self, categories, platinums, recompleted=None) -> list:
+        """Puntos de muchos juegos a la vez, sobre columnas paralelas.
+
+        platinums y recompleted son 0/1 (o bool). Las categorías deben venir
+        con alguna de las grafías de la tabla ('AAA', 'aaa', 'Aaa').
+        """
+        points = map(self._base.__getitem__, categories)
+        for flags, bonus in ((platinums, self.platinum_bonus), (recompleted, self.recompleted_bonus)):
+            if flags is None or not bonus:
+                continue
+            points = map(add, points, flags if bonus == 1 else map(mul, flags, repeat(bonus)))
+        return list(points)
+
+    def sql_expression(self) -> tuple:
+        """(SQL, params) de los puntos según esta tabla, sobre columnas de games.
+
+        Una categoría que no está en la tabla conserva sus puntos actuales.
+        """
+        per_game = 'has_platinum * ? + is_recompleted * ?'
+        whens = ' '.join(f'WHEN ? THEN ? + {per_game}' for _ in self.categories)
+        sql = f'(CASE lower(category) {whens} ELSE total_points END)'
+        params = []
+        for name in self.categories:
+            params += [name, self.rules[name], self.platinum_bonus, self.recompleted_bonus]
+        return sql, params
+
+
+# Motor con la tabla de config, compartido por comandos y modelos
+scoring = ScoringEngine(config.PUNTOS_CATEGORIA)
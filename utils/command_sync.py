@@ -0,0 +1,47 @@
+import hashlib
+import json
+
+import discord
+
+from utils.shared_state import shared_state
+
+# Mientras un proceso sincroniza, los demás shards no lo intentan
+SYNC_CLAIM_TTL_S = 300
+
+
+def tree_hash(tree: discord.app_commands.CommandTree, guild: discord.abc.Snowflake) -> str:
+    """Hash estable del payload que tree.sync() enviaría a Discord"""
+    payload = [command.to_dict() for command in tree.get_commands(guild=guild)]
+    payload.sort(key=lambda command: (command.get('type', 1), command['name']))
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+async def sync_if_changed(bot, guild_id: int, force: bool = False) -> bool:
+    """Copia los comandos globales al servidor y sincroniza solo si cambiaron.
+
+    El hash sincronizado vive en el estado compartido: con varios procesos
+    (shards) el primero que lo reclama sincroniza y el resto solo copia el
+    árbol local. Retorna True si hubo sync contra la API de Discord.
+    """
+    guild = discord.Object(id=guild_id)
+    bot.tree.copy_global_to(guild=guild)
+
+    key = f'{bot.application_id}:{guild_id}'
+    current = tree_hash(bot.tree, guild)
+
+    if not force and await shared_state.aget(f'command-hash:{key}') == current:
+        print('✅ Comandos sin cambios, se omite la sincronización')
+        return False
+
+    if not await shared_state.aclaim(f'command-sync:{key}', SYNC_CLAIM_TTL_S):
+        print('⏭️ Otro proceso está sincronizando los comandos')
+        return False
+
+    try:
+        await bot.tree.sync(guild=guild)
+        await shared_state.aset(f'command-hash:{key}', current)
+    finally:
+        await shared_state.adelete(f'command-sync:{key}')
+    print('✅ Comandos sincronizados')
+    return True
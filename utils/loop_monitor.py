@@ -0,0 +1,112 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+import discord
+import config
+from utils.metrics import metrics, percentile
+
+
+class LoopMonitor:
+    """Mide el retraso de planificación del event loop y detecta bloqueos
+
+    Una tarea duerme `sample_ms` y anota cuánto tarde despertó (lag). Un hilo
+    aparte vigila ese latido: si el loop deja de latir más de `stall_ms`,
+    captura la pila del hilo del loop mientras sigue bloqueado, así se ve qué
+    llamada síncrona (requests.get, sqlite, etc.) lo detuvo y en qué comando.
+    """
+
+    def __init__(self, sample_ms: int = 100, stall_ms: int = 250, window: int = 600):
+        self.interval = sample_ms / 1000
+        self.stall = stall_ms / 1000
+        self.samples = deque(maxlen=window)
+        self.stalls = 0
+        self.last_stall = None
+        self.last_beat = time.monotonic()
+        self.loop_thread = None
+        self.task = None
+        self.watchdog = None
+
+    def start(self):
+        """Arranca el muestreo (debe llamarse con el loop corriendo)"""
+        if self.task and not self.task.done():
+            return
+        self.loop_thread = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.task = asyncio.get_running_loop().create_task(self._sample())
+        self.watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self.watchdog.start()
+
+    async def _sample(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.last_beat = now
+            self.samples.append(lag)
+            metrics.observe('loop', 'lag', lag)
+            if lag >= self.stall:
+                print(f'🐌 [EVENT LOOP] Bloqueo terminado: {lag * 1000:.0f}ms en total')
+
+    def _watch(self):
+        reported_beat = None
+        while True:
+            time.sleep(self.stall / 4)
+            beat = self.last_beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.stall or beat == reported_beat:
+                continue
+
+            # Un reporte por bloqueo, tomado mientras el loop sigue detenido
+            reported_beat = beat
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+
+            self.stalls += 1
+            command = self._command_from_stack(frame)
+            stack = ''.join(traceback.format_stack(frame, limit=12))
+            self.last_stall = {'ms': blocked * 1000, 'command': command, 'stack': stack}
+
+            print(f'🐌 [EVENT LOOP] Bloqueado hace {blocked * 1000:.0f}ms'
+                  f'{f" durante {command}" if command else ""}\n{stack}')
+
+    @staticmethod
+    def _command_from_stack(frame) -> str:
+        """Busca la interacción en curso entre los frames de la pila bloqueada"""
+        while frame is not None:
+            interaction = frame.f_locals.get('interaction')
+            if isinstance(interaction, discord.Interaction):
+                command = interaction.command
+                if command:
+                    return f'/{command.qualified_name}'
+                data = interaction.data or {}
+                return data.get('custom_id') or data.get('name')
+            frame = frame.f_back
+        return None
+
+    def percentiles(self) -> dict:
+        """p50/p95/p99/máx del lag reciente, en ms"""
+        samples = list(self.samples)
+        return {
+            'p50': percentile(samples, 50) * 1000,
+            'p95': percentile(samples, 95) * 1000,
+            'p99': percentile(samples, 99) * 1000,
+            'max': max(samples, default=0.0) * 1000,
+        }
+
+    def summary(self) -> str:
+        """Texto corto para /ping y /info"""
+        p = self.percentiles()
+        return (
+            f"p50 {p['p50']:.0f}ms • p95 {p['p95']:.0f}ms • p99 {p['p99']:.0f}ms\n"
+            f"Bloqueos (>{self.stall * 1000:.0f}ms): {self.stalls}"
+        )
+
+
+# Instancia global
+loop_monitor = LoopMonitor(config.LOOP_SAMPLE_MS, config.LOOP_STALL_MS)
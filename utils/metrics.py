@@ -0,0 +1,200 @@
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import discord
+from discord import app_commands
+
+# Límites de los buckets del histograma (segundos)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Muestras recientes por serie para calcular percentiles en /metricas
+SAMPLES_PER_SERIES = 512
+
+KINDS = ('command', 'autocomplete', 'view', 'sql', 'rawg', 'loop')
+
+
+def percentile(values, pct: float) -> float:
+    """Percentil simple por rango más cercano (0.0 si no hay valores)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Histogram:
+    """Histograma acumulativo al estilo Prometheus más una ventana de muestras"""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.samples = deque(maxlen=SAMPLES_PER_SERIES)
+
+    def observe(self, seconds: float, error: bool = False):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if error:
+            self.errors += 1
+        self.samples.append(seconds)
+
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def percentile(self, pct: float) -> float:
+        return percentile(self.samples, pct)
+
+
+class Span:
+    error = False
+
+
+class Metrics:
+    """Registro de spans de tiempo agrupados por (tipo, nombre)"""
+
+    def __init__(self):
+        self.series = {}
+        self.started = time.time()
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False):
+        key = (kind, name)
+        if key not in self.series:
+            self.series[key] = Histogram()
+        self.series[key].observe(seconds, error)
+
+    @contextmanager
+    def span(self, kind: str, name: str):
+        """Mide el bloque; sirve igual en código síncrono y en corrutinas.
+        
+        Una excepción marca el span como error; el bloque también puede
+        marcarlo a mano con `span.error = True` (p. ej. un HTTP 429).
+        """
+        span = Span()
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException:
+            span.error = True
+            raise
+        finally:
+            self.observe(kind, name, time.perf_counter() - start, span.error)
+
+    def top(self, kind: str = None, limit: int = 10) -> list:
+        """Series ordenadas por tiempo total acumulado"""
+        items = [
+            (key, hist) for key, hist in self.series.items()
+            if kind is None or key[0] == kind
+        ]
+        items.sort(key=lambda item: item[1].total, reverse=True)
+        return items[:limit]
+
+    def uptime(self) -> float:
+        """Segundos desde el arranque (o el último reset)"""
+        return time.time() - self.started
+
+    def reset(self):
+        self.series.clear()
+        self.started = time.time()
+
+    def render_prometheus(self) -> str:
+        """Exporta todo en formato de texto de Prometheus"""
+        lines = [
+            '# HELP contest_bot_span_seconds Duración de comandos, vistas, SQL y llamadas a RAWG',
+            '# TYPE contest_bot_span_seconds histogram',
+        ]
+        errors = [
+            '# HELP contest_bot_span_errors_total Spans que terminaron con excepción',
+            '# TYPE contest_bot_span_errors_total counter',
+        ]
+
+        for (kind, name), hist in sorted(self.series.items()):
+            labels = f'kind="{kind}",name="{_escape(name)}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS, hist.buckets):
+                cumulative += count
+                lines.append(f'contest_bot_span_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'contest_bot_span_seconds_bucket{{{labels},le="+Inf"}} {hist.count}')
+            lines.append(f'contest_bot_span_seconds_sum{{{labels}}} {hist.total:.6f}')
+            lines.append(f'contest_bot_span_seconds_count{{{labels}}} {hist.count}')
+            errors.append(f'contest_bot_span_errors_total{{{labels}}} {hist.errors}')
+
+        return '\n'.join(lines + errors) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+_TABLE_PATTERN = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE(?:\s+IF\s+NOT\s+EXISTS)?)\s+([A-Za-z_][A-Za-z0-9_]*)', re.IGNORECASE)
+
+
+def sql_label(sql: str) -> str:
+    """Etiqueta de baja cardinalidad para una sentencia: 'SELECT games'"""
+    words = sql.split(None, 1)
+    verb = words[0].upper() if words else '?'
+    match = _TABLE_PATTERN.search(sql)
+    return f'{verb} {match.group(1)}' if match else verb
+
+
+class InstrumentedTree(app_commands.CommandTree):
+    """CommandTree que mide cada comando y cada autocompletado"""
+
+    async def _call(self, interaction: discord.Interaction):
+        kind = 'autocomplete' if interaction.type is discord.InteractionType.autocomplete else 'command'
+        start = time.perf_counter()
+        try:
+            await super()._call(interaction)
+        finally:
+            command = interaction.command
+            name = command.qualified_name if command else interaction.data.get('name', '?')
+            metrics.observe(kind, name, time.perf_counter() - start, interaction.command_failed)
+
+
+def install_view_hooks():
+    """Mide los callbacks de botones, selects y modales"""
+    view_task = discord.ui.View._scheduled_task
+    modal_task = discord.ui.Modal._scheduled_task
+
+    async def timed_view_task(view, item, interaction):
+        # Los botones decorados envuelven la función original en .callback
+        callback = getattr(item.callback, 'callback', item.callback)
+        callback_name = getattr(callback, '__name__', 'callback')
+        if callback_name == 'callback':
+            callback_name = type(item).__name__
+        name = f'{type(view).__name__}.{callback_name}'
+        with metrics.span('view', name):
+            return await view_task(view, item, interaction)
+
+    async def timed_modal_task(modal, interaction, components):
+        with metrics.span('view', type(modal).__name__):
+            return await modal_task(modal, interaction, components)
+
+    discord.ui.View._scheduled_task = timed_view_task
+    discord.ui.Modal._scheduled_task = timed_modal_task
+
+
+async def start_http_server(host: str, port: int):
+    """Expone /metrics en formato Prometheus (aiohttp ya viene con discord.py)"""
+    from aiohttp import web
+
+    async def handle(request):
+        return web.Response(text=metrics.render_prometheus(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    print(f'📈 Métricas en http://{host}:{port}/metrics')
+    return runner
+
+
+# Instancia global
+metrics = Metrics()
@@ -0,0 +1,48 @@
+import discord
+import config
+
+
+class PermissionService:
+    """Resuelve y cachea si un miembro es admin del concurso"""
+
+    def __init__(self, admin_role_id: int, cache_enabled: bool = True):
+        self.admin_role_id = admin_role_id
+        # Solo es seguro cachear si llegan los on_member_update que invalidan
+        self.cache_enabled = cache_enabled
+        self.cache = {}  # (guild_id, member_id) -> bool
+
+    def is_admin(self, user) -> bool:
+        """Verifica por rol de admin O por permisos de administrador"""
+        # Fuera de un servidor (DMs) no hay roles que revisar
+        if not isinstance(user, discord.Member):
+            return False
+
+        key = (user.guild.id, user.id)
+        if key in self.cache:
+            return self.cache[key]
+
+        has_admin_role = user.get_role(self.admin_role_id) is not None
+        has_admin_perms = user.guild_permissions.administrator
+
+        decision = has_admin_role or has_admin_perms
+        if self.cache_enabled:
+            self.cache[key] = decision
+        return decision
+
+    def invalidate(self, member: discord.Member):
+        """Olvida la decisión cacheada de un miembro"""
+        self.cache.pop((member.guild.id, member.id), None)
+
+    def invalidate_guild(self, guild_id: int):
+        """Olvida todas las decisiones de un servidor (p. ej. cambió un rol)"""
+        for key in [key for key in self.cache if key[0] == guild_id]:
+            del self.cache[key]
+
+
+# Instancia global del servicio de permisos
+# (los roles vienen en cada interacción; sin miembros cacheados no hay eventos
+# que avisen de cambios, así que se calcula cada vez)
+permissions = PermissionService(
+    config.ADMIN_ROLE_ID,
+    cache_enabled=config.INTENT_MEMBERS and config.CACHE_MEMBERS
+)
@@ -1,5 +1,8 @@
 import requests
 import config
+from utils.metrics import metrics
+from utils.shared_state import shared_state
+from utils.validators import base_name, normalize_text
 from typing import List, Dict, Optional
 
 class RAWGClient:
@@ -72,6 +75,12 @@ class RAWGClient:
         if cache_key in self.cache:
             return self.cache[cache_key]
         
+        # Otro shard pudo haber hecho ya la misma búsqueda
+        shared = shared_state.get(f'rawg:{cache_key}')
+        if shared is not None:
+            self.cache[cache_key] = shared
+            return shared
+        
         try:
             # Buscar SIN filtro de plataformas
             params = {
@@ -81,11 +90,13 @@ class RAWGClient:
                 'exclude_additions': 'false'
             }
             
-            response = requests.get(
-                f'{self.base_url}/games',
-                params=params,
-                timeout=5
-            )
+            with metrics.span('rawg', 'search') as span:
+                response = requests.get(
+                    f'{self.base_url}/games',
+                    params=params,
+                    timeout=5
+                )
+                span.error = response.status_code != 200
             
             if response.status_code == 200:
                 data = response.json()
@@ -144,8 +155,9 @@ class RAWGClient:
                 # Limitar resultados
                 final_results = final_results[:limit]
                 
-                # Guardar en caché
+                # Guardar en caché (local y compartida entre shards)
                 self.cache[cache_key] = final_results
+                shared_state.set(f'rawg:{cache_key}', final_results, ttl=config.RAWG_SHARED_CACHE_TTL_S)
                 
                 return final_results
             
@@ -157,27 +169,7 @@ class RAWGClient:
     
     def _get_base_name(self, name: str) -> str:
         """Extrae el nombre base del juego (sin año, remake, etc.)"""
-        base = name.lower()
-        
-        # Remover sufijos comunes
-        suffixes_to_remove = [
-            'game of the year', 'goty', 'complete edition', 'deluxe',
-            'ultimate edition', 'enhanced edition', 'special edition',
-            'directors cut', "director's cut", 'gold edition'
-        ]
-        
-        for suffix in suffixes_to_remove:
-            base = base.replace(suffix, '')
-        
-        # Remover años entre paréntesis: (2023), (2005)
-        import re
-        base = re.sub(r'\(\d{4}\)', '', base)
-        
-        # Remover símbolos y espacios extras
-        base = base.replace('™', '').replace('®', '').replace(':', '').strip()
-        base = re.sub(r'\s+', ' ', base)  # Múltiples espacios a uno solo
-        
-        return base
+        return base_name(name)
     
     def _get_group_match_score(self, query: str, base_name: str, games: List[Dict]) -> int:
         """Calcula el score de un grupo de juegos"""
@@ -253,11 +245,13 @@ class RAWGClient:
         try:
             params = {'key': self.api_key}
             
-            response = requests.get(
-                f'{self.base_url}/games/{game_id}',
-                params=params,
-                timeout=5
-            )
+            with metrics.span('rawg', 'details') as span:
+                response = requests.get(
+                    f'{self.base_url}/games/{game_id}',
+                    params=params,
+                    timeout=5
+                )
+                span.error = response.status_code != 200
             
             if response.status_code == 200:
                 return response.json()
@@ -399,21 +393,7 @@ class RAWGClient:
     
     def _normalize_text(self, text: str) -> str:
         """Normaliza texto para comparación"""
-        if not text:
-            return ''
-        
-        return (
-            text.lower()
-            .replace('™', '')
-            .replace('®', '')
-            .replace(':', '')
-            .replace('-', ' ')
-            .replace('.', '')
-            .replace('part i', 'part 1')
-            .replace('part ii', 'part 2')
-            .replace('part iii', 'part 3')
-            .strip()
-        )
+        return normalize_text(text)
     
     def _is_strong_name_match(self, query: str, game_name: str) -> bool:
         """Verifica si el nombre del juego coincide fuertemente con la búsqueda"""
@@ -449,5 +429,19 @@ class RAWGClient:
         
         return False
 
-# Instancia global del cliente
-rawg_client = RAWGClient()
\ No newline at end of file
+# Instancia global del cliente, creada en el primer uso: construir las
+# tablas de publishers no debe costarle nada al arranque del bot
+_client = None
+
+def get_client() -> RAWGClient:
+    """Retorna el cliente global, creándolo si hace falta"""
+    global _client
+    if _client is None:
+        _client = RAWGClient()
+    return _client
+
+def __getattr__(name):
+    # `from utils.rawg_api import rawg_client` sigue funcionando (PEP 562)
+    if name == 'rawg_client':
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+import config
+
+
+class SharedState:
+    """Estado compartido entre procesos del bot (shards) sobre SQLite en WAL.
+
+    Cada proceso abre su propia conexión por hilo; WAL permite que varios
+    lectores convivan con un escritor sin bloquearse. Los valores se guardan
+    como JSON y pueden expirar.
+
+    Los métodos son síncronos (pueden esperar hasta 5s el lock de otro
+    proceso); desde el event loop se usan sus versiones a* (aget, aset,
+    adelete, aclaim), que corren en un hilo.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+        # Identificador de este proceso para los claims
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS shared_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL
+                ) WITHOUT ROWID
+            ''')
+            self.local.conn = conn
+        return conn
+
+    def get(self, key: str, default=None):
+        """Valor de una clave, o default si no existe o expiró"""
+        row = self._conn().execute('''
+            SELECT value FROM shared_state
+            WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)
+        ''', (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value, ttl: float = None):
+        """Guarda un valor (serializable a JSON), opcionalmente con expiración"""
+        expires_at = time.time() + ttl if ttl else None
+        self._conn().execute('''
+            INSERT INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                value = excluded.value, expires_at = excluded.expires_at
+        ''', (key, json.dumps(value, ensure_ascii=False), expires_at))
+
+    def delete(self, key: str):
+        self._conn().execute('DELETE FROM shared_state WHERE key = ?', (key,))
+
+    def claim(self, key: str, ttl: float) -> bool:
+        """Reserva una tarea para este proceso durante ttl segundos.
+
+        Solo un proceso obtiene True mientras el claim siga vigente; así el
+        trabajo que no depende del shard (sync de comandos, backfills) no se
+        repite en cada proceso.
+        """
+        now = time.time()
+        cursor = self._conn().execute('''
+            INSERT INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                value = excluded.value, expires_at = excluded.expires_at
+            WHERE shared_state.expires_at <= ? OR shared_state.value = excluded.value
+        ''', (key, json.dumps(self.owner), now + ttl, now))
+        return cursor.rowcount > 0
+
+    async def aget(self, key: str, default=None):
+        return await asyncio.to_thread(self.get, key, default)
+
+    async def aset(self, key: str, value, ttl: float = None):
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+    async def adelete(self, key: str):
+        await asyncio.to_thread(self.delete, key)
+
+    async def aclaim(self, key: str, ttl: float) -> bool:
+        return await asyncio.to_thread(self.claim, key, ttl)
+
+    def purge_expired(self) -> int:
+        """Elimina las claves expiradas; retorna cuántas se borraron"""
+        cursor = self._conn().execute('''
+            DELETE FROM shared_state WHERE expires_at IS NOT NULL AND expires_at <= ?
+        ''', (time.time(),))
+        return cursor.rowcount
+
+
+# Instancia global del estado compartido
+shared_state = SharedState(config.SHARED_STATE_PATH)
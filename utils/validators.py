@@ -0,0 +1,77 @@
+import re
+import unicodedata
+
+# Sufijos de edición que no cambian el juego
+EDITION_SUFFIXES = [
+    'game of the year', 'goty', 'complete edition', 'deluxe',
+    'ultimate edition', 'enhanced edition', 'special edition',
+    'directors cut', "director's cut", 'gold edition'
+]
+
+# Lo que queda de una edición tras quitar los sufijos ("... - GOTY Edition")
+EDITION_WORDS = re.compile(
+    r'\b(?:(?:definitive|standard|digital|anniversary|legendary|premium|collectors?)\s+)?(?:edition|edicion)\b'
+)
+
+# Sube al cambiar title_key: init_db recalcula las claves guardadas
+TITLE_KEY_VERSION = 3
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza texto para comparación"""
+    if not text:
+        return ''
+
+    # De mayor a menor: 'part iii' no debe quedar como 'part 1ii'
+    return (
+        text.lower()
+        .replace('™', '')
+        .replace('®', '')
+        .replace(':', '')
+        .replace('-', ' ')
+        .replace('.', '')
+        .replace('part iii', 'part 3')
+        .replace('part ii', 'part 2')
+        .replace('part i', 'part 1')
+        .strip()
+    )
+
+
+def base_name(name: str) -> str:
+    """Extrae el nombre base del juego (sin año, remake, etc.)"""
+    base = name.lower()
+
+    # Remover sufijos comunes
+    for suffix in EDITION_SUFFIXES:
+        base = base.replace(suffix, '')
+
+    # Remover años entre paréntesis: (2023), (2005)
+    base = re.sub(r'\(\d{4}\)', '', base)
+
+    # Remover símbolos y espacios extras
+    base = base.replace('™', '').replace('®', '').replace(':', '').strip()
+    base = re.sub(r'\s+', ' ', base)  # Múltiples espacios a uno solo
+
+    return base
+
+
+def title_key(name: str) -> str:
+    """Clave de un título para detectar duplicados.
+
+    Sin acentos, sin edición y sin puntuación: "Pokémon™: Legends - Arceus
+    GOTY Edition" y "pokemon legends arceus" dan la misma clave. El año se
+    conserva, así un remake ("God of War (2018)") no choca con el original.
+    """
+    if not name:
+        return ''
+
+    # ™ y ® antes de NFKD, que los convertiría en "TM" y "R"
+    plain = ''.join(
+        char for char in unicodedata.normalize('NFKD', name.replace('™', '').replace('®', ''))
+        if not unicodedata.combining(char)
+    ).lower()
+    for suffix in EDITION_SUFFIXES:
+        plain = plain.replace(suffix, '')
+    key = EDITION_WORDS.sub('', normalize_text(plain))
+    key = re.sub(r'[^\w\s]', '', key)
+    return re.sub(r'\s+', ' ', key).strip()
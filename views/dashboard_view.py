@@ -1,6 +1,5 @@
 import discord
 from discord import ui
-from models.game import Game
 from models.user import User
 import config
 from datetime import datetime
@@ -9,14 +8,30 @@ from datetime import datetime
 class DashboardView(ui.View):
     """Vista del dashboard con select menu"""
     
-    def __init__(self, users: list, all_games: list):
+    def __init__(self, top_users: list, summary: dict, totals: dict, activity: dict, contest=None):
         super().__init__(timeout=300)
-        self.users = users
-        self.all_games = all_games
+        self.top_users = top_users  # top 5 con puestos (User.get_leaderboard)
+        self.summary = summary      # participantes, líder y récords (User.get_leaderboard_summary)
+        self.totals = totals        # desgloses del concurso (UserStats.contest_totals)
+        self.activity = activity    # DailyStats.activity del concurso: totales y ritmo
+        self.contest = contest  # None: fechas de config
         
         # Agregar select menu
         self.add_item(DashboardSelectMenu())
     
+    @staticmethod
+    async def load(contest) -> dict:
+        """Datos del dashboard: agregados y el top 5, sin traer juegos ni a todos los usuarios"""
+        from models.daily_stats import DailyStats
+        from models.user_stats import UserStats
+        
+        return {
+            'top_users': await User.get_leaderboard(contest.id, 1, 5),
+            'summary': await User.get_leaderboard_summary(contest.id),
+            'totals': await UserStats.contest_totals(contest.id),
+            'activity': await DailyStats.activity(contest.id),
+        }
+    
     def get_main_embed(self) -> discord.Embed:
         """Embed principal del dashboard"""
         embed = discord.Embed(
@@ -41,9 +56,9 @@ class DashboardView(ui.View):
         )
         
         # Stats rápidas en el inicio
-        total_games = len(self.all_games)
-        total_points = sum(u.total_points for u in self.users)
-        total_platinos = sum(1 for g in self.all_games if g.has_platinum)
+        total_games = self.activity['games']
+        total_points = self.activity['points']
+        total_platinos = self.activity['platinums']
         
         quick_stats = (
             f"🎮 **{total_games}** juegos  •  "
@@ -139,14 +154,15 @@ class DashboardSelectMenu(ui.Select):
             color=config.COLORES['info']
         )
         
-        users = self.view.users
-        games = self.view.all_games
+        users = self.view.top_users
+        activity = self.view.activity
+        participants = self.view.summary['participants']
         
         # Estadísticas principales
-        total_games = len(games)
-        total_points = sum(u.total_points for u in users)
-        total_platinos = sum(1 for g in games if g.has_platinum)
-        promedio = round(total_games / len(users), 1) if users else 0
+        total_games = activity['games']
+        total_points = activity['points']
+        total_platinos = activity['platinums']
+        promedio = round(total_games / participants, 1) if participants else 0
         
         stats_text = (
             f"🎮 **{total_games}** juegos completados\n"
@@ -163,10 +179,10 @@ class DashboardSelectMenu(ui.Select):
         
         # Top 3
         top3_text = ""
-        medals = {0: '🥇', 1: '🥈', 2: '🥉'}
+        medals = {1: '🥇', 2: '🥈', 3: '🥉'}
         
-        for i, user in enumerate(users[:3]):
-            medal = medals.get(i, '')
+        for user in users[:3]:
+            medal = medals.get(user.rank, '')
             elkie = " 👑" if user.is_elkie else ""
             top3_text += f"{medal} **{user.username}**{elkie}\n"
             top3_text += f"💰 {user.total_points} pts • 🎮 {user.total_games} juegos\n\n"
@@ -201,18 +217,20 @@ class DashboardSelectMenu(ui.Select):
             color=config.COLORES['aprobado']
         )
         
-        users = self.view.users[:5]
-        medals = {0: '🥇', 1: '🥈', 2: '🥉'}
+        users = self.view.top_users
+        medals = {1: '🥇', 2: '🥈', 3: '🥉'}
         
         ranking_text = ""
         
-        for i, user in enumerate(users):
-            medal = medals.get(i, f'**{i+1}.**')
+        for user in users:
+            # Los empatados comparten puesto y medalla
+            medal = medals.get(user.rank, f'**{user.rank}.**')
             elkie = " 👑" if user.is_elkie else ""
             
-            # Barra de progreso
-            if self.view.users[0].total_points > 0:
-                percentage = int((user.total_points / self.view.users[0].total_points) * 100)
+            # Barra de progreso (puntos del líder = propios + distancia)
+            leader_points = user.total_points + user.gap_leader
+            if leader_points > 0:
+                percentage = int((user.total_points / leader_points) * 100)
                 filled = percentage // 10
                 bar = "▰" * filled + "▱" * (10 - filled)
             else:
@@ -229,7 +247,7 @@ class DashboardSelectMenu(ui.Select):
             inline=False
         )
         
-        embed.set_footer(text=f"Total: {len(self.view.users)} participantes")
+        embed.set_footer(text=f"Total: {self.view.summary['participants']} participantes")
         
         return embed
     
@@ -240,16 +258,14 @@ class DashboardSelectMenu(ui.Select):
             color=0x57F287  # Verde
         )
         
-        games = self.view.all_games
+        totals = self.view.totals
+        total = totals['games']
         
         # Por categorías
-        categories = {}
-        for game in games:
-            categories[game.category] = categories.get(game.category, 0) + 1
+        categories = totals['categories']
         
         if categories:
             cat_text = ""
-            total = len(games)
             sorted_cats = sorted(categories.items(), key=lambda x: x[1], reverse=True)
             
             for cat, count in sorted_cats:
@@ -268,9 +284,7 @@ class DashboardSelectMenu(ui.Select):
             )
         
         # Por plataforma
-        platforms = {}
-        for game in games:
-            platforms[game.platform] = platforms.get(game.platform, 0) + 1
+        platforms = totals['platforms']
         
         if platforms:
             plat_text = ""
@@ -300,10 +314,14 @@ class DashboardSelectMenu(ui.Select):
             color=0xFEE75C  # Amarillo
         )
         
+        contest = self.view.contest
+        start_date = contest.start_date if contest else config.CONTEST_START_DATE
+        end_date = contest.end_date if contest else config.CONTEST_END_DATE
+        
         now = datetime.now()
-        days_passed = max(1, (now - config.CONTEST_START_DATE).days)
-        days_total = (config.CONTEST_END_DATE - config.CONTEST_START_DATE).days
-        days_remaining = (config.CONTEST_END_DATE - now).days
+        days_passed = max(1, (now - start_date).days)
+        days_total = (end_date - start_date).days
+        days_remaining = (end_date - now).days
         
         progress_pct = round((days_passed / days_total) * 100) if days_total > 0 else 0
         filled = progress_pct // 10
@@ -322,14 +340,19 @@ class DashboardSelectMenu(ui.Select):
             inline=False
         )
         
-        # Proyección
-        total_games = len(self.view.all_games)
+        # Proyección con el ritmo reciente (agregados diarios, no la lista de juegos)
+        activity = self.view.activity
+        total_games = activity['games']
         rate_per_day = round(total_games / days_passed, 2)
-        projected_total = round(rate_per_day * days_total)
         
+        rate_7 = round(activity['games_7'] / min(7, days_passed), 2)
+        rate_30 = round(activity['games_30'] / min(30, days_passed), 2)
+        projected_total = round(total_games + rate_7 * max(0, days_remaining))
         proyeccion_text = (
-            f"📈 Ritmo actual: **{rate_per_day}** juegos/día\n"
-            f"🎯 Proyección final: **~{projected_total}** juegos\n"
+            f"🔥 Últimos 7 días: **{rate_7}** juegos/día\n"
+            f"📆 Últimos 30 días: **{rate_30}** juegos/día\n"
+            f"📈 Desde el inicio: **{rate_per_day}** juegos/día\n"
+            f"🎯 Proyección final (ritmo 7 días): **~{projected_total}** juegos\n"
             f"📊 Juegos actuales: **{total_games}**"
         )
         
@@ -348,16 +371,15 @@ class DashboardSelectMenu(ui.Select):
             color=0xED4245  # Rojo
         )
         
-        users = self.view.users
-        games = self.view.all_games
+        summary = self.view.summary
         
-        if not users:
+        if not summary['leader']:
             embed.description = "No hay récords disponibles aún."
             return embed
         
         # Récords individuales
-        most_games = max(users, key=lambda x: x.total_games)
-        most_points = max(users, key=lambda x: x.total_points)
+        most_games = summary['most_games']
+        most_points = summary['leader']
         
         records_text = (
             f"🎮 **Más juegos completados:**\n"
@@ -373,14 +395,10 @@ class DashboardSelectMenu(ui.Select):
         )
         
         # Estadísticas especiales
-        total_platinos = sum(1 for g in games if g.has_platinum)
-        platino_users = {}
-        for game in games:
-            if game.has_platinum:
-                platino_users[game.username] = platino_users.get(game.username, 0) + 1
-        
-        if platino_users:
-            cazador = max(platino_users.items(), key=lambda x: x[1])
+        total_platinos = self.view.activity['platinums']
+        cazador = self.view.totals['platinum_leader']
+        
+        if cazador:
             special_text = (
                 f"🏆 **Cazador de Platinos:**\n"
                 f"{cazador[0]} - **{cazador[1]}** platinos\n\n"
@@ -408,21 +426,17 @@ class RefreshButton(ui.Button):
         )
     
     async def callback(self, interaction: discord.Interaction):
-        # Recargar datos
-        from models.user import User
-        from models.game import Game
-        
-        users = await User.get_all_ranked()
-        ranked_users = [u for u in users if u.total_games > 0]
+        # Recargar datos (agregados, no la lista de juegos)
+        from models.contest import Contest
         
-        all_games = []
-        for user in ranked_users:
-            games = await Game.get_by_user(user.discord_id, status='APPROVED')
-            all_games.extend(games)
+        contest = self.view.contest or await Contest.get_for_guild(interaction.guild_id)
+        data = await DashboardView.load(contest)
         
         # Actualizar vista
-        self.view.users = ranked_users
-        self.view.all_games = all_games
+        self.view.top_users = data['top_users']
+        self.view.summary = data['summary']
+        self.view.totals = data['totals']
+        self.view.activity = data['activity']
         
         await interaction.response.edit_message(
             embed=self.view.get_main_embed(),
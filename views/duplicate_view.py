@@ -0,0 +1,32 @@
+import discord
+from discord import ui
+
+
+class DuplicateWarningView(ui.View):
+    """Aviso de juego posiblemente repetido: el usuario decide si registrarlo igual"""
+
+    def __init__(self, user_id: int):
+        super().__init__(timeout=120)
+        self.user_id = user_id
+        self.confirmed = False
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Solo quien ejecutó /registrar puede responder"""
+        return interaction.user.id == self.user_id
+
+    async def _close(self, interaction: discord.Interaction, confirmed: bool):
+        self.confirmed = confirmed
+        for item in self.children:
+            item.disabled = True
+        await interaction.response.edit_message(view=self)
+        self.stop()
+
+    @ui.button(label="Registrar de todas formas", emoji="✅", style=discord.ButtonStyle.success)
+    async def confirm_btn(self, interaction: discord.Interaction, button: ui.Button):
+        """Sigue con el registro (p. ej. es otro juego con nombre parecido)"""
+        await self._close(interaction, True)
+
+    @ui.button(label="Cancelar", emoji="❌", style=discord.ButtonStyle.secondary)
+    async def cancel_btn(self, interaction: discord.Interaction, button: ui.Button):
+        """No registra nada"""
+        await self._close(interaction, False)
@@ -227,6 +227,8 @@ class HelpSelectMenu(ui.Select):
             ("👁️ `/revisar`", "Ver detalles de un juego pendiente"),
             ("✅ `/aprobar`", "Aprobar un juego con autocompletado"),
             ("❌ `/rechazar`", "Rechazar un juego con razón"),
+            ("📋 `/revision-masiva`", "Aprobar o rechazar varios juegos a la vez"),
+            ("📦 `/procesar-lote`", "Revisar en bloque los pendientes que cumplan un filtro"),
         ]
         
         edit_commands = [
@@ -236,7 +238,13 @@ class HelpSelectMenu(ui.Select):
         ]
         
         other_commands = [
-            ("👑 `/marcar-elkie`", "Activar/desactivar regla Elkie para un usuario"),
+            ("👑 `/marcar-elkie`", "Activar/desactivar regla Elkie para un usuario en este concurso"),
+            ("🆕 `/nuevo-concurso`", "Iniciar un nuevo concurso en este servidor"),
+            ("🧾 `/reconstruir-stats`", "Recalcular puntos desde el log de eventos"),
+            ("🧮 `/recalcular-puntos`", "Aplicar la tabla de puntos actual al concurso activo"),
+            ("📤 `/exportar`", "Descargar juegos, usuarios y eventos en CSV o NDJSON"),
+            ("💾 `/verificar-backup`", "Restaurar un backup en solo lectura y revisarlo (solo el dueño del bot)"),
+            ("📈 `/metricas`", "Ver latencias de comandos, vistas, SQL y RAWG"),
         ]
         
         embed.add_field(
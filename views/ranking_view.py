@@ -2,19 +2,30 @@ import discord
 from discord import ui
 from models.game import Game
 from models.user import User
+from models.user_stats import UserStats, user_stats_cache
+from models.rank_snapshot import RankSnapshot
 import config
 
+# Jugadores por página en la pestaña de ranking
+PAGE_SIZE = 5
+
 
 class RankingTabView(ui.View):
     """Vista principal del ranking con pestañas"""
     
-    def __init__(self, users: list, all_games: list):
+    def __init__(self, page_users: list, summary: dict, contest_id: int = None,
+                 since=None, previous_ranks: dict = None, movers: list = None):
         super().__init__(timeout=300)
-        self.users = users
-        self.all_games = all_games
+        self.page_users = page_users  # solo la página visible (User.get_leaderboard)
+        self.summary = summary        # totales, líder y récords (User.get_leaderboard_summary)
+        self.totals = None            # UserStats.contest_totals, al abrir Estadísticas o Por Categoría
+        self.contest_id = contest_id
+        self.since = since            # momento de la foto contra la que se marcan ▲/▼
+        self.previous_ranks = previous_ranks  # discord_id -> puesto en la foto (página actual; None: sin foto)
+        self.movers = movers or []
         self.current_tab = "players"  # players, stats, category
         self.players_page = 0
-        self.max_pages = (len(users) - 1) // 5 + 1
+        self.max_pages = max(summary['participants'] - 1, 0) // PAGE_SIZE + 1
         
         self.update_all_buttons()
     
@@ -51,10 +62,6 @@ class RankingTabView(ui.View):
     
     def get_players_embed(self) -> discord.Embed:
         """Embed de ranking de jugadores"""
-        start_idx = self.players_page * 5
-        end_idx = min(start_idx + 5, len(self.users))
-        page_users = self.users[start_idx:end_idx]
-        
         embed = discord.Embed(
             title="🏆 RANKING DEL CONCURSO 2025-2027",
             color=config.COLORES['info']
@@ -70,17 +77,17 @@ class RankingTabView(ui.View):
         
         # Construir ranking limpio
         ranking_text = ""
-        medals = {0: '🥇', 1: '🥈', 2: '🥉'}
+        medals = {1: '🥇', 2: '🥈', 3: '🥉'}
         
-        for i, user in enumerate(page_users):
-            actual_position = start_idx + i
-            position_num = actual_position + 1
-            medal = medals.get(actual_position, '')
+        for user in self.page_users:
+            # Los empatados comparten puesto y medalla
+            medal = medals.get(user.rank, '')
             elkie_marker = " 👑" if user.is_elkie else ""
             
-            # Calcular porcentaje y barra
-            if self.users[0].total_points > 0:
-                percentage = int((user.total_points / self.users[0].total_points) * 100)
+            # Calcular porcentaje y barra (puntos del líder = propios + distancia)
+            leader_points = user.total_points + user.gap_leader
+            if leader_points > 0:
+                percentage = int((user.total_points / leader_points) * 100)
                 filled = percentage // 10
                 bar = "▰" * filled + "▱" * (10 - filled)
                 bar_text = f"{bar} {percentage}%"
@@ -88,7 +95,7 @@ class RankingTabView(ui.View):
                 bar_text = "▱" * 10 + " 0%"
             
             # Formato limpio
-            ranking_text += f"\n**{position_num}.** {medal} **{user.username}**{elkie_marker}\n"
+            ranking_text += f"\n**{user.rank}.** {medal} **{user.username}**{elkie_marker}{self.movement_marker(user, user.position)}\n"
             ranking_text += f"{bar_text}\n"
             ranking_text += f"💰 {user.total_points} pts  •  🎮 {user.total_games} juego{'s' if user.total_games != 1 else ''}\n"
         
@@ -99,8 +106,8 @@ class RankingTabView(ui.View):
         )
         
         # Footer con separador visual
-        total_players = len(self.users)
-        total_games = sum(u.total_games for u in self.users)
+        total_players = self.summary['participants']
+        total_games = self.summary['total_games']
         
         footer_text = "━━━━━━━━━━━━━━━━━━━━━\n"
         footer_text += f"👥 {total_players} participantes  •  🎮 {total_games} juegos totales"
@@ -113,6 +120,19 @@ class RankingTabView(ui.View):
         
         return embed
     
+    def movement_marker(self, user, position: int) -> str:
+        """▲/▼ respecto a la foto anterior del ranking (vacío si no hay foto)"""
+        if self.previous_ranks is None:
+            return ""
+        previous = self.previous_ranks.get(user.discord_id)
+        if previous is None:
+            return " 🆕"
+        if previous > position:
+            return f" ▲{previous - position}"
+        if previous < position:
+            return f" ▼{position - previous}"
+        return ""
+    
     def get_stats_embed(self) -> discord.Embed:
         """Embed de estadísticas generales"""
         embed = discord.Embed(
@@ -122,10 +142,11 @@ class RankingTabView(ui.View):
         )
         
         # Estadísticas generales
-        total_games = len(self.all_games)
-        total_points = sum(user.total_points for user in self.users)
-        total_platinos = sum(1 for game in self.all_games if game.has_platinum)
-        promedio = round(total_games / len(self.users), 1) if self.users else 0
+        total_games = self.summary['total_games']
+        total_points = self.summary['total_points']
+        total_platinos = self.totals['platinums']
+        participants = self.summary['participants']
+        promedio = round(total_games / participants, 1) if participants else 0
         
         stats_text = (
             f"🎮 **{total_games}** juegos completados\n"
@@ -141,9 +162,10 @@ class RankingTabView(ui.View):
         )
         
         # Récords
-        if self.users:
-            most_games = max(self.users, key=lambda x: x.total_games)
-            most_points = max(self.users, key=lambda x: x.total_points)
+        leader = self.summary['leader']
+        if leader:
+            most_games = self.summary['most_games']
+            most_points = leader
             
             records_text = (
                 f"🎮 **Más juegos:** {most_games.username} ({most_games.total_games})\n"
@@ -156,8 +178,20 @@ class RankingTabView(ui.View):
                 inline=False
             )
         
+        # Quién más subió desde la foto de hace RANK_MOVEMENT_DAYS
+        if self.movers:
+            movers_text = "\n".join(
+                f"▲{m['moved']} **{m['username']}** ({m['old_rank']}° → {m['new_rank']}°, +{m['points_gained']} pts)"
+                for m in self.movers
+            )
+            embed.add_field(
+                name=f"🚀 Mayores Subidas ({config.RANK_MOVEMENT_DAYS} días)",
+                value=movers_text,
+                inline=False
+            )
+        
         # Premios
-        if self.users and self.users[0].is_elkie:
+        if leader and leader.is_elkie:
             premio_text = "🥇 1er lugar: **$30 USD**\n🥈 2do lugar: **$20 USD** (Regla Elkie activa 👑)"
         else:
             premio_text = "🥇 1er lugar: **$30 USD**"
@@ -178,18 +212,14 @@ class RankingTabView(ui.View):
             color=0x57F287  # Verde
         )
         
-        # Contar por categorías
-        categories = {}
-        platforms = {}
-        
-        for game in self.all_games:
-            categories[game.category] = categories.get(game.category, 0) + 1
-            platforms[game.platform] = platforms.get(game.platform, 0) + 1
+        # Conteos por categoría y plataforma (sumados por la BD)
+        categories = self.totals['categories']
+        platforms = self.totals['platforms']
+        total_games = self.totals['games']
         
         # Categorías
         if categories:
             cat_text = ""
-            total_games = len(self.all_games)
             sorted_cats = sorted(categories.items(), key=lambda x: x[1], reverse=True)
             
             for cat, count in sorted_cats:
@@ -209,7 +239,6 @@ class RankingTabView(ui.View):
         # Plataformas
         if platforms:
             plat_text = ""
-            total_games = len(self.all_games)
             sorted_plats = sorted(platforms.items(), key=lambda x: x[1], reverse=True)
             
             for plat, count in sorted_plats:
@@ -240,6 +269,7 @@ class RankingTabView(ui.View):
     @ui.button(label="Estadísticas", emoji="📊", style=discord.ButtonStyle.secondary, custom_id="tab_stats", row=0)
     async def stats_tab_btn(self, interaction: discord.Interaction, button: ui.Button):
         """Cambiar a pestaña de estadísticas"""
+        await self.load_totals()
         self.current_tab = "stats"
         self.update_all_buttons()
         await interaction.response.edit_message(embed=self.get_embed(), view=self)
@@ -247,6 +277,7 @@ class RankingTabView(ui.View):
     @ui.button(label="Por Categoría", emoji="🎮", style=discord.ButtonStyle.secondary, custom_id="tab_category", row=0)
     async def category_tab_btn(self, interaction: discord.Interaction, button: ui.Button):
         """Cambiar a pestaña de categorías"""
+        await self.load_totals()
         self.current_tab = "category"
         self.update_all_buttons()
         await interaction.response.edit_message(embed=self.get_embed(), view=self)
@@ -258,6 +289,7 @@ class RankingTabView(ui.View):
         """Página anterior (solo en players)"""
         if self.current_tab == "players" and self.players_page > 0:
             self.players_page -= 1
+            await self.load_page()
             self.update_all_buttons()
             await interaction.response.edit_message(embed=self.get_embed(), view=self)
     
@@ -266,9 +298,24 @@ class RankingTabView(ui.View):
         """Página siguiente (solo en players)"""
         if self.current_tab == "players" and self.players_page < self.max_pages - 1:
             self.players_page += 1
+            await self.load_page()
             self.update_all_buttons()
             await interaction.response.edit_message(embed=self.get_embed(), view=self)
     
+    async def load_page(self):
+        """Trae de la BD solo las posiciones de la página actual"""
+        first = self.players_page * PAGE_SIZE + 1
+        self.page_users = await User.get_leaderboard(self.contest_id, first, first + PAGE_SIZE - 1)
+        if self.since:
+            self.previous_ranks = await RankSnapshot.ranks_at(
+                self.contest_id, self.since, [user.discord_id for user in self.page_users]
+            )
+    
+    async def load_totals(self):
+        """Totales por categoría/plataforma, la primera vez que se piden"""
+        if self.totals is None:
+            self.totals = await UserStats.contest_totals(self.contest_id)
+    
     # ==================== BOTONES DE BIBLIOTECA ====================
     
     def clear_library_buttons(self):
@@ -278,11 +325,7 @@ class RankingTabView(ui.View):
     
     def add_library_buttons(self):
         """Agrega botones de biblioteca para usuarios de la página actual"""
-        start_idx = self.players_page * 5
-        end_idx = min(start_idx + 5, len(self.users))
-        page_users = self.users[start_idx:end_idx]
-        
-        for i, user in enumerate(page_users):
+        for i, user in enumerate(self.page_users):
             button = ui.Button(
                 label=user.username[:20],
                 emoji="📚",
@@ -299,7 +342,11 @@ class RankingTabView(ui.View):
     
     async def show_library(self, interaction: discord.Interaction, user: User):
         """Muestra biblioteca del usuario"""
-        games = await Game.get_by_user(user.discord_id, status='APPROVED')
+        # El resumen (en caché) dice si hay algo que cargar y trae los platinos
+        stats = await user_stats_cache.get(user.discord_id, self.contest_id)
+        games = []
+        if stats.games:
+            games = await Game.get_by_user(user.discord_id, status='APPROVED', contest_id=self.contest_id)
         
         if not games:
             embed = discord.Embed(
@@ -311,7 +358,7 @@ class RankingTabView(ui.View):
             return
         
         # Usar las vistas existentes de biblioteca
-        library_view = GameLibraryView(user, games, self)
+        library_view = GameLibraryView(user, games, self, stats)
         await interaction.response.send_message(
             embed=library_view.get_embed(),
             view=library_view,
@@ -322,10 +369,11 @@ class RankingTabView(ui.View):
 class GameLibraryView(ui.View):
     """Vista de biblioteca - Lista de juegos con imágenes"""
     
-    def __init__(self, user: User, games: list, parent_view: RankingTabView):
+    def __init__(self, user: User, games: list, parent_view: RankingTabView, stats=None):
         super().__init__(timeout=180)
         self.user = user
         self.games = games
+        self.stats = stats  # UserStats del usuario (None: se cuenta sobre games)
         self.parent_view = parent_view
         self.page = 0
         self.games_per_page = 3  # 3 juegos por página para que se vean las imágenes
@@ -355,12 +403,10 @@ class GameLibraryView(ui.View):
         )
         
         # Estadísticas en el header
-        categories = {}
-        platinos = 0
-        for game in self.games:
-            categories[game.category] = categories.get(game.category, 0) + 1
-            if game.has_platinum:
-                platinos += 1
+        if self.stats:
+            platinos = self.stats.platinums
+        else:
+            platinos = sum(1 for game in self.games if game.has_platinum)
         
         stats_text = f"💰 **{self.user.total_points}** pts • 🎮 **{self.user.total_games}** juegos"
         if platinos > 0:
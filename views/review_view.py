@@ -0,0 +1,132 @@
+import discord
+from discord import ui
+import config
+
+
+class BulkReviewView(ui.View):
+    """Vista de revisión masiva con selección múltiple de juegos pendientes"""
+
+    def __init__(self, cog, admin_id: int, games: list):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.admin_id = admin_id
+        self.total_pending = len(games)
+        self.games = games[:25]  # Discord limita a 25 opciones por select
+        self.selected_ids = []
+
+        self.add_item(BulkReviewSelect(self.games))
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Solo el admin que abrió la revisión puede usarla"""
+        if interaction.user.id != self.admin_id:
+            await interaction.response.send_message(
+                "❌ Solo el admin que abrió esta revisión puede usarla.",
+                ephemeral=True
+            )
+            return False
+        return True
+
+    def get_embed(self) -> discord.Embed:
+        """Embed con el resumen de la selección actual"""
+        embed = discord.Embed(
+            title=f"{config.EMOJIS['pendiente']} Revisión Masiva",
+            description=f"Hay **{self.total_pending}** juego(s) pendientes.\nSelecciona los juegos a revisar en el menú.",
+            color=config.COLORES['pendiente']
+        )
+
+        selected = [game for game in self.games if game.id in self.selected_ids]
+
+        if selected:
+            selected_text = ""
+            for game in selected:
+                platino_text = f" {config.EMOJIS['platino']}" if game.has_platinum else ""
+                selected_text += f"• **{game.game_name}**{platino_text} - {game.username} ({game.total_points} pts)\n"
+
+            embed.add_field(
+                name=f"✅ Seleccionados ({len(selected)})",
+                value=selected_text[:1024],
+                inline=False
+            )
+
+        if self.total_pending > len(self.games):
+            embed.set_footer(text=f"Mostrando los {len(self.games)} más antiguos de {self.total_pending} pendientes")
+        else:
+            embed.set_footer(text="Usa los botones para aprobar o rechazar la selección")
+
+        return embed
+
+    def disable_all(self):
+        """Deshabilita todos los componentes tras completar la revisión"""
+        for item in self.children:
+            item.disabled = True
+
+    @ui.button(label="Aprobar seleccionados", emoji="✅", style=discord.ButtonStyle.success, row=1)
+    async def approve_btn(self, interaction: discord.Interaction, button: ui.Button):
+        """Aprueba todos los juegos seleccionados"""
+        if not self.selected_ids:
+            await interaction.response.send_message("⚠️ No has seleccionado ningún juego.", ephemeral=True)
+            return
+
+        await self.cog.run_bulk_review(interaction, self.selected_ids, approve=True, view=self)
+
+    @ui.button(label="Rechazar seleccionados", emoji="❌", style=discord.ButtonStyle.danger, row=1)
+    async def reject_btn(self, interaction: discord.Interaction, button: ui.Button):
+        """Pide la razón y rechaza todos los juegos seleccionados"""
+        if not self.selected_ids:
+            await interaction.response.send_message("⚠️ No has seleccionado ningún juego.", ephemeral=True)
+            return
+
+        await interaction.response.send_modal(BulkRejectModal(self))
+
+
+class BulkReviewSelect(ui.Select):
+    """Menú de selección múltiple de juegos pendientes"""
+
+    def __init__(self, games: list):
+        options = []
+        for game in games:
+            platino_text = " 🏆" if game.has_platinum else ""
+            recomp_text = " 🔄" if game.is_recompleted else ""
+            options.append(discord.SelectOption(
+                label=f"{game.game_name}{platino_text}{recomp_text}"[:100],
+                description=f"{game.username} • {game.category} • {game.platform} ({game.total_points}pts)"[:100],
+                emoji=config.EMOJIS.get(game.category.lower(), '🎮'),
+                value=str(game.id)
+            ))
+
+        super().__init__(
+            placeholder="📋 Selecciona los juegos a revisar...",
+            min_values=1,
+            max_values=len(options),
+            options=options,
+            row=0
+        )
+
+    async def callback(self, interaction: discord.Interaction):
+        """Guarda la selección y actualiza el resumen"""
+        self.view.selected_ids = [int(value) for value in self.values]
+        await interaction.response.edit_message(embed=self.view.get_embed(), view=self.view)
+
+
+class BulkRejectModal(ui.Modal, title="Rechazar juegos seleccionados"):
+    """Modal para capturar la razón del rechazo masivo"""
+
+    razon = ui.TextInput(
+        label="Razón del rechazo",
+        style=discord.TextStyle.paragraph,
+        placeholder="Se enviará a cada usuario afectado",
+        max_length=500
+    )
+
+    def __init__(self, review_view: BulkReviewView):
+        super().__init__()
+        self.review_view = review_view
+
+    async def on_submit(self, interaction: discord.Interaction):
+        await self.review_view.cog.run_bulk_review(
+            interaction,
+            self.review_view.selected_ids,
+            approve=False,
+            reason=self.razon.value,
+            view=self.review_view
+        )